@@ -0,0 +1,92 @@
+# -*- coding: UTF-8 -*-
+u"""
+Attack and ray tables for every square of the chess board.
+
+The tables are computed once, when the module is imported, so generating moves is a matter of looking up and
+combining bitboards rather than stepping from square to square checking for the edge of the board.
+
+Directions are (x, y) tuples like those used for Piece.attacks, e.g. (0, 1) is north and (-1, -1) is south-west.
+"""
+from chess.bitboard import WHITE, BLACK, BITS, shift, direction, lsb, msb, knight_attacks, king_attacks, \
+    pawn_attacks
+
+ROOK_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (-1, 1), (-1, -1), (1, -1))
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+KNIGHT_DIRECTIONS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+
+KNIGHT_ATTACKS = [knight_attacks(BITS[i]) for i in range(64)]
+KING_ATTACKS = [king_attacks(BITS[i]) for i in range(64)]
+PAWN_ATTACKS = (
+    [pawn_attacks(BITS[i], WHITE) for i in range(64)],
+    [pawn_attacks(BITS[i], BLACK) for i in range(64)],
+)
+# The square a pawn moves to when moving forward one square, 0 on the last row
+PAWN_PUSHES = (
+    [shift(BITS[i], 0, 1) for i in range(64)],
+    [shift(BITS[i], 0, -1) for i in range(64)],
+)
+
+# The square one step (or knight jump) away in a direction, for the pieces that only move one step
+STEPS = dict((d, [shift(BITS[i], d[0], d[1]) for i in range(64)]) for d in QUEEN_DIRECTIONS + KNIGHT_DIRECTIONS)
+
+
+def _ray_squares(index, d):
+    squares = []
+    bit = shift(BITS[index], d[0], d[1])
+    while bit:
+        squares.append(lsb(bit))
+        bit = shift(bit, d[0], d[1])
+    return squares
+
+# The indexes of the squares in a direction, ordered from the nearest square to the edge of the board
+RAY_SQUARES = dict((d, [_ray_squares(i, d) for i in range(64)]) for d in QUEEN_DIRECTIONS)
+# The same squares as a bitboard
+RAYS = dict((d, [sum(BITS[s] for s in RAY_SQUARES[d][i]) for i in range(64)]) for d in QUEEN_DIRECTIONS)
+# The squares a rook or bishop attacks from each square on an empty board
+ROOK_RAYS = [sum(RAYS[d][i] for d in ROOK_DIRECTIONS) for i in range(64)]
+BISHOP_RAYS = [sum(RAYS[d][i] for d in BISHOP_DIRECTIONS) for i in range(64)]
+# Directions where the index of each square is larger than the last, the nearest square in the ray is the lowest bit
+_ASCENDING = dict((d, d[0] + 8 * d[1] > 0) for d in QUEEN_DIRECTIONS)
+
+# LINES[a][b] is the direction from square a to square b, or None if they do not share a rank, file or diagonal
+LINES = [[direction(a, b) for b in range(64)] for a in range(64)]
+
+
+def _between(a, b):
+    d = LINES[a][b]
+    if d is None:
+        return 0
+    return RAYS[d][a] & ~RAYS[d][b] & ~BITS[b]
+
+# BETWEEN[a][b] holds the squares strictly between square a and square b, 0 if they are not in line
+BETWEEN = [[_between(a, b) for b in range(64)] for a in range(64)]
+
+del _ray_squares, _between
+
+
+def ray_attacks(index, d, occupied):
+    u"""Returns the squares a sliding piece at index attacks in direction d, up to and including the first blocker.
+
+    index    -- The index of the square the piece is on
+    d        -- The direction the piece slides in
+    occupied -- The bitboard of occupied squares
+    """
+    ray = RAYS[d]
+    attacks = ray[index]
+    blockers = attacks & occupied
+    if blockers:
+        attacks ^= ray[lsb(blockers) if _ASCENDING[d] else msb(blockers)]
+    return attacks
+
+
+def rook_attacks(index, occupied):
+    u"""Returns all squares attacked by a rook on the square at index."""
+    return ray_attacks(index, (1, 0), occupied) | ray_attacks(index, (0, 1), occupied) | \
+        ray_attacks(index, (-1, 0), occupied) | ray_attacks(index, (0, -1), occupied)
+
+
+def bishop_attacks(index, occupied):
+    u"""Returns all squares attacked by a bishop on the square at index."""
+    return ray_attacks(index, (1, 1), occupied) | ray_attacks(index, (-1, 1), occupied) | \
+        ray_attacks(index, (-1, -1), occupied) | ray_attacks(index, (1, -1), occupied)
@@ -0,0 +1,241 @@
+# -*- coding: UTF-8 -*-
+u"""
+Benchmarks of the chess board, run with `python manage.py benchmark`.
+
+Each benchmark returns a list of (measurement, value, unit) rows so they can be printed by the management command
+or checked in tests.
+"""
+import gc
+import sys
+import time
+import types
+
+from chess.bitboard import SQUARE_NAMES, iter_bits
+from chess.board import Board
+from chess.color import Color
+from chess.engine import Searcher, TranspositionTable, evaluate
+from chess.engine.evaluation import PAWN_VALUE
+from chess.move import Move, move_from, move_to, is_capture
+from chess.perft import PERFT_SUITE
+from chess.piece_square import MAX_PHASE, middlegame, endgame
+
+# Objects of these types are shared by every board (or are part of the program), so are not counted
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_size(objects):
+    u"""Returns the number of bytes used by the objects and everything they reference.
+
+    Objects referenced more than once, such as the shared chess pieces, are only counted once. Measuring many objects
+    at once therefore spreads the cost of anything they share between them.
+
+    objects -- A list of the objects to measure, the list itself is not counted
+    """
+    seen = set([id(objects)])
+    pending = list(objects)
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+def memory(count=1000):
+    u"""Returns the average number of bytes used by a board and by a move.
+
+    The boards are taken from the perft positions, after a few moves have been made so the undo history is included.
+    The moves are Move records of the legal moves in the perft positions, like those kept of a game's moves.
+
+    count -- The number of boards and moves to average over
+    """
+    boards = []
+    moves = []
+    while len(boards) < count:
+        for _, board_string, color, _ in PERFT_SUITE:
+            board = Board(board_string, color)
+            for _ in range(2):
+                move = next(iter(board.legal_moves(board.current_player)))
+                board.make_move(move)
+            boards.append(board)
+
+            board = Board(board_string, color)
+            for move in board.legal_moves(color):
+                from_, to_ = SQUARE_NAMES[move_from(move)], SQUARE_NAMES[move_to(move)]
+                moves.append(Move(board.get_piece(from_), from_, to_, capture=is_capture(move)))
+
+    boards = boards[:count]
+    moves = moves[:count]
+    return [
+        (u'bytes per board', deep_size(boards) // count, u'B'),
+        (u'bytes per move', deep_size(moves) // count, u'B'),
+        (u'bytes per starting position', deep_size([Board(None, Color.WHITE) for _ in range(count)]) // count, u'B'),
+    ]
+
+
+def copying(count=2000):
+    u"""Returns the number of boards copied per second, by parsing the board string and with Board.copy.
+
+    count -- The number of times to copy each of the perft positions
+    """
+    boards = [Board(board_string, color) for _, board_string, color, _ in PERFT_SUITE]
+
+    def per_second(copy):
+        start = time.time()
+        for _ in xrange(count):
+            for board in boards:
+                copy(board)
+        return int(count * len(boards) / max(time.time() - start, 1e-6))
+
+    def parse(board):
+        return Board(repr(board).decode('utf-8'), board.current_player)
+
+    return [
+        (u'board string copies', per_second(parse), u'/s'),
+        (u'copy()', per_second(lambda board: board.copy()), u'/s'),
+        (u'copy(copy_on_write=True)', per_second(lambda board: board.copy(copy_on_write=True)), u'/s'),
+    ]
+
+
+def encoding(count=2000):
+    u"""Returns the size of the perft positions in each of the ways a board can be stored, and how many can be
+    written and read back per second.
+
+    count -- The number of times to encode and decode each of the perft positions
+    """
+    boards = [Board(board_string, color) for _, board_string, color, _ in PERFT_SUITE]
+    encodings = (
+        (u'board string', lambda board: repr(board), lambda data: Board(data.decode('utf-8'))),
+        (u'FEN', lambda board: board.to_fen(), Board.from_fen),
+        (u'packed', lambda board: board.to_bytes(), Board.from_bytes),
+    )
+
+    results = []
+    for name, encode, decode in encodings:
+        encoded = [encode(board) for board in boards]
+        size = max(len(data.encode('utf-8') if isinstance(data, unicode) else data) for data in encoded)
+        start = time.time()
+        for _ in xrange(count):
+            for board in boards:
+                encode(board)
+        encode_seconds = max(time.time() - start, 1e-6)
+        start = time.time()
+        for _ in xrange(count):
+            for data in encoded:
+                decode(data)
+        decode_seconds = max(time.time() - start, 1e-6)
+        results.extend([
+            (name + u' size', size, u'B'),
+            (name + u' encodes', int(count * len(boards) / encode_seconds), u'/s'),
+            (name + u' decodes', int(count * len(boards) / decode_seconds), u'/s'),
+        ])
+    return results
+
+
+def validation(count=200):
+    u"""Returns the number of moves checked per second, by generating the moves of the piece with get_moves and
+    with Board.is_legal, as move_piece does.
+
+    count -- The number of times to check each legal move of the perft positions
+    """
+    checks = []
+    for _, board_string, color, _ in PERFT_SUITE:
+        board = Board(board_string, color)
+        checks.extend((board, SQUARE_NAMES[move_from(move)], SQUARE_NAMES[move_to(move)])
+                      for move in board.legal_moves(color))
+
+    def per_second(check):
+        start = time.time()
+        for _ in xrange(count):
+            for board, from_, to_ in checks:
+                check(board, from_, to_)
+        return int(count * len(checks) / max(time.time() - start, 1e-6))
+
+    return [
+        (u'get_moves checks', per_second(lambda board, from_, to_: to_ in board.get_moves(from_)), u'/s'),
+        (u'is_legal checks', per_second(lambda board, from_, to_: board.is_legal(from_, to_)), u'/s'),
+    ]
+
+
+def search(depth=4):
+    u"""Returns the number of positions searched to find the best move in each of the perft positions, with and
+    without ordering the moves, how fast they were searched and how well the transposition table was used.
+
+    depth -- The depth to search each position to
+    """
+    def search_suite(ordering):
+        table = TranspositionTable()
+        nodes = 0
+        start = time.time()
+        for _, board_string, color, _ in PERFT_SUITE:
+            searcher = Searcher(max_depth=depth, table=table, ordering=ordering)
+            nodes += searcher.search(Board(board_string, color)).nodes
+        return nodes, max(time.time() - start, 1e-6), table
+
+    unordered_nodes, _, _ = search_suite(False)
+    nodes, seconds, table = search_suite(True)
+    stats = table.stats()
+    return [
+        (u'nodes without move ordering', unordered_nodes, u''),
+        (u'nodes', nodes, u''),
+        (u'nodes saved by move ordering', round(100.0 * (unordered_nodes - nodes) / unordered_nodes, 1), u'%'),
+        (u'nodes per second', int(nodes / seconds), u'/s'),
+        (u'transposition table hit rate', round(stats[u'hit rate'] * 100, 1), u'%'),
+        (u'transposition table collision rate', round(stats[u'collision rate'] * 100, 1), u'%'),
+        (u'transposition table size', table.size, u'B'),
+    ]
+
+
+def _evaluate_from_scratch(board):
+    u"""
+    The same score as evaluate, looking at every piece rather than the sums the board keeps up to date.
+    """
+    material = [0, 0]
+    for index in iter_bits(board._all_occupied()):
+        piece = board._mailbox[index]
+        material[piece.code // 6] += piece.value
+    score, phase = board._piece_squares()
+    sign = 1 if board.current_player is Color.WHITE else -1
+    phase = min(phase, MAX_PHASE)
+    blend = sign * (middlegame(score) * phase + endgame(score) * (MAX_PHASE - phase)) // MAX_PHASE
+    return sign * (material[0] - material[1]) * PAWN_VALUE + blend
+
+
+def evaluation(count=200):
+    u"""Returns the number of positions evaluated per second, with the scores the board keeps up to date and by
+    looking at every piece, for the positions one move on from the perft positions.
+
+    count -- The number of times to evaluate each position
+    """
+    boards = []
+    for _, board_string, color, _ in PERFT_SUITE:
+        board = Board(board_string, color)
+        for move in board.legal_moves(color):
+            board.make_move(move)
+            boards.append(board.copy())
+            board.unmake_move()
+
+    def per_second(evaluate_board):
+        start = time.time()
+        for _ in xrange(count):
+            for board in boards:
+                evaluate_board(board)
+        return int(count * len(boards) / max(time.time() - start, 1e-6))
+
+    return [
+        (u'evaluations', per_second(evaluate), u'/s'),
+        (u'evaluations from scratch', per_second(_evaluate_from_scratch), u'/s'),
+    ]
+
+
+BENCHMARKS = (
+    (u'memory', memory),
+    (u'copying', copying),
+    (u'encoding', encoding),
+    (u'validation', validation),
+    (u'search', search),
+    (u'evaluation', evaluation),
+)
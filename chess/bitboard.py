@@ -0,0 +1,147 @@
+# -*- coding: UTF-8 -*-
+u"""
+Helpers for the bitboard representation of a chess position.
+
+A bitboard is a 64 bit integer where each bit represents one square of the chess board. Bit 0 is A1, bit 7 is H1,
+bit 8 is A2 and so on up to bit 63 which is H8. A set of squares, such as all the squares containing white pawns
+or all the squares a rook can move to, can therefore be combined with the usual integer operators: & (intersection),
+| (union), ^ (symmetric difference) and ~ (complement, which must be masked with FULL).
+"""
+from chess.color import Color
+from chess.square import InvalidSquareException, SQUARE_NAMES
+
+# Sides, these index the per color occupancy bitboards. Python ints are much cheaper to use as list indexes than
+# the Color Enum.
+WHITE = 0
+BLACK = 1
+SIDES = {Color.WHITE: WHITE, Color.BLACK: BLACK}
+
+# Kinds of chess pieces, the bitboard holding the pieces of a kind and side is kind + 6 * side
+PAWN = 0
+KNIGHT = 1
+BISHOP = 2
+ROOK = 3
+QUEEN = 4
+KING = 5
+
+EMPTY = 0
+FULL = (1 << 64) - 1
+
+FILE_A = 0x0101010101010101
+FILE_B = FILE_A << 1
+FILE_G = FILE_A << 6
+FILE_H = FILE_A << 7
+
+RANK_1 = 0xFF
+RANK_2 = RANK_1 << 8
+RANK_3 = RANK_1 << 16
+RANK_6 = RANK_1 << 40
+RANK_7 = RANK_1 << 48
+RANK_8 = RANK_1 << 56
+
+SQUARE_INDEX = dict((name, i) for i, name in enumerate(SQUARE_NAMES))
+BITS = [1 << i for i in range(64)]
+
+# The squares that can be shifted dx files to the right (or left if dx is negative) without leaving the board
+_SHIFTABLE = {
+    -2: FULL ^ (FILE_A | FILE_B),
+    -1: FULL ^ FILE_A,
+    0: FULL,
+    1: FULL ^ FILE_H,
+    2: FULL ^ (FILE_G | FILE_H),
+}
+
+
+def square_index(name):
+    u"""Returns the index (0 to 63) of the square with the name specified, e.g 'A1' is 0 and 'H8' is 63.
+
+    name    -- The name of the square, in either upper or lower case
+    Raises  -- InvalidSquareException if the square is not on the chess board
+    """
+    try:
+        return SQUARE_INDEX[name.upper()]
+    except (KeyError, AttributeError):
+        raise InvalidSquareException(u"The square {name}, does not exist on a chess board.".format(name=name))
+
+
+def coords_index(x, y):
+    u"""Returns the index of the square at the 1-indexed x, y coordinates or None if it is not on the board."""
+    if 1 <= x <= 8 and 1 <= y <= 8:
+        return (y - 1) * 8 + x - 1
+    return None
+
+
+def index_coords(index):
+    u"""Returns the 1-indexed x, y coordinates of the square with the index specified."""
+    return index % 8 + 1, index // 8 + 1
+
+
+def direction(from_index, to_index):
+    u"""Returns the (x, y) step from one square towards another if they share a rank, file or diagonal, else None."""
+    (from_x, from_y), (to_x, to_y) = index_coords(from_index), index_coords(to_index)
+    dx, dy = to_x - from_x, to_y - from_y
+    if (dx == 0 and dy == 0) or (dx != 0 and dy != 0 and abs(dx) != abs(dy)):
+        return None
+    return (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+
+
+def lsb(bitboard):
+    u"""Returns the index of the least significant set bit. The bitboard must not be empty."""
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def msb(bitboard):
+    u"""Returns the index of the most significant set bit. The bitboard must not be empty."""
+    return bitboard.bit_length() - 1
+
+
+def popcount(bitboard):
+    u"""Returns the number of squares in the bitboard."""
+    return bin(bitboard).count(u'1')
+
+
+def iter_bits(bitboard):
+    u"""Yields the index of each square in the bitboard, from A1 towards H8."""
+    while bitboard:
+        bit = bitboard & -bitboard
+        yield bit.bit_length() - 1
+        bitboard ^= bit
+
+
+def square_names(bitboard):
+    u"""Returns the set of square names in the bitboard."""
+    return set(SQUARE_NAMES[i] for i in iter_bits(bitboard))
+
+
+def shift(bitboard, dx, dy):
+    u"""Moves every square in the bitboard dx files to the right and dy ranks up.
+
+    Squares moved off the board are discarded, they do not wrap around onto the other side of the board.
+
+    dx -- The number of files to move, between -2 and 2
+    dy -- The number of ranks to move
+    """
+    bitboard &= _SHIFTABLE[dx]
+    offset = dx + 8 * dy
+    if offset > 0:
+        return (bitboard << offset) & FULL
+    else:
+        return bitboard >> -offset
+
+
+def knight_attacks(bitboard):
+    u"""Returns all squares attacked by knights placed on the squares in bitboard."""
+    return shift(bitboard, 1, 2) | shift(bitboard, 2, 1) | shift(bitboard, 2, -1) | shift(bitboard, 1, -2) | \
+        shift(bitboard, -1, -2) | shift(bitboard, -2, -1) | shift(bitboard, -2, 1) | shift(bitboard, -1, 2)
+
+
+def king_attacks(bitboard):
+    u"""Returns all squares attacked by kings placed on the squares in bitboard."""
+    return shift(bitboard, 1, 0) | shift(bitboard, 1, 1) | shift(bitboard, 0, 1) | shift(bitboard, -1, 1) | \
+        shift(bitboard, -1, 0) | shift(bitboard, -1, -1) | shift(bitboard, 0, -1) | shift(bitboard, 1, -1)
+
+
+def pawn_attacks(bitboard, side):
+    u"""Returns all squares attacked by pawns of side placed on the squares in bitboard."""
+    forward = 1 if side == WHITE else -1
+    return shift(bitboard, -1, forward) | shift(bitboard, 1, forward)
@@ -1,10 +1,20 @@
 # -*- coding: UTF-8 -*-
+import struct
+
 from chess.color import Color
 from chess.winner import Winner
-from chess.move import Move
+from chess.move import Move, compact_move, promotion_move, move_from, move_to, promotion_kind, QUIET, \
+    DOUBLE_PAWN_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION
 from chess.square import Square, InvalidSquareException
-from chess.pieces import PieceFactory, King, BlackKing, WhiteKing, Queen, WhiteQueen, BlackQueen, Rook, WhiteRook, \
-    BlackRook, Bishop, WhiteBishop, BlackBishop, Knight, WhiteKnight, BlackKnight, Pawn, WhitePawn, BlackPawn, \
+from chess.bitboard import WHITE, BLACK, SIDES, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, FULL, RANK_1, RANK_2, \
+    RANK_3, RANK_6, RANK_7, RANK_8, BITS, SQUARE_NAMES, SQUARE_INDEX, square_index, coords_index, lsb, iter_bits, \
+    square_names
+from chess.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, PAWN_PUSHES, STEPS, LINES, \
+    BETWEEN, ROOK_RAYS, BISHOP_RAYS, ray_attacks, rook_attacks, bishop_attacks
+from chess.zobrist import PIECE_KEYS, BLACK_TO_MOVE, CASTLING_KEYS, EN_PASSANT_KEYS
+from chess.piece_square import PIECE_SQUARES, PHASES
+from chess.pieces import PIECES, PieceFactory, King, BlackKing, WhiteKing, Queen, WhiteQueen, BlackQueen, Rook, \
+    WhiteRook, BlackRook, Bishop, WhiteBishop, BlackBishop, Knight, WhiteKnight, BlackKnight, Pawn, WhitePawn, BlackPawn, \
     InvlaidPieceException
 
 
@@ -61,23 +71,74 @@ class InvalidBoardException(Exception):
     pass
 
 
+# The squares the white and black kings start on, they can only castle from here
+_KING_HOMES = (4, 60)
+
+# Castling rights, combined into a bitmask held by the board
+WHITE_KING_SIDE = 1
+WHITE_QUEEN_SIDE = 2
+BLACK_KING_SIDE = 4
+BLACK_QUEEN_SIDE = 8
+_KING_SIDE = (WHITE_KING_SIDE, BLACK_KING_SIDE)  # Indexed by side
+_QUEEN_SIDE = (WHITE_QUEEN_SIDE, BLACK_QUEEN_SIDE)
+
+# The castling rights that remain after a piece moves from, or is captured on, each square
+_CASTLING_KEPT = [15] * 64
+_CASTLING_KEPT[0] = 15 ^ WHITE_QUEEN_SIDE
+_CASTLING_KEPT[4] = 15 ^ (WHITE_KING_SIDE | WHITE_QUEEN_SIDE)
+_CASTLING_KEPT[7] = 15 ^ WHITE_KING_SIDE
+_CASTLING_KEPT[56] = 15 ^ BLACK_QUEEN_SIDE
+_CASTLING_KEPT[60] = 15 ^ (BLACK_KING_SIDE | BLACK_QUEEN_SIDE)
+_CASTLING_KEPT[63] = 15 ^ BLACK_KING_SIDE
+
+# The castling rights kept by a king or rook standing on its starting square, indexed by square then Piece.code
+_CASTLING_HOMES = {
+    0: {ROOK: WHITE_QUEEN_SIDE},
+    4: {KING: WHITE_KING_SIDE | WHITE_QUEEN_SIDE},
+    7: {ROOK: WHITE_KING_SIDE},
+    56: {ROOK + 6: BLACK_QUEEN_SIDE},
+    60: {KING + 6: BLACK_KING_SIDE | BLACK_QUEEN_SIDE},
+    63: {ROOK + 6: BLACK_KING_SIDE},
+}
+
+# The letters of the pieces in Forsyth-Edwards Notation (FEN), indexed by Piece.code
+_FEN_LETTERS = u'PNBRQKpnbrqk'
+_FEN_PIECES = dict((letter, PIECES[code]) for code, letter in enumerate(_FEN_LETTERS))
+_FEN_CASTLING = ((u'K', WHITE_KING_SIDE), (u'Q', WHITE_QUEEN_SIDE), (u'k', BLACK_KING_SIDE), (u'q', BLACK_QUEEN_SIDE))
+
+# The packed binary encoding, see Board.to_bytes. Each square is a 4 bit nibble holding Piece.code + 1, or 0 if it is
+# empty. The unused nibble 13 marks a pawn that has just moved two squares and can be captured en passant.
+PACKED_SIZE = 37
+_PACKED_EN_PASSANT = 13
+_PACKED_NIBBLES = dict([(None, 0)] + [(piece, piece.code + 1) for piece in PIECES])
+_PACKED_PAIRS = tuple((byte & 15, byte >> 4) for byte in range(256))  # The two nibbles of each byte
+_PACKED_STATE = struct.Struct('>BHH')  # Black to move and the castling rights, the halfmove clock and fullmove number
+
+# The most positions kept to look for repetitions. After 75 moves each without moving a pawn or capturing a piece the
+# game is drawn (the seventy-five move rule), so positions from further back are not needed.
+_HISTORY_LIMIT = 150
+
+
 class Board(object):
     """
     An implemenation of a chessboard.
+
+    The position is stored as bitboards, one 64 bit integer for each kind and color of piece, plus the squares
+    occupied by each player. See chess.bitboard for how squares map to bits. A list of the 64 squares, the mailbox,
+    is kept alongside so the piece on a given square can be looked up directly.
     """
 
+    __slots__ = ('_hash', '_current_player', '_king_location', '_mailbox', '_bitboards', '_occupied', '_castling',
+                 '_en_passant', '_undo', '_previous_move', 'stalemate_count', 'fullmove_number',
+                 'promote_pawn_location', 'winner', '_shared', '_history', '_repetitions', '_material',
+                 '_pins', '_move_cache', '_dirty', '_piece_square', '_phase')
+
     _HAS_MOVED = 'm'
     _EMPTY_SQUARE = '_'
 
     def __init__(self, board_string=None, current_player=None):
         # Fixme: Needs to accept previous move?
-        self._king_location = {}
-        self._all_squares = {}
-        self.stalemate_count = 0
-        self.previous_move = None
-
-        self.promote_pawn_location = None
-        self.winner = Winner.UNDECIDED
+        self._clear()
 
         if board_string is None:
             self.current_player = Color.WHITE
@@ -91,6 +152,209 @@ class Board(object):
 
         self._to_python(board_string)
 
+    def _clear(self):
+        """
+        Sets up an empty board, with white to move.
+        """
+        self._hash = 0  # The Zobrist hash of the position, see chess.zobrist
+        self._current_player = Color.WHITE
+        self._king_location = {}
+        self._mailbox = [None] * 64
+        self._bitboards = [0] * 12  # Indexed by Piece.code
+        self._occupied = [0, 0]  # Indexed by side, chess.bitboard.WHITE or BLACK
+        self._material = [0, 0]  # The total value of each side's pieces, indexed by side
+        self._piece_square = 0  # The packed piece-square score of the pieces, see chess.piece_square
+        self._phase = 0  # How far from the endgame the position is, see chess.piece_square.PHASES
+        self._castling = 0  # The castling rights, e.g WHITE_KING_SIDE | BLACK_QUEEN_SIDE
+        self._en_passant = None  # The index of the square a pawn can move to when capturing en passant
+        self._pins = None  # The checks and pins on each side's king, see _king_safety
+        self._move_cache = [None, None]  # The legal moves of each side's pieces, see _cached_moves
+        self._dirty = 0  # The squares changed since the move cache was last brought up to date
+        self._undo = []  # The undo records of the moves made with make_move, see _make_move for the contents
+        self._shared = False  # True if the structures above may be shared with a copy, see copy
+        self._history = []  # The hashes of the earlier positions that could be repeated, see position_history
+        self._repetitions = {}  # The number of times each hash appears in the history
+        self.stalemate_count = 0
+        self.fullmove_number = 1  # Starts at 1 and is incremented after each of black's moves
+        self.previous_move = None
+
+        self.promote_pawn_location = None
+        self.winner = Winner.UNDECIDED
+
+    def copy(self, copy_on_write=False):
+        """
+        Returns a copy of the board with the same game state, including the previous move, the count towards the fifty
+        move rule, a pawn waiting to be promoted and the moves that can be taken back with unmake_move.
+
+        copy_on_write -- If True the copy shares the pieces and undo records with this board until either of them
+                         makes a move. This makes copies that are only looked at, or that branch off and are then
+                         dropped, cheaper still.
+        """
+        board = Board.__new__(Board)
+        board._hash = self._hash
+        board._piece_square = self._piece_square
+        board._phase = self._phase
+        board._current_player = self._current_player
+        board._castling = self._castling
+        board._en_passant = self._en_passant
+        board._pins = self._pins
+        board._move_cache = [None, None]
+        board._dirty = 0
+        board._previous_move = self._previous_move
+        board.stalemate_count = self.stalemate_count
+        board.fullmove_number = self.fullmove_number
+        board.promote_pawn_location = self.promote_pawn_location
+        board.winner = self.winner
+        board._history = self._history[:]
+        board._repetitions = self._repetitions.copy()
+        if copy_on_write:
+            board._king_location = self._king_location
+            board._mailbox = self._mailbox
+            board._bitboards = self._bitboards
+            board._occupied = self._occupied
+            board._material = self._material
+            board._undo = self._undo
+            board._shared = self._shared = True
+        else:
+            board._king_location = self._king_location.copy()
+            board._mailbox = self._mailbox[:]
+            board._bitboards = self._bitboards[:]
+            board._occupied = self._occupied[:]
+            board._material = self._material[:]
+            board._undo = self._undo[:]
+            board._shared = False
+        return board
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        # Pieces and moves are never changed, so they can be shared
+        return self.copy()
+
+    def _unshare(self):
+        """
+        Takes private copies of the structures a copy on write board shares with its copies, before changing them.
+        """
+        self._king_location = self._king_location.copy()
+        self._mailbox = self._mailbox[:]
+        self._bitboards = self._bitboards[:]
+        self._occupied = self._occupied[:]
+        self._material = self._material[:]
+        self._undo = self._undo[:]
+        self._shared = False
+
+    @property
+    def hash(self):
+        """
+        The 64 bit Zobrist hash of the position. It covers the pieces, the player to move, the castling rights and the
+        en passant square and is kept up to date as moves are made.
+        """
+        return self._hash
+
+    def __eq__(self, other):
+        """
+        Boards are equal if they hold the same position: the same pieces on the same squares, the same player to move,
+        castling rights and en passant square. The move counters and the history of the game are not compared, so
+        boards reached by different move orders are equal.
+        """
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self._hash == other._hash and self._current_player is other._current_player and \
+            self._castling == other._castling and self._en_passant == other._en_passant and \
+            self._mailbox == other._mailbox
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        """
+        Hashes the position, see __eq__. Boards change as moves are made so must not be changed while they are used
+        as a key.
+        """
+        return hash(self._hash)
+
+    @property
+    def current_player(self):
+        """
+        The color of the player whose turn it is
+        """
+        return self._current_player
+
+    @current_player.setter
+    def current_player(self, color):
+        if color is not self._current_player:
+            self._hash ^= BLACK_TO_MOVE
+        self._current_player = color
+
+    @property
+    def previous_move(self):
+        """
+        The last move taken, a Move or MoveModel. Setting it also sets the square that can be captured en passant.
+        """
+        return self._previous_move
+
+    @previous_move.setter
+    def previous_move(self, move):
+        self._previous_move = move
+        en_passant = None
+        if move is not None and move.double_move is True:
+            index = square_index(move.to_loc)
+            pawn = self._mailbox[index]
+            if isinstance(pawn, Pawn):
+                en_passant = self._en_passant_target(index - 8 * pawn.forward)
+        self._set_en_passant(en_passant)
+
+    def _en_passant_target(self, target):
+        """
+        Returns the square passed over by a pawn that has moved two squares if an enemy pawn is able to capture it en
+        passant, otherwise None. Keeping the en passant square only when it matters means positions that only differ
+        by a capture that cannot happen hash the same.
+
+        target -- The index of the square the pawn passed over
+        """
+        side = WHITE if target < 32 else BLACK  # The side of the pawn that moved
+        if PAWN_ATTACKS[side][target] & self._bitboards[PAWN + 6 * (1 - side)]:
+            return target
+        return None
+
+    def _set_en_passant(self, target):
+        """
+        Sets the square that can be captured en passant, keeping the hash up to date.
+        """
+        if self._en_passant is not None:
+            self._hash ^= EN_PASSANT_KEYS[self._en_passant & 7]
+        if target is not None:
+            self._hash ^= EN_PASSANT_KEYS[target & 7]
+        self._en_passant = target
+
+    def _zobrist(self):
+        """
+        Calculates the Zobrist hash of the position from scratch.
+        """
+        zobrist = CASTLING_KEYS[self._castling]
+        for index in iter_bits(self._all_occupied()):
+            zobrist ^= PIECE_KEYS[self._mailbox[index].code][index]
+        if self._current_player is Color.BLACK:
+            zobrist ^= BLACK_TO_MOVE
+        if self._en_passant is not None:
+            zobrist ^= EN_PASSANT_KEYS[self._en_passant & 7]
+        return zobrist
+
+    def _piece_squares(self):
+        """
+        Calculates the packed piece-square score and the phase of the position from scratch.
+
+        Returns -- A tuple (piece_square, phase), see chess.piece_square
+        """
+        piece_square = phase = 0
+        for index in iter_bits(self._all_occupied()):
+            code = self._mailbox[index].code
+            piece_square += PIECE_SQUARES[code][index]
+            phase += PHASES[code]
+        return piece_square, phase
+
     def square(self, square_name=None, x=None, y=None):
         """
         Returns the square on a chess board.
@@ -102,12 +366,20 @@ class Board(object):
         The square can be by specifying EITHER the name of the square OR the x, y coordinates.
         If both are specified then this method raises an exception.
 
+        The square returned is a snapshot, changing its piece does not change the board.
         """
 
-        key = Square(square_name=square_name, x=x, y=y).name
-        square = self._all_squares.get(key, None)
+        if square_name is None:
+            index = coords_index(x, y)
+            if index is None:
+                raise InvalidSquareException(
+                    u"The square ({x}, {y}), does not exist on a chess board.".format(x=x, y=y))
+        elif x is not None or y is not None:
+            raise InvalidSquareException(u"Only square_name or x,y coords should be defined")
+        else:
+            index = square_index(square_name)
 
-        return square
+        return Square.from_index(index, self._mailbox[index])
 
     # TODO: replace with calls to square('x0').piece ???
     def get_piece(self, from_):
@@ -116,24 +388,213 @@ class Board(object):
 
         from_ -- the name of the square, e.g A3, or H7
         """
-        return self.square(from_).piece
+        return self._mailbox[square_index(from_)]
 
-    def is_check(self, color):
+    def _put(self, index, piece):
         """
-        Checks whether the player of 'color' is in check
+        Places a piece on an empty square, keeping the mailbox, bitboards, material and piece-square score in sync.
 
-        color -- The color of the player to test if they are in check
+        index -- The index of the square, see chess.bitboard
+        piece -- The piece to place
+        """
+        bit = BITS[index]
+        side = piece.code // 6
+        self._mailbox[index] = piece
+        self._bitboards[piece.code] |= bit
+        self._occupied[side] |= bit
+        self._material[side] += piece.value
+        self._piece_square += PIECE_SQUARES[piece.code][index]
+        self._phase += PHASES[piece.code]
+        self._hash ^= PIECE_KEYS[piece.code][index]
+        self._pins = None
+        self._dirty |= bit
 
-        Returns -- True or False
+    def _remove(self, index):
+        """
+        Removes the piece on a square, keeping the mailbox, bitboards, material and piece-square score in sync.
+
+        index   -- The index of the square, see chess.bitboard
+        returns -- The piece removed or None if the square was empty
+        """
+        piece = self._mailbox[index]
+        if piece is not None:
+            mask = FULL ^ BITS[index]
+            side = piece.code // 6
+            self._mailbox[index] = None
+            self._bitboards[piece.code] &= mask
+            self._occupied[side] &= mask
+            self._material[side] -= piece.value
+            self._piece_square -= PIECE_SQUARES[piece.code][index]
+            self._phase -= PHASES[piece.code]
+            self._hash ^= PIECE_KEYS[piece.code][index]
+            self._pins = None
+            self._dirty |= BITS[index]
+        return piece
+
+    def _all_occupied(self):
+        """
+        Returns the bitboard of all occupied squares
+        """
+        return self._occupied[WHITE] | self._occupied[BLACK]
+
+    def _king_index(self, side):
         """
+        Returns the index of the square containing the king of side
+        """
+        return lsb(self._bitboards[KING + 6 * side])
+
+    def _attackers_to(self, index, side, occupied):
+        """
+        Returns the bitboard of the pieces of side that attack the square at index.
+
+        index    -- The index of the square being attacked
+        side     -- The side of the attacking pieces, WHITE or BLACK
+        occupied -- The occupied squares that block sliding pieces. Usually every occupied square, but a piece can be
+                    removed to see what it is hiding.
+        """
+        bitboards = self._bitboards
+        offset = 6 * side
+        queens = bitboards[QUEEN + offset]
 
-        square_name = self._king_location[color]
+        attackers = KNIGHT_ATTACKS[index] & bitboards[KNIGHT + offset]
+        attackers |= KING_ATTACKS[index] & bitboards[KING + offset]
+        # The pawns that attack a square are found where a pawn of the other side would attack from the square
+        attackers |= PAWN_ATTACKS[1 - side][index] & bitboards[PAWN + offset]
+        attackers |= rook_attacks(index, occupied) & (bitboards[ROOK + offset] | queens)
+        attackers |= bishop_attacks(index, occupied) & (bitboards[BISHOP + offset] | queens)
+        return attackers
+
+    def _is_attacked(self, index, side, occupied):
+        """
+        Returns True if any piece of side attacks the square at index. Unlike _attackers_to this stops at the first
+        attacker found, checking the cheapest pieces first.
 
-        enemy_color = color.inverse()
-        if len(self._get_attackers(square_name, enemy_color)) > 0:
+        index    -- The index of the square being attacked
+        side     -- The side of the attacking pieces, WHITE or BLACK
+        occupied -- The occupied squares that block sliding pieces
+        """
+        bitboards = self._bitboards
+        offset = 6 * side
+        if PAWN_ATTACKS[1 - side][index] & bitboards[PAWN + offset]:
+            return True
+        if KNIGHT_ATTACKS[index] & bitboards[KNIGHT + offset]:
             return True
+        if KING_ATTACKS[index] & bitboards[KING + offset]:
+            return True
+
+        # A rook, bishop or queen in line with the square attacks it if nothing is in between
+        queens = bitboards[QUEEN + offset]
+        snipers = ROOK_RAYS[index] & (bitboards[ROOK + offset] | queens)
+        snipers |= BISHOP_RAYS[index] & (bitboards[BISHOP + offset] | queens)
+        between = BETWEEN[index]
+        while snipers:
+            sniper = snipers & -snipers
+            if not between[sniper.bit_length() - 1] & occupied:
+                return True
+            snipers ^= sniper
         return False
 
+    def _king_safety(self, side):
+        """
+        Returns the checks and pins on the king of side, a tuple of the bitboard of the enemy pieces giving check, the
+        bitboard of the pieces of side that are pinned and a dictionary from the index of each pinned piece to the
+        squares it can still move to, those between the king and the pinning piece and the pinning piece itself.
+
+        These are found in one pass along the rays from the king and kept until a piece is moved or removed, so
+        generating the moves of one piece after another, as get_moves and display_json do, finds them only once.
+        """
+        pins = self._pins
+        if pins is None:
+            pins = self._pins = [None, None]
+        safety = pins[side]
+        if safety is None:
+            enemy = 1 - side
+            bitboards = self._bitboards
+            own = self._occupied[side]
+            occupied = own | self._occupied[enemy]
+            king = self._king_index(side)
+            checkers = self._attackers_to(king, enemy, occupied)
+
+            # A piece is pinned if it is the only piece between the king and an enemy rook, bishop or queen
+            pinned = 0
+            pin_lines = {}
+            enemy_queens = bitboards[QUEEN + 6 * enemy]
+            snipers = ROOK_RAYS[king] & (bitboards[ROOK + 6 * enemy] | enemy_queens)
+            snipers |= BISHOP_RAYS[king] & (bitboards[BISHOP + 6 * enemy] | enemy_queens)
+            for sniper in iter_bits(snipers):
+                blockers = BETWEEN[king][sniper] & occupied
+                if blockers and not blockers & (blockers - 1) and blockers & own:
+                    pinned |= blockers
+                    pin_lines[lsb(blockers)] = BETWEEN[king][sniper] | BITS[sniper]
+            safety = pins[side] = (checkers, pinned, pin_lines)
+        return safety
+
+    def is_square_attacked(self, square_name, color):
+        """
+        Checks whether any piece of the player of 'color' attacks a square
+
+        square_name -- The name of the square, e.g 'E4'
+        color       -- The color of the attacking player
+
+        Returns -- True or False
+        """
+        return self._is_attacked(square_index(square_name), SIDES[color], self._all_occupied())
+
+    def attack_map(self, color, attackers=False):
+        """
+        Returns the squares attacked by the pieces of 'color', found in one pass over their pieces rather than by
+        looking for the attackers of each square. Squares holding the player's own pieces are included, the pieces
+        attacking them are defending them.
+
+        color     -- The color of the attacking player
+        attackers -- If True, returns the names of the squares of the attacking pieces rather than how many there are
+
+        Returns -- A dictionary from the name of each attacked square to the number of attackers, or a set of the
+                   squares they are on
+        """
+        attack_map = {}
+        for from_index, targets in self._piece_attacks(SIDES[color]):
+            for index in iter_bits(targets):
+                square_name = SQUARE_NAMES[index]
+                if attackers:
+                    attack_map.setdefault(square_name, set([])).add(SQUARE_NAMES[from_index])
+                else:
+                    attack_map[square_name] = attack_map.get(square_name, 0) + 1
+        return attack_map
+
+    def _piece_attacks(self, side):
+        """
+        Yields the index of each piece of side and the bitboard of the squares it attacks. Like _attackers_to, pinned
+        pieces still attack and pawns only attack the squares they capture on.
+        """
+        occupied = self._all_occupied()
+        mailbox = self._mailbox
+        for index in iter_bits(self._occupied[side]):
+            kind = mailbox[index].kind
+            if kind == PAWN:
+                yield index, PAWN_ATTACKS[side][index]
+            elif kind == KNIGHT:
+                yield index, KNIGHT_ATTACKS[index]
+            elif kind == BISHOP:
+                yield index, bishop_attacks(index, occupied)
+            elif kind == ROOK:
+                yield index, rook_attacks(index, occupied)
+            elif kind == QUEEN:
+                yield index, rook_attacks(index, occupied) | bishop_attacks(index, occupied)
+            else:
+                yield index, KING_ATTACKS[index]
+
+    def is_check(self, color):
+        """
+        Checks whether the player of 'color' is in check
+
+        color -- The color of the player to test if they are in check
+
+        Returns -- True or False
+        """
+        side = SIDES[color]
+        return self._is_attacked(self._king_index(side), 1 - side, self._all_occupied())
+
     def is_checkmate(self, color):
         """
         Checks whether the player of 'color' has been checkmated
@@ -143,48 +604,305 @@ class Board(object):
         Returns True or False
         """
 
-        king_loc = self._king_location[color]
-        blocking_square_names, enemy_square_name = self._get_blocking_squares(color)
-        if blocking_square_names is None:
+        if not self.is_check(color):
             # Not under attack
             return False
-        if len(self.get_moves(king_loc, False)) > 0:
-            # Can move king to safety
+
+        return not self.has_legal_move(color)
+
+    def has_legal_move(self, color):
+        """
+        Returns True if the player of 'color' can legally move any of their pieces. This stops at the first legal
+        move found, the king's moves are tried first.
+
+        color -- The color of the player
+        """
+        for _ in self._legal_moves(SIDES[color], FULL):
+            return True
+        return False
+
+    def legal_moves(self, color):
+        """
+        Yields every legal move the player of 'color' can make, as compact moves (see chess.move).
+
+        Castling, en passant and each of the pieces a pawn can be promoted to are included. The king's safety (check
+        and pinned pieces) is worked out once for the position rather than once per piece.
+
+        color -- The color of the player to generate the moves for
+        """
+        return self._legal_moves(SIDES[color], FULL)
+
+    def is_legal(self, from_, to_):
+        """
+        Checks whether the current player can move the piece on one square to another, without generating the other
+        moves of the piece. A pawn moved to the end row is legal, the piece it is promoted to is chosen afterwards.
+
+        from_ -- The name of the square to move the piece from, e.g 'E2'
+        to_   -- The name of the square to move the piece to, e.g 'E4'
+
+        Returns -- True or False
+        """
+        from_index = SQUARE_INDEX.get(from_.upper())
+        to_index = SQUARE_INDEX.get(to_.upper())
+        if from_index is None or to_index is None:
             return False
+        return self._legal_move(from_index, to_index) is not None
+
+    def _legal_move(self, from_index, to_index):
+        """
+        Returns the compact move of the current player's piece from one square to another, or None if it is not legal.
+        Moving a pawn to the end row is returned as a quiet move or capture, without a promotion.
+
+        The move is checked in three steps: that the piece can reach the square, that the king is safe once it has
+        moved (which covers pinned pieces and getting out of check), then the rules for castling and en passant.
+        """
+        piece = self._mailbox[from_index]
+        side = SIDES[self._current_player]
+        if piece is None or piece.code // 6 != side:
+            return None
+        enemy = 1 - side
+        own = self._occupied[side]
+        their = self._occupied[enemy]
+        occupied = own | their
+        to_bit = BITS[to_index]
+        if own & to_bit:
+            return None
+        flags = CAPTURE if their & to_bit else QUIET
+        captured_bit = to_bit
+
+        kind = piece.kind
+        if kind == KING:
+            if not KING_ATTACKS[from_index] & to_bit:
+                if self._castle_targets(from_index, side, occupied) & to_bit:
+                    return compact_move(from_index, to_index, KING_CASTLE if to_index > from_index else QUEEN_CASTLE)
+                return None
+            # The king may not move into check, even to a square hidden behind him by an attacker
+            if self._is_attacked(to_index, enemy, occupied ^ BITS[from_index]):
+                return None
+            return compact_move(from_index, to_index, flags)
+
+        if kind == PAWN:
+            pushes = PAWN_PUSHES[side]
+            if PAWN_ATTACKS[side][from_index] & to_bit:
+                if flags == QUIET:
+                    en_passant = self._en_passant_capture()
+                    if en_passant is None or en_passant[0] != to_index or \
+                            self._mailbox[en_passant[1]].code // 6 != enemy:
+                        return None
+                    flags = EN_PASSANT
+                    captured_bit = BITS[en_passant[1]]
+            elif flags == CAPTURE:
+                return None
+            elif pushes[from_index] & to_bit:
+                pass
+            elif pushes[from_index] & ~occupied and pushes[lsb(pushes[from_index])] & to_bit and \
+                    BITS[from_index] & (RANK_2 if side == WHITE else RANK_7):
+                flags = DOUBLE_PAWN_PUSH
+            else:
+                return None
+        elif kind == KNIGHT:
+            if not KNIGHT_ATTACKS[from_index] & to_bit:
+                return None
         else:
-            if blocking_square_names is set([]):
-                # Cannot block, cannot move king, checkmate
-                return True
+            rays = ROOK_RAYS if kind == ROOK else BISHOP_RAYS if kind == BISHOP else None
+            line = LINES[from_index][to_index]
+            if line is None or (rays is not None and not rays[from_index] & to_bit):
+                return None
+            if BETWEEN[from_index][to_index] & occupied:
+                return None
+
+        checkers, pinned, pin_lines = self._king_safety(side)
+        if flags != EN_PASSANT and not checkers:
+            # Only a pinned piece can leave the king in check, by leaving the line of its pin
+            if pinned & BITS[from_index] and not pin_lines[from_index] & to_bit:
+                return None
+            return compact_move(from_index, to_index, flags)
+
+        # The king must not be left in check, a captured piece no longer attacks it
+        after = (occupied ^ BITS[from_index] ^ (captured_bit & their)) | to_bit
+        if self._attackers_to(self._king_index(side), enemy, after) & ~captured_bit:
+            return None
+        return compact_move(from_index, to_index, flags)
+
+    def _legal_moves(self, side, sources):
+        """
+        Yields the legal compact moves of side for the pieces on the squares in the sources bitboard.
+        """
+        enemy = 1 - side
+        bitboards = self._bitboards
+        offset = 6 * side
+        own = self._occupied[side]
+        their = self._occupied[enemy]
+        occupied = own | their
+        king = self._king_index(side)
+
+        # The king moves first, he may not move into check, even to a square hidden behind him by an attacker
+        if sources & BITS[king]:
+            without_king = occupied ^ BITS[king]
+            for to_index in iter_bits(KING_ATTACKS[king] & ~own):
+                if not self._is_attacked(to_index, enemy, without_king):
+                    yield compact_move(king, to_index, CAPTURE if their & BITS[to_index] else QUIET)
+            castles = self._castle_targets(king, side, occupied)
+            for to_index in iter_bits(castles):
+                yield compact_move(king, to_index, KING_CASTLE if to_index > king else QUEEN_CASTLE)
+
+        checkers, pinned, pin_lines = self._king_safety(side)
+        if checkers & (checkers - 1):
+            # Double check, only the king can move
+            return
+        if checkers:
+            # Other pieces must capture the checking piece or block it
+            targets = checkers | BETWEEN[king][lsb(checkers)]
+        else:
+            targets = FULL
+
+        movable = ~own & targets
+        for from_index in iter_bits(sources & own & ~bitboards[KING + offset] & ~bitboards[PAWN + offset]):
+            kind = self._mailbox[from_index].kind
+            if kind == KNIGHT:
+                if pinned & BITS[from_index]:
+                    continue  # A pinned knight can never move
+                destinations = KNIGHT_ATTACKS[from_index]
+            elif kind == BISHOP:
+                destinations = bishop_attacks(from_index, occupied)
+            elif kind == ROOK:
+                destinations = rook_attacks(from_index, occupied)
             else:
-                # Check if we can capture attacker
-                our_attacker_square_names = self._get_attackers(enemy_square_name, color)
-                for name in our_attacker_square_names:  # If we have any...
-                    square = self.square(name)
-                    if isinstance(square.piece, King):
-                        # If it's the king then since we know we can't
-                        # legally move, ignore
-                        continue
-                    elif self._pinned(name) is None:
-                        # Can capture the piece putting the king incheck
-                        return False
-                    else:
-                        # Can't be pinned by piece causing check
-                        # Therefore moving this piece is of no value
-                        continue
-
-                # Check if we can block
-                for square in blocking_square_names:
-                    # Find all of our pieces that can move into one of these squares
-                    blocking_piece_locs = self._get_attackers(square, color, True)
-                    for blocker_loc in blocking_piece_locs:
-                        # We can't use the king to block itself
-                        if king_loc != blocker_loc:
-                            # Can block, not checkmate
-                            return False
-
-                # Can't move, and can't capture, checkmate
+                destinations = rook_attacks(from_index, occupied) | bishop_attacks(from_index, occupied)
+            destinations &= movable
+            if pinned & BITS[from_index]:
+                destinations &= pin_lines[from_index]
+            for to_index in iter_bits(destinations):
+                yield compact_move(from_index, to_index, CAPTURE if their & BITS[to_index] else QUIET)
+
+        empty = FULL ^ occupied
+        last_row = RANK_8 if side == WHITE else RANK_1
+        start_row = RANK_2 if side == WHITE else RANK_7
+        pushes = PAWN_PUSHES[side]
+        for from_index in iter_bits(sources & bitboards[PAWN + offset]):
+            allowed = targets
+            if pinned & BITS[from_index]:
+                allowed &= pin_lines[from_index]
+
+            single = pushes[from_index] & empty
+            destinations = single & allowed
+            if single and BITS[from_index] & start_row:
+                double = pushes[lsb(single)] & empty & allowed
+                if double:
+                    yield compact_move(from_index, lsb(double), DOUBLE_PAWN_PUSH)
+            destinations |= PAWN_ATTACKS[side][from_index] & their & allowed
+
+            for to_index in iter_bits(destinations):
+                capture = their & BITS[to_index] != 0
+                if BITS[to_index] & last_row:
+                    for kind in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        yield promotion_move(from_index, to_index, kind, capture)
+                else:
+                    yield compact_move(from_index, to_index, CAPTURE if capture else QUIET)
+
+        en_passant = self._en_passant_capture()
+        if en_passant is not None:
+            to_index, captured_index = en_passant
+            if self._mailbox[captured_index].code // 6 == enemy:
+                for from_index in iter_bits(PAWN_ATTACKS[enemy][to_index] & bitboards[PAWN + offset] & sources):
+                    # Two pawns leave their squares at once, so simply check the king is safe once the move is made
+                    after = (occupied ^ BITS[from_index] ^ BITS[captured_index]) | BITS[to_index]
+                    if not self._attackers_to(king, enemy, after) & ~BITS[captured_index]:
+                        yield compact_move(from_index, to_index, EN_PASSANT)
+
+    def _moves_by_square(self, color):
+        """
+        Returns a dictionary of the square names of the pieces of 'color' to two sets of square names, the moves and
+        attacks the piece can make.
+
+        Every piece of the player is included, even those that cannot move. The sets are cached, they must not be
+        changed.
+        """
+        side = SIDES[color]
+        entries = self._cached_moves(side, FULL)
+        return dict((SQUARE_NAMES[index], entries[index]) for index in iter_bits(self._occupied[side]))
+
+    def _cached_moves(self, side, sources):
+        """
+        Returns a dictionary from the index of each piece of side on the squares in the sources bitboard to two sets of
+        the names of the squares it can move to, the moves and the attacks. The dictionary may hold other pieces too,
+        neither it nor the sets must be changed.
+
+        The moves are kept between calls, so the UI asking for the moves of every piece after each move only
+        generates the moves of the pieces the move could have affected, see _clean_move_cache. All of a side's moves
+        are generated again if the checks or pins on its king or the en passant square change. The moves are kept as
+        square names, as that is how the UI asks for them.
+        """
+        if self._dirty:
+            self._clean_move_cache()
+        safety = self._king_safety(side)
+        cache = self._move_cache[side]
+        if cache is None or cache[0] != safety or cache[1] != self._en_passant:
+            cache = self._move_cache[side] = (safety, self._en_passant, {})
+        entries = cache[2]
+
+        missing = 0
+        for index in iter_bits(sources & self._occupied[side]):
+            if index not in entries:
+                entries[index] = set([]), set([])
+                missing |= BITS[index]
+        if missing:
+            their = self._occupied[1 - side]
+            for move in self._legal_moves(side, missing):
+                to_index = move >> 6 & 63
+                moves, attacks = entries[move & 63]
+                if their & BITS[to_index] or move >> 12 == EN_PASSANT:
+                    attacks.add(SQUARE_NAMES[to_index])
+                else:
+                    moves.add(SQUARE_NAMES[to_index])
+        return entries
 
-                return True
+    def _adopt_move_cache(self, board):
+        """
+        Takes a copy of the cached moves of another board with the same position, such as one kept from an earlier
+        request for the same game, so they are not generated again. Nothing is taken if the positions differ.
+
+        board -- The board to take the cached moves from, it is not changed
+        """
+        if board == self:
+            self._move_cache = [None if cache is None else (cache[0], cache[1], dict(cache[2]))
+                                for cache in board._move_cache]
+            self._dirty = board._dirty
+
+    def _clean_move_cache(self):
+        """
+        Drops the cached moves of the pieces whose moves may have changed since the squares in _dirty changed: pieces
+        on those squares, sliding pieces with a clear line to them, knights and pawns that reach them and the kings.
+        """
+        dirty = self._dirty
+        self._dirty = 0
+        # A square occupied before and after the changes blocks a sliding piece both times
+        blockers = self._all_occupied() & ~dirty
+        bitboards = self._bitboards
+        for side, cache in enumerate(self._move_cache):
+            if cache is None:
+                continue
+            offset = 6 * side
+            queens = bitboards[QUEEN + offset]
+            rooks = bitboards[ROOK + offset] | queens
+            bishops = bitboards[BISHOP + offset] | queens
+            pawns = bitboards[PAWN + offset]
+            behind = PAWN_PUSHES[1 - side]
+
+            stale = dirty | bitboards[KING + offset]
+            for index in iter_bits(dirty):
+                stale |= KNIGHT_ATTACKS[index] & bitboards[KNIGHT + offset]
+                reached_from = PAWN_ATTACKS[1 - side][index] | behind[index]
+                if behind[index]:
+                    reached_from |= behind[lsb(behind[index])]
+                stale |= reached_from & pawns
+                for slider in iter_bits((ROOK_RAYS[index] & rooks) | (BISHOP_RAYS[index] & bishops)):
+                    if not BETWEEN[slider][index] & blockers:
+                        stale |= BITS[slider]
+
+            entries = cache[2]
+            for index in iter_bits(stale):
+                entries.pop(index, None)
 
     def is_stalemate(self, color):
         """
@@ -193,128 +911,110 @@ class Board(object):
         color -- The color of the player to check for stalemate
 
         """
-        # Check that at least one player has a pawn or more than 3 points
-        # color = self.current_player
-
-        has_pawn = False
-        white_score = 0
-        black_score = 0
-        for square in self._all_squares:
-            piece = self._all_squares[square].piece
-            if piece is None:
-                continue
-            if isinstance(piece, Pawn):
-                has_pawn = True
-            if piece.color == Color.WHITE:
-                white_score += piece.value
-            elif piece.color == Color.BLACK:
-                black_score += piece.value
-            else:
-                raise ValueError()
-
-        if black_score <= 3 and white_score <= 3 and not has_pawn:
+        if self.is_insufficient_material():
             # Neither player can checkmate
             return True
 
         # Check whether the 'color' player can move any of their pieces
-        for square in self._all_squares:
-            piece = self._all_squares[square].piece
-            if piece is None:
-                continue
-            elif piece.color == color:
-                if len(self.get_moves(square, False)) != 0:
-                    # This player can move
-                    return False
+        return not self.has_legal_move(color)
+
+    def material(self, color):
+        """
+        Returns the total value of a player's pieces, e.g 39 at the start of a game. It is kept up to date as pieces
+        are captured and pawns promoted, so this does not count the pieces.
+
+        color -- The color of the player
+        """
+        return self._material[SIDES[color]]
+
+    def is_insufficient_material(self):
+        """
+        Returns True if neither player has a pawn or more than 3 points of material, so neither can checkmate.
+        """
+        if self._bitboards[PAWN] | self._bitboards[PAWN + 6]:
+            # Pawns can be promoted, the usual case, no need to count the material
+            return False
+        return self._material[WHITE] <= 3 and self._material[BLACK] <= 3
+
+    def _end_turn(self):
+        """
+        Finishes the current player's turn once their move is complete, including promoting a pawn. Checkmate and
+        stalemate are only looked for when the opponent has no legal move or too little material is left, so
+        for most moves this is one check test and finding a single legal move.
+
+        Returns -- A tuple (is_check, is_checkmate, is_stalemate) for the opponent
+        """
+        opponent_color = self.current_player.inverse()
+        is_check = self.is_check(opponent_color)
+        is_checkmate = False
+        is_stalemate = False
+        if not self.has_legal_move(opponent_color):
+            if is_check:
+                is_checkmate = True
+            else:
+                is_stalemate = True
+        elif self.is_insufficient_material():
+            is_stalemate = True
+
+        if is_checkmate:
+            self.winner = Winner.from_color(self.current_player)
+        elif is_stalemate:
+            self.winner = Winner.DRAW
         else:
-            # This player cannot move -> stalemate
-            return True
+            self.current_player = opponent_color
+        return is_check, is_checkmate, is_stalemate
 
     def _get_castle_moves(self, from_):
         """
         Returns the locations the king located at from_square can castle to.
 
+        The king cannot castle out of check, or through or into a square that is attacked. The squares between the
+        king and the rook must be empty.
+
         from_ -- The location of the king
         """
         assert(len(from_) == 2)
-        king_square = self.square(from_)
-        king = king_square.piece
+        index = square_index(from_)
+        king = self._mailbox[index]
 
-        left_rook = self.square(x=1, y=king_square.y).piece
-        right_rook = self.square(x=8, y=king_square.y).piece
+        if not isinstance(king, King):
+            return set([])
 
-        moves = set([])
-        if king is None or king.has_moved is True:
-            return moves
+        return square_names(self._castle_targets(index, king.code // 6, self._all_occupied()))
 
-        enemy_color = king.color.inverse()
+    def _castle_targets(self, index, side, occupied):
+        """
+        Returns the bitboard of the squares the king of side, on the square at index, can castle to.
+        """
+        enemy = 1 - side
+        rights = self._castling & (_KING_SIDE[side] | _QUEEN_SIDE[side])
+        if index != _KING_HOMES[side] or not rights:
+            return 0
 
+        if self._is_attacked(index, enemy, occupied):
+            # Cannot castle out of check
+            return 0
+
+        targets = 0
         # Castling left?
-        if isinstance(left_rook, Rook) and left_rook.color == king.color and left_rook.has_moved is False:
-            left_square_4 = self.square(x=4, y=king_square.y)
-            left_square_3 = self.square(x=3, y=king_square.y)
-            left_square_2 = self.square(x=2, y=king_square.y)
+        if rights & _QUEEN_SIDE[side]:
             # Empty squares
-            if left_square_4.piece is None:
-                if left_square_3.piece is None:
-                    if left_square_2.piece is None:
-                        # With no attackers?
-                        if self._get_attackers(left_square_2.name, enemy_color) == set([]):
-                            if self._get_attackers(left_square_3.name, enemy_color) == set([]):
-                                if self._get_attackers(left_square_4.name, enemy_color) == set([]):
-                                    moves.add(left_square_3.name)
+            if not occupied & (BITS[index - 1] | BITS[index - 2] | BITS[index - 3]):
+                # With no attackers?
+                if not self._is_attacked(index - 1, enemy, occupied):
+                    if not self._is_attacked(index - 2, enemy, occupied):
+                        targets |= BITS[index - 2]
 
         # Castling right?
-        if isinstance(right_rook, Rook) and right_rook.color == king.color and right_rook.has_moved is False:
-        # if right_rook is not None and right_rook.has_moved is False:
-            right_square_6 = self.square(x=6, y=king_square.y)
-            right_square_7 = self.square(x=7, y=king_square.y)
+        if rights & _KING_SIDE[side]:
             # Empty squares
-            if right_square_6.piece is None:
-                if right_square_7.piece is None:
-                    # With no attackers?
-                    if self._get_attackers(right_square_6.name, enemy_color) == set([]):
-                        if self._get_attackers(right_square_7.name, enemy_color) == set([]):
-                            moves.add(right_square_7.name)
-
-        return moves
+            if not occupied & (BITS[index + 1] | BITS[index + 2]):
+                # With no attackers?
+                if not self._is_attacked(index + 1, enemy, occupied):
+                    if not self._is_attacked(index + 2, enemy, occupied):
+                        targets |= BITS[index + 2]
 
-    def _is_castle_right(self, from_, to_):
-        """
-        Returns True if the move is to castle right.
-
-        Castling is preformed by first moving the king two squares in the
-        direction to castle. The castling rook is then moved to the other
-        side of the king. This method returns True if the King has been
-        moved two squares to the right, or False otherwise.
-        """
-        king_square = self.square(from_)
-        to_square = self.square(to_)
-
-        if isinstance(king_square.piece, King):
-            if king_square.piece.has_moved is False:
-                if to_square.x - king_square.x == 2:
-                    if king_square.y == to_square.y:
-                        return True
-        return False
-
-    def _is_castle_left(self, from_, to_):
-        """
-        Returns True if the move is to castle left.
-
-        Castling is preformed by first moving the king two squares in the
-        direction to castle. The castling rook is then moved to the other
-        side of the king. This method returns True if the King has been
-        moved two squares to the right, or False otherwise.
-        """
-        king_square = self.square(from_)
-        to_square = self.square(to_)
-
-        if isinstance(king_square.piece, King):
-            if king_square.piece.has_moved is False:
-                if to_square.x - king_square.x == -2:
-                    if king_square.y == to_square.y:
-                        return True
-        return False
+        return targets
 
     def move_piece(self, from_, to_):
         """
@@ -333,8 +1033,8 @@ class Board(object):
         if self.is_promote_phase():
             raise PromotePieceException(u"Cannot move piece, previously moved pawn must be promoted first.")
 
-        legal_moves = self.get_moves(from_)
-        piece = self.square(from_).piece
+        from_index = square_index(from_)
+        piece = self._mailbox[from_index]
 
         if piece is None:
             raise EmptySquareException(u"Cannot move piece, the square is empty.")
@@ -351,72 +1051,37 @@ class Board(object):
                 message = u"Cannot move piece, the game is over, {winner} won".format(winner=self.winner)
             raise GameOverException(message)
 
-        if to_.upper() in legal_moves:  # to_square.name is uppercase while to_name could be any case
-            is_queen_side_castle = False
-            is_king_side_castle = False
-
-            if self._is_en_passant_attack(from_):
-                # Remove the pawn that moved previously as it has been captured via en passant
-                self.square(self.previous_move.to_loc).piece = None
-            elif self._is_castle_left(from_, to_):
-                # Move the rook too
-                from_square = self.square(from_)
-                rook = self.square(x=1, y=from_square.y).pop()
-                self.square(x=4, y=from_square.y).piece = rook
-                is_queen_side_castle = True
-            elif self._is_castle_right(from_, to_):
-                # Move the rook too
-                from_square = self.square(from_)
-                rook = self.square(x=8, y=from_square.y).pop()
-                self.square(x=6, y=from_square.y).piece = rook
-                is_king_side_castle = True
-
-            # Keep track of where the king is
-            if isinstance(piece, King):
-                self._king_location[piece.color] = to_
-
-            is_double_move = False  # Marks if a pawn is vulnerable to en passant
-            if isinstance(piece, Pawn):
-                if abs(self.square(from_).y - self.square(to_).y) == 2:  # The pawn moved two squares
-                    is_double_move = True
-                # Keep track of 50 move stalemate
-                self.stalemate_count = 0
-
-                # If pawn moves into end zone, it needs to be promoted
-                if self.square(to_).y == 1 or self.square(to_).y == 8:
-                    self.promote_pawn_location = to_
-
-            if self.square(to_).piece is None:
-                is_capture = False  # Moved into an empty square, append regular move
-                self.stalemate_count += 1
-            else:
-                is_capture = True  # Captured an enemy piece, mark as a capture
-                self.stalemate_count = 0
+        to_ = to_.upper()  # to_square.name is uppercase while to_name could be any case
+        to_index = SQUARE_INDEX.get(to_)
+        move = self._legal_move(from_index, to_index) if to_index is not None else None
 
-            # Finally move the piece
-            self.square(to_).piece = self.square(from_).pop()
-            self.square(to_).piece.has_moved = True
+        if move is not None:
+            # Pawns moved into the end zone are promoted separately by promote_pawn
+            flags = move >> 12
+            if piece.kind == PAWN and BITS[to_index] & (RANK_1 | RANK_8):
+                self.promote_pawn_location = to_
 
-            # Do not change player if the current player still needs to promote their pawn
-            opponent_color = self.current_player.inverse()
+            position = self._hash
+            self._make_move(compact_move(from_index, to_index, flags))
+            self._record_position(position)
 
-            # Get informatation about current board for recording the move taken
-            is_check = self.is_check(opponent_color)
-            is_checkmate = self.is_checkmate(opponent_color)
-            is_stalemate = self.is_stalemate(opponent_color)
+            is_double_move = flags == DOUBLE_PAWN_PUSH  # Marks if a pawn is vulnerable to en passant
+            is_capture = flags & CAPTURE != 0
+            is_king_side_castle = flags == KING_CASTLE
+            is_queen_side_castle = flags == QUEEN_CASTLE
 
             if self.promote_pawn_location is None:
-
-                if is_checkmate:
-                    self.winner = Winner.from_color(self.current_player)
-                elif is_stalemate:
-                    self.winner = Winner.DRAW
-                else:
-                    self.current_player = self.current_player.inverse()
+                # Get informatation about current board for recording the move taken
+                is_check, is_checkmate, is_stalemate = self._end_turn()
 
                 display_value = None  # TODO: Figure this out ...
                 promotion = None
             else:
+                # Do not change player if the current player still needs to promote their pawn. Checkmate and
+                # stalemate depend on the piece chosen, they are found once the pawn is promoted.
+                is_check = self.is_check(self.current_player.inverse())
+                is_checkmate = False
+                is_stalemate = False
                 promotion = "?"
                 display_value = None  # TODO: Figure this out ...
 
@@ -424,24 +1089,163 @@ class Board(object):
                                       is_queen_side_castle, is_check, is_checkmate, is_stalemate, promotion, display_value)
 
             # These data structures must be kept in sync
-            assert isinstance(self.square(self._king_location[Color.BLACK]).piece, BlackKing)
-            assert isinstance(self.square(self._king_location[Color.WHITE]).piece, WhiteKing)
+            assert isinstance(self.get_piece(self._king_location[Color.BLACK]), BlackKing)
+            assert isinstance(self.get_piece(self._king_location[Color.WHITE]), WhiteKing)
 
             return
 
         # Fall through error
         raise IllegalMoveException(u"Move of '{0}' from {1} to {2} is not legal.".format(piece, from_, to_))
 
-    # def _generate_move(self, from_, to_):
-    #     """
-    #     Creates an object that is the representation of a move. This is consistent with algrebraic notation.
-    #     """
-    #     square = self.square(from_)
-    #     piece = square.piece
-    #     row = square.row
-    #     column = row.column
+    def make_move(self, move):
+        """
+        Makes a compact move, such as those from legal_moves, so that it can be taken back by unmake_move.
+
+        The move is expected to be legal, it is not checked. A pawn moved to the end row is promoted immediately to
+        the piece in the move. Unlike move_piece, the previous move, position history and winner are not updated, which
+        keeps this fast enough to look ahead many moves.
 
-    #     pass
+        move -- The compact move to make
+        """
+        # _make_move takes a private undo stack if it is shared with a copy, so the record is appended after it
+        record = self._make_move(move)
+        self._undo.append(record)
+        self.current_player = self.current_player.inverse()
+
+    def unmake_move(self):
+        """
+        Takes back the last move made by make_move, restoring the board to exactly how it was before the move.
+        """
+        if self._shared:
+            self._unshare()
+        move, piece, captured, castling, en_passant, stalemate_count, zobrist = self._undo.pop()
+        self.current_player = self.current_player.inverse()
+
+        from_index = move & 63
+        to_index = move >> 6 & 63
+        flags = move >> 12
+
+        self._remove(to_index)
+        self._put(from_index, piece)
+        if flags == KING_CASTLE:
+            self._put(from_index + 3, self._remove(from_index + 1))
+        elif flags == QUEEN_CASTLE:
+            self._put(from_index - 4, self._remove(from_index - 1))
+
+        if captured is not None:
+            if flags == EN_PASSANT:
+                self._put(to_index - 8 if to_index > from_index else to_index + 8, captured)
+            else:
+                self._put(to_index, captured)
+
+        if piece.kind == KING:
+            self._king_location[piece.color] = SQUARE_NAMES[from_index]
+        if piece.code >= 6:
+            self.fullmove_number -= 1
+
+        self._castling = castling
+        self._en_passant = en_passant
+        self.stalemate_count = stalemate_count
+        self._hash = zobrist
+
+    def _make_move(self, move):
+        """
+        Moves the pieces for a compact move and updates the castling rights, en passant square and the count of
+        moves towards the fifty move rule. The current player is not changed.
+
+        returns -- The undo record of the move, a tuple of the move, the piece moved, the piece captured (or None),
+                   and the castling rights, en passant square, stalemate_count and hash from before the move
+        """
+        if self._shared:
+            self._unshare()
+        from_index = move & 63
+        to_index = move >> 6 & 63
+        flags = move >> 12
+
+        zobrist = self._hash
+        piece = self._remove(from_index)
+        if flags == EN_PASSANT:
+            captured = self._remove(to_index - 8 if to_index > from_index else to_index + 8)
+        else:
+            captured = self._remove(to_index)
+        undo = (move, piece, captured, self._castling, self._en_passant, self.stalemate_count, zobrist)
+
+        if flags & PROMOTION:
+            self._put(to_index, PIECES[promotion_kind(move) + piece.code // 6 * 6])
+        else:
+            self._put(to_index, piece)
+
+        if flags == KING_CASTLE:
+            # Move the rook too
+            self._put(from_index + 1, self._remove(from_index + 3))
+        elif flags == QUEEN_CASTLE:
+            self._put(from_index - 1, self._remove(from_index - 4))
+
+        # Keep track of where the king is
+        if piece.kind == KING:
+            self._king_location[piece.color] = SQUARE_NAMES[to_index]
+
+        castling = self._castling & _CASTLING_KEPT[from_index] & _CASTLING_KEPT[to_index]
+        if castling != self._castling:
+            self._hash ^= CASTLING_KEYS[self._castling] ^ CASTLING_KEYS[castling]
+            self._castling = castling
+
+        if flags == DOUBLE_PAWN_PUSH:
+            self._set_en_passant(self._en_passant_target((from_index + to_index) // 2))
+        elif self._en_passant is not None:
+            self._set_en_passant(None)
+
+        # Keep track of 50 move stalemate
+        if piece.kind == PAWN or captured is not None:
+            self.stalemate_count = 0
+        else:
+            self.stalemate_count += 1
+        if piece.code >= 6:
+            self.fullmove_number += 1
+
+        return undo
+
+    @property
+    def position_history(self):
+        """
+        The hashes of the earlier positions in the game that could be repeated, oldest first. A pawn move or capture
+        can never be undone, so the history only goes back to the last of those moves. It is kept by move_piece, not
+        make_move, and can be set when loading a saved game.
+        """
+        return tuple(self._history)
+
+    @position_history.setter
+    def position_history(self, hashes):
+        self._history = list(hashes[-_HISTORY_LIMIT:])
+        self._repetitions = {}
+        for zobrist in self._history:
+            self._repetitions[zobrist] = self._repetitions.get(zobrist, 0) + 1
+
+    def _record_position(self, zobrist):
+        """
+        Adds the hash of the position a move was made from to the position history.
+        """
+        if self.stalemate_count == 0:
+            # A pawn was moved or a piece captured, none of the earlier positions can be reached again
+            del self._history[:]
+            self._repetitions.clear()
+            return
+
+        if len(self._history) == _HISTORY_LIMIT:
+            oldest = self._history.pop(0)
+            if self._repetitions[oldest] == 1:
+                del self._repetitions[oldest]
+            else:
+                self._repetitions[oldest] -= 1
+        self._history.append(zobrist)
+        self._repetitions[zobrist] = self._repetitions.get(zobrist, 0) + 1
+
+    def is_threefold_repetition(self):
+        u"""Returns True if the current position has been reached three times, with the same player to move, the same
+        castling rights and the same en passant square. The player to move *may choose* to call the game a draw:
+        http://en.wikipedia.org/wiki/Threefold_repetition
+        """
+        return self._repetitions.get(self._hash, 0) >= 2
 
     def is_fifty_move_stalemate(self):
         u"""Returns True if 50 consective moves have been taken by either
@@ -492,11 +1296,11 @@ class Board(object):
         if self.is_promote_phase() is False:
             raise IllegalPromotionException("Cannot promote pawn, no pawn has been moved into end row")
 
-        square = self._all_squares[self.promote_pawn_location]
-        pawn = square.piece
+        index = SQUARE_INDEX[self.promote_pawn_location]
+        pawn = self._mailbox[index]
 
         assert(isinstance(pawn, Pawn))    # Must be a pawn
-        assert(square.y == 8 or square.y == 1)  # Must be in the final row
+        assert(BITS[index] & (RANK_1 | RANK_8))  # Must be in the final row
 
         if (piece.color is not pawn.color):
             raise IllegalPromotionException(
@@ -505,9 +1309,12 @@ class Board(object):
             )
 
         if isinstance(piece, (Queen, Rook, Bishop, Knight)):
-            self._all_squares[self.promote_pawn_location].piece = piece
+            if self._shared:
+                self._unshare()
+            self._remove(index)
+            self._put(index, piece)
             self.promote_pawn_location = None  # Clear the promotion
-            self.current_player = self.current_player.inverse()  # Change turn to next player
+            self._end_turn()  # Change turn to next player, unless the promotion ended the game
         else:
             raise IllegalPromotionException("Cannot promote pawn to {piece}.".format(piece=piece))
 
@@ -537,119 +1344,44 @@ class Board(object):
         blocker -- If true, returns the locations of pawns that can move to to_ instead of attack it
         returns -- A set of strings representing each of the squares an attacker (or blocker) is located in
         """
-
-        # At the given square (to_) we imagine where we could attack with each
-        # of our pieces. If we use a knight as example, if any of the squares it
-        # can attack contain an enemy knight then that enemy knight is an attacker.
-        # If those squares contain any other piece then they are not. Likewise if
-        # we imagine a bishop at the location, any bishops or queen it can attack
-        # can also attack it. This is repeated for rooks, pawns, king and queen
-        # The piece in the squares that potentially attacks this one are checked
-        # for enemy pieces that can attack.
         assert(len(to_) == 2)
-        attackers = set([])
-
-        if color is Color.BLACK:
-            knight = WhiteKnight()
-            rook = WhiteRook()
-            bishop = WhiteBishop()
-            pawn = WhitePawn()
-            pawn_2 = BlackPawn()
-        elif color is Color.WHITE:
-            knight = BlackKnight()
-            rook = BlackRook()
-            bishop = BlackBishop()
-            pawn = BlackPawn()
-            pawn_2 = WhitePawn()
-
-        # Get the squares of any knights that can attack this square
-        dummy_moves, knight_square_names = self._get_knight_bishop_queen_rook_king_moves(knight, to_)
-        for name in knight_square_names:
-            square = self.square(name)
-            if isinstance(square.piece, Knight):
-                # Opponents knight - an attacker
-                attackers.add(name)
-
-        dummy_moves, rooks_or_queen_square_names = self._get_knight_bishop_queen_rook_king_moves(rook, to_)
-        for name in rooks_or_queen_square_names:
-            square = self.square(name)
-            if isinstance(square.piece, Rook) or isinstance(square.piece, Queen):
-                attackers.add(name)
-            elif isinstance(square.piece, King):
-                # King can only attack adjacent squares
-                if square.isAdjacent(to_):
-                    attackers.add(name)
-
-        dummy_moves, bishop_or_queen_square_names = self._get_knight_bishop_queen_rook_king_moves(bishop, to_)
-        for name in bishop_or_queen_square_names:
-            square = self.square(name)
-            if isinstance(square.piece, Bishop) or isinstance(square.piece, Queen):
-                attackers.add(name)
-            elif isinstance(square.piece, King):
-                # King can only attack adjacent squares
-                if square.isAdjacent(to_):
-                    attackers.add(name)
+        index = square_index(to_)
+        side = SIDES[color]
+        occupied = self._all_occupied()
 
+        attackers = self._attackers_to(index, side, occupied)
         if blocker:
-            pawn_square_names = self._get_pawn_move_to(pawn_2, to_)
-        else:
-            pawn_square_names = self._get_pawn_attacks(pawn, to_)
-        for name in pawn_square_names:
-            square = self.square(name)
-            if isinstance(square.piece, Pawn):
-                attackers.add(name)
+            pawns = self._bitboards[PAWN + 6 * side]
+            attackers &= ~pawns
+            attackers |= self._pawn_pushers(index, side, occupied)
 
-        return attackers
+        return square_names(attackers)
 
-    def _pinned(self, from_):
-        u"""Returns the location containing the piece that is pinning this one or None if not pinned.
-
-        from_  -- The square name to check if the piece inside is pinned,
+    def _pawn_pushers(self, index, side, occupied):
         """
+        Returns the bitboard of the pawns of side that can move forward (without capturing) to the square at index.
+        """
+        pawns = self._bitboards[PAWN + 6 * side]
+        # The square behind is found where a pawn of the other side would move to
+        behind = PAWN_PUSHES[1 - side][index]
 
-        color = self.square(from_).piece.color
-        king_square_name = self._king_location[color]
-        king_square = self.square(self._king_location[color])
-        # king = king_square.piece
-
-        pinned_direction = king_square.direction(from_)
-
-        if pinned_direction is None:
-            return None  # Not in line with king, can't be pinned
-
-        # Get a list of squares, starting near the king and in a line away from him
-        square_names = self._squares_in_direction(king_square_name, pinned_direction)
-
-        maybe_pinned = False
-        for n in square_names:
-            s = self.square(n)
-            if s.piece is None:
-                continue  # blank square, keep looking
-            else:
-                if s.name == from_:
-                    maybe_pinned = True
-                elif maybe_pinned:
-                    # Is the piece found an attacker..?
-                    if pinned_direction in s.piece.attacks and s.piece.limit != 1 and s.piece.color != color:
-                        return s.name
-                    else:
-                        return None
-                else:
-                    return None  # Found another piece betwen us and the king, therefore not pinned
+        pushers = behind & pawns
+        if behind and not pushers and not behind & occupied:
+            # A pawn that has not moved can move forward two squares
+            pushers = PAWN_PUSHES[1 - side][lsb(behind)] & pawns & (RANK_2 if side == WHITE else RANK_7)
+        return pushers
 
-    def _get_pinned_direction(self, from_):
-        u"""Returns the directions a pinned is able to move or None if not pinned
+    def _pinned(self, from_):
+        u"""Returns the location containing the piece that is pinning this one or None if not pinned.
 
-            from_ -- The location of the piece to check for.
+        from_  -- The square name to check if the piece inside is pinned,
         """
-        pinning_loc = self._pinned(from_)
-        if pinning_loc is None:
+        index = square_index(from_)
+        side = self._mailbox[index].code // 6
+        _, pinned, pin_lines = self._king_safety(side)
+        if not pinned & BITS[index]:
             return None
-        else:
-            pinning_square = self.square(pinning_loc)
-            dir_1 = pinning_square.direction(from_)
-            dir_2 = (-dir_1[0], -dir_1[1])
-            return set([dir_1, dir_2])
+        return SQUARE_NAMES[lsb(pin_lines[index] & self._occupied[1 - side])]
 
     def player_piece_squares(self, color):
         """
@@ -658,7 +1390,7 @@ class Board(object):
         color -- The color of the player
         """
 
-        return [s.name for s in self._all_squares.values() if s.piece and s.piece.color == color]
+        return [SQUARE_NAMES[i] for i in iter_bits(self._occupied[SIDES[color]])]
 
     def get_moves(self, from_, check_current_player=True):
         """
@@ -682,7 +1414,7 @@ class Board(object):
         """
         Check the color of the piece is the same as the current player
         """
-        piece = self.square(from_).piece
+        piece = self.get_piece(from_)
         if piece is not None:
             if piece.color == self.current_player:
                 return True
@@ -703,93 +1435,14 @@ class Board(object):
         """
 
         assert (len(from_) == 2)
-        piece = self.square(from_).piece
+        index = square_index(from_)
+        piece = self._mailbox[index]
 
         if piece is None:
-            # raise ValueError("Square at location {0} is empty".format(from_))
             return set([]), set([])
 
-        if isinstance(piece, King):
-            return self._get_king_moves_and_attacks(from_)
-        else:
-            # Check if this piece is pinned, and then pass the limited move vector to
-            # the _get_*piece*_moves methods. They need to be restricted in what they
-            # search.
-            pinned_directions = self._get_pinned_direction(from_)
-            if isinstance(piece, Pawn):
-                moves = self._get_pawn_moves(piece, from_, pinned_directions)
-                attacks = self._get_pawn_attacks(piece, from_, pinned_directions)
-
-            elif isinstance(piece, Queen) or isinstance(piece, Rook) or \
-                    isinstance(piece, Bishop) or isinstance(piece, Knight):
-                # A pinned piece can only move in the vector it is pinned in
-                moves, attacks = self._get_knight_bishop_queen_rook_king_moves(piece, from_, pinned_directions)
-
-        if self.is_check(piece.color):
-            # King in check, can only move piece if it captures the attacker or blocks it
-            blocking_squares, enemy_square = self._get_blocking_squares(piece.color)
-            moves = moves.intersection(blocking_squares)
-            attacks = attacks.intersection(set([enemy_square]))
-
-        return moves, attacks
-
-    def _get_king_moves_and_attacks(self, from_):
-        u"""
-        Returns all of the moves that a king can make.
-
-        The moves a king can make are highly restricted by the other pieces on the board.
-        This method restricts the moves to those that do not put the king in check.
-
-        king_square -- The square the king is in
-        """
-
-        king_square = self.square(from_)
-        king = king_square.piece
-        # Get all moves, these may be illegal, putting king in check
-        moves, attacks = self._get_knight_bishop_queen_rook_king_moves(king, from_)
-        # Add any castling moves, these are all legal
-        moves = moves.union(self._get_castle_moves(from_))
-
-        enemy_color = king.color.inverse()
-        threatened = set([])
-        if self.is_check(king.color):
-            # The king is likely blocking the square(s) behind it from the attacker(s)
-            # We must count the square(s) as unsafe, because if the king moves there
-            # he will still be in check
-
-            enemy_square_names = self._get_attackers(from_, enemy_color)
-            for name in enemy_square_names:
-                square = self.square(name)
-                x, y = square.direction(from_)
-                if square.piece.limit != 1:
-                    try:
-                        behind = self.square(x=king_square.x + x, y=king_square.y + y).name
-                        threatened.add(behind)
-                    except InvalidSquareException:
-                        continue
-
-        safe_moves = set([])
-        safe_attacks = set([])
-
-        for m in moves:
-
-            if len(self._get_attackers(m, enemy_color)) > 0:
-                pass                 # Can't move king into check
-            elif m in threatened:
-                # If we're already in check, the king is blocking  a square from the attacker
-                # If the king moves there, he will still be under attack.
-                pass  # Can't move king into check
-            else:
-
-                safe_moves.add(m)
-        for a in attacks:
-            if len(self._get_attackers(a, enemy_color)) > 0:
-                pass  # Can't move king into check
-            elif a in threatened:
-                pass  # Can't move king into check
-            else:
-                safe_attacks.add(a)
-        return safe_moves, safe_attacks
+        moves, attacks = self._cached_moves(piece.code // 6, BITS[index])[index]
+        return set(moves), set(attacks)
 
     def _get_blocking_squares(self, color):
         """
@@ -799,24 +1452,25 @@ class Board(object):
         If there are multiple attackers, returns an empty set
         If the king is not in check returns None
         """
-        # color = self.current_player
-        king_square_name = self._king_location[color]
-        king_square = self.square(king_square_name)
-        enemy_color = color.inverse()
-        enemy_attacking_pieces = self._get_attackers(king_square_name, enemy_color)
+        side = SIDES[color]
+        king_index = self._king_index(side)
+        enemy_attacking_pieces = self._attackers_to(king_index, 1 - side, self._all_occupied())
 
-        if len(enemy_attacking_pieces) == 0:
+        if not enemy_attacking_pieces:
             # Not under attack
             return None, None
-        elif len(enemy_attacking_pieces) == 1:
+        elif not enemy_attacking_pieces & (enemy_attacking_pieces - 1):
             # It is possible to capture the attacker
-            [enemy_loc] = enemy_attacking_pieces
+            enemy_index = lsb(enemy_attacking_pieces)
 
             # Can we block the attacking piece?
-            attack_vector = king_square.direction(enemy_loc)
+            attack_vector = LINES[king_index][enemy_index]
+            if attack_vector is None:
+                # Knights jump, they cannot be blocked
+                return set([]), SQUARE_NAMES[enemy_index]
 
             # Find all of the squares that block the path between the enemy piece and king
-            return self._get_squares_in_direction(king_square_name, attack_vector, color)
+            return self._get_squares_in_direction(SQUARE_NAMES[king_index], attack_vector, color)
 
         else:
             # We cannot block / capture multiple pieces in one move
@@ -824,6 +1478,19 @@ class Board(object):
             # Must be captured or blocked
             return set([]), set([])
 
+    def _direction_attacks(self, index, direction, limit, occupied):
+        """
+        Returns the bitboard of squares a piece at index attacks in one direction.
+
+        index     -- The index of the square the piece is on
+        direction -- The (x, y) direction to search
+        limit     -- 1 if the piece only moves one step (or jump) in the direction, None if it slides to the edge
+        occupied  -- The squares that stop a sliding piece
+        """
+        if limit == 1:
+            return STEPS[direction][index]
+        return ray_attacks(index, direction, occupied)
+
     def _get_knight_bishop_queen_rook_king_moves(self, piece, from_, pinned=None):
         """
         Returns all of the location any of these pieces can move to from the location specified.
@@ -837,12 +1504,9 @@ class Board(object):
                    from if that piece was there.
         pinned  -- A set of directions this piece is pinned (both  +/- vector)
 
-        returns -- A two lists of x-y coords tuples representation the moves and attacks of the specified piece from
-                   the location provided. [(x1,y1),(x2,y2),....(xm,ym)],[(xm+1,ym+1),....(xn,yn)]
+        returns -- A two sets of square names, the moves and attacks of the specified piece from
+                   the location provided.
         """
-        all_attacks = set([])
-        all_moves = set([])
-
         if pinned is None:
             move_vectors = piece.attacks
         else:
@@ -850,13 +1514,24 @@ class Board(object):
             # If the piece is pinned vertically (or any other direction), it can still move in that direction
             move_vectors = pinned.intersection(piece.attacks)
 
-        for direction in move_vectors:
-            moves, attack = self._get_squares_in_direction(from_, direction, piece.color, piece.limit)
-            if attack is not None:
-                all_attacks.add(attack)
-            all_moves = all_moves.union(moves)
+        index = square_index(from_)
+        occupied = self._all_occupied()
+        targets = 0
+        for direction_ in move_vectors:
+            targets |= self._direction_attacks(index, direction_, piece.limit, occupied)
 
-        return all_moves, all_attacks
+        return square_names(targets & ~occupied), square_names(targets & self._occupied[1 - piece.code // 6])
+
+    def _en_passant_capture(self):
+        """
+        Returns the index of the square a pawn moves to when capturing en passant and the index of the square of the
+        pawn that would be captured, or None if the previous move was not a pawn moving two squares.
+        """
+        target = self._en_passant
+        if target is None:
+            return None
+        # The pawn that moved two squares is in front of the square it passed over
+        return target, target + 8 if target < 32 else target - 8
 
     def _get_pawn_attacks(self, pawn, from_, pinned=None):
         u"""
@@ -866,106 +1541,38 @@ class Board(object):
         from_  -- The location of the pawn
         pinned -- A set of directions this piece is pinned (both  +/- vector)
         """
-        attacks = set([])
-
-        for attack_dir in pawn.attacks:
-            # Check if the piece can attack normally
-            if pinned is None or attack_dir in pinned:
-                dummy_locs, enemy_loc = self._get_squares_in_direction(from_, attack_dir, pawn.color, 1)
-
-                if enemy_loc is not None:
-                    # We can capture this normally
-                    attacks.add(enemy_loc)
-
-        for en_passant_dir in pawn.en_passant():
-
-            # en_passant_dir = pawn.en_passant_2(attack_dir)
-            # Check if the pawn can attack via en passant
-            # TODO: Draw out some chess boards in the comments to make this more
-            # comprehensible to others reading the code. Will have to use unicode in
-            # the source ... should be ok, it's 2013 now and ascii isn't the be all and end all
-            dummy_locs, en_passant_loc = self._get_squares_in_direction(from_, en_passant_dir, pawn.color, 1)
-            if en_passant_loc is not None:
-
-                if self.previous_move is not None:
-                    if self.previous_move.double_move and self.previous_move.to_loc == en_passant_loc:
-
-                        # We can attack this via en passant
-                        # Don't need to check the following, implicity true
-                        # if enemy_piece is not None and enemy_piece.color is not pawn.color:
-                        # We can capture this normally
-
-                        # We could be pinned by a rook or queen, but this is very rare
-                        # Since two pieces are in the way, regular _get_pinned direction
-                        # method will not work
-                        en_passant_square = self.square(en_passant_loc)
-                        from_square = self.square(from_)
-                        left_x = min(en_passant_square.x, from_square.x)  # The left square
-                        right_x = max(en_passant_square.x, from_square.x)
-
-                        # Search left and right halves to see if we're in a position where capturing
-                        # via en passent would put us in check
-                        king = None
-                        attacker = None
-                        for xi in reversed(range(1, left_x)):
-                            piece = self.square(x=xi, y=from_square.y).piece
-                            if piece is not None:
-                                if isinstance(piece, King) and piece.color == pawn.color:
-                                    king = piece
-                                elif piece.color != pawn.color and (isinstance(piece, Queen) or isinstance(piece, Rook)):
-                                    attacker = piece
-                                break
-
-                        if attacker is not None or king is not None:
-                            for xi in range(right_x + 1, 9):
-                                piece = self.square(x=xi, y=from_square.y).piece
-                                if piece is not None:
-                                    if isinstance(piece, King) and piece.color == pawn.color:
-                                        king = piece
-                                    elif piece.color != pawn.color and (isinstance(piece, Queen) or isinstance(piece, Rook)):
-                                        attacker = piece
-                                    break
-
-                        if attacker is not None and king is not None:
-                            # We're pinned
-                            return []
-
-                        pawn_move_location = self.square(x=en_passant_square.x, y=from_square.y + pawn.forward)
-                        attacks.add(pawn_move_location.name)
-
-        return attacks
-
-    def _get_pawn_move_to(self, pawn, to_):
-        """
-        Returns the location of any pawns that can move to the location specified.
-
-        This is restricted to pawns with the same color as the pawn supplied.
-
-        """
-        assert(len(to_) == 2)
-        try:
-            to_square = self.square(to_)
-            x = to_square.x
-            y = to_square.y - pawn.forward
-            single_move_square = self.square(x=x, y=y)
+        index = square_index(from_)
+        bit = BITS[index]
+        side = pawn.code // 6
+        enemy = 1 - side
 
-            if isinstance(single_move_square.piece, Pawn):
-                return set([single_move_square.name])
-
-            x = to_square.x
-            y = to_square.y - 2 * pawn.forward
-            double_move_square = self.square(x=x, y=y)
-            if isinstance(double_move_square.piece, Pawn) and (self._pawn_has_moved(double_move_square.name) is False):
-
-                if single_move_square.piece is not None:
-                    # Cannot move, square in the middle is occupied
-                    return set([])
-
-                return set([double_move_square.name])
-
-        except InvalidSquareException:
-            pass  # IllegalSquare, fall through
-        return set([])
+        if pinned is None:
+            attacks = PAWN_ATTACKS[side][index]
+        else:
+            # A pinned pawn can only attack along the diagonal it is pinned in
+            attacks = 0
+            for attack_dir in pawn.attacks:
+                if attack_dir in pinned:
+                    attacks |= STEPS[attack_dir][index]
+        attacks &= self._occupied[enemy]
+
+        # Check if the pawn can attack via en passant, this is when the pawn beside this one has just moved two squares
+        en_passant = self._en_passant_capture()
+        if en_passant is not None:
+            target_index, captured_index = en_passant
+            if self._mailbox[captured_index].code // 6 == enemy and PAWN_ATTACKS[side][index] & BITS[target_index]:
+                # Both pawns leave the row, so we could be exposing the king to a rook or queen in a way the regular
+                # pinned directions do not find. Check for sliding attackers once the move has been made.
+                occupied = (self._all_occupied() & ~bit & ~BITS[captured_index]) | BITS[target_index]
+                king_index = self._king_index(side)
+                offset = 6 * enemy
+                queens = self._bitboards[QUEEN + offset]
+                exposed = rook_attacks(king_index, occupied) & (self._bitboards[ROOK + offset] | queens)
+                exposed |= bishop_attacks(king_index, occupied) & (self._bitboards[BISHOP + offset] | queens)
+                if not exposed:
+                    attacks |= BITS[target_index]
+
+        return square_names(attacks)
 
     def _get_pawn_moves(self, pawn, from_, pinned=None):
         """
@@ -978,98 +1585,19 @@ class Board(object):
 
 
         """
-        moves = set([])
-
         # Check if the pawn is not pinned or only pinned vertically so can move forward
         if pinned is None or (0, 1) in pinned:
-            try:
-                from_square = self.square(from_)
-                single_move_loc = self.square(x=from_square.x, y=from_square.y + pawn.forward)
-            except InvalidSquareException:
-                return moves  # Retun an empty set
-                # raise IllegalMoveException("Pawn cannot move, it must be promoted instead.")
-
-            if single_move_loc.piece is None:
-                moves.add(single_move_loc.name)
-                if self._pawn_has_moved(from_) is False:
-                    double_move_loc = self.square(x=from_square.x, y=from_square.y + 2 * pawn.forward)
-                    if double_move_loc.piece is None:
-                        moves.add(double_move_loc.name)
-            return moves
-        elif (1, 0) in pinned:
-            # Pinned horizontally, therefore cannot move or attack
-            return moves
-        else:
-            # Pinned diagonally
-            pass
-        return moves
-
-    def _pawn_has_moved(self, from_):
-        """
-        Checks whether a pawn has moved based off its board position.
-
-        from_ -- The location of the pawn
-
-        Returns -- True if the pawn has moved, and False otherwise
-        """
-        # Normally negation is avoided in method names, but this one exception seems warranted
-        # as we think of pawns that 'have not moved' when considering if they can double-move
-        square = self.square(from_)
-        assert(isinstance(square.piece, Pawn))
-        if square.piece.color == Color.BLACK and square.y == 7:
-            return False
-        elif square.piece.color == Color.WHITE and square.y == 2:
-            return False
+            index = square_index(from_)
+            side = pawn.code // 6
+            empty = FULL ^ self._all_occupied()
+            single_move = PAWN_PUSHES[side][index] & empty
+            if single_move and BITS[index] & (RANK_2 if side == WHITE else RANK_7):
+                # A pawn that has not moved can also move two squares
+                return square_names(single_move | PAWN_PUSHES[side][lsb(single_move)] & empty)
+            return square_names(single_move)
         else:
-            return True
-
-    def _is_en_passant_attack(self, from_):
-        """
-        Returns True if an attack can be made from the location from_ via via en passant
-        """
-
-        from_square = self.square(from_)
-        if isinstance(from_square.piece, Pawn):  # Only pawns can do en passant
-            # 1st move has no previous
-            if self.previous_move is not None:
-                # En passant only possible when eneny pawn does double move
-                if self.previous_move.double_move is True:  # Implies pawn
-                    if self.square(self.previous_move.to_loc).y == from_square.y:  # Same row
-                        if abs(self.square(self.previous_move.to_loc).x - from_square.x) == 1:  # Adjacent square
-                            return True
-
-        return False
-
-    def _squares_in_direction(self, from_, direction):
-        """
-        Returns all of the squares in the direction (x, y) tuple given, from this Square to the board edge.
-
-        The direction is a (x, y) tuple representing a compass direction like north, east, south-west, etc.
-        North is (0, 1), Northeast is (1, 1), Southwest is (-1, -1), etc
-
-        from_     --
-        direction --
-
-        """
-        dx, dy = direction
-        assert(dx == 0 or abs(dx) == 1)
-        assert(dy == 0 or abs(dy) == 1)
-
-        from_square = self.square(from_)
-
-        squares = []
-        i = 1
-        while True:
-            try:
-                x = from_square.x + i * dx
-                y = from_square.y + i * dy
-                loc = self.square(x=x, y=y)
-                squares.append(loc.name)
-                i += 1
-
-            except InvalidSquareException:
-                break  # Hit the edge of the baord
-        return squares
+            # Pinned horizontally or diagonally, therefore cannot move forward
+            return set([])
 
     def _get_squares_in_direction(self, from_, direction, color, limit=None, all_squares=False):
         """
@@ -1078,67 +1606,247 @@ class Board(object):
         from_     -- The location to search from, e.g A2
         direction -- The direction to search in
         color     -- The color of this piece (we attack one enemy piece of the opposite color)
-        limit     -- The maxium number of total squares to search/return
+        limit     -- 1 to search a single square, None to search to the edge of the board
         all_squares -- If this is true, returns all squares
 
         returns   -- An ordered list of square_names that are empty,
                      and 0-1 square_name that contains the first enemy piece encountered
         """
-        # TODO: We're repeating logic, but the logic here is too specific
+        index = square_index(from_)
+        if all_squares is True:
+            return square_names(self._direction_attacks(index, direction, limit, 0)), None
 
-        from_square = self.square(from_)
-
-        moves = set([])
-        attack = None
-
-        dx, dy = direction
-        i = 1
-        while limit is None or i <= limit:
-            try:
-                x = from_square.x + i * dx
-                y = from_square.y + i * dy
-                loc = self.square(x=x, y=y)
-                i += 1
-                if loc.piece is None or all_squares is True:
-                    moves.add(loc.name)  # Empty square or we're after all squares
-                elif loc.piece.color != color:
-                    attack = loc.name  # We've found an enemy piece
-                    break
-                else:
-                    # We've found one of our own pieces
-                    break
-            except InvalidSquareException:
-                break
-        return moves, attack
+        occupied = self._all_occupied()
+        targets = self._direction_attacks(index, direction, limit, occupied)
+        attack = targets & self._occupied[1 - SIDES[color]]
+        if attack:
+            attack = SQUARE_NAMES[lsb(attack)]  # We've found an enemy piece
+        else:
+            attack = None
+        return square_names(targets & ~occupied), attack
 
     def __repr__(self):
         """
         Returns a string representation of the chess board that can be reconstructed when passed to the constructor.
         """
-        # 1 indexed chessboard, 1 <= x < 9, 1 <= y < 9
-        # xrange would be more a more efficient implemenation but this is a
-        # minor and in python 3.x we get this benefit implicitly
         board_string = u""
 
-        for y in range(1, 9):
-            for x in range(1, 9):
-                piece = self.square(x=x, y=y).piece
-                if piece is not None:
-                    # Encode the state information that the piece 'has moved', so cannot castle
-                    # This is encoded before the piece because it makes re-parsing easier
-                    if (isinstance(piece, King) or isinstance(piece, Rook)):
-                        if piece.has_moved is False:
-                            pass
-                        else:
-                            board_string += self._HAS_MOVED
-                    board_string += piece.symbol
-                else:
-                    board_string += self._EMPTY_SQUARE
-            if y < 8:
+        for index, piece in enumerate(self._mailbox):
+            if piece is not None:
+                # Encode the state information that the piece 'has moved', so cannot castle
+                # This is encoded before the piece because it makes re-parsing easier
+                if index in _CASTLING_HOMES and piece.code in _CASTLING_HOMES[index] and \
+                        self._castling & _CASTLING_HOMES[index][piece.code] == 0:
+                    board_string += self._HAS_MOVED
+                board_string += piece.symbol
+            else:
+                board_string += self._EMPTY_SQUARE
+            if index % 8 == 7 and index < 63:
                 board_string += u'-'
 
         return board_string.encode('utf-8')
 
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Returns the board described by a position in Forsyth-Edwards Notation (FEN), e.g the starting position is
+
+            rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
+
+        Unlike the board string this includes the player to move, the en passant square and the move counts, see
+        https://en.wikipedia.org/wiki/Forsyth-Edwards_Notation. A pawn on the last row is waiting to be promoted.
+
+        fen -- The position in FEN
+        raises -- InvalidBoardException if the FEN is not a valid chess position
+        """
+        fields = fen.split()
+        if len(fields) != 6:
+            raise InvalidBoardException(u"The FEN '{fen}' does not have six fields.".format(fen=fen))
+        placement, player, castling, en_passant, halfmove, fullmove = fields
+
+        board = cls.__new__(cls)
+        board._clear()
+
+        # The pieces are listed from A8 to H8, then A7 to H7 and so on down to H1
+        index = 56
+        files = 0
+        for letter in placement:
+            if letter == u'/':
+                if files != 8 or index < 16:
+                    raise InvalidBoardException(u"The FEN '{fen}' does not have 8 rows of 8 squares.".format(fen=fen))
+                index -= 16
+                files = 0
+            elif letter in u'12345678':
+                index += int(letter)
+                files += int(letter)
+            else:
+                piece = _FEN_PIECES.get(letter)
+                if piece is None or files >= 8:
+                    raise InvalidBoardException(u"The FEN '{fen}' is not valid.".format(fen=fen))
+                board._put(index, piece)
+                index += 1
+                files += 1
+        if files != 8 or index != 8:
+            raise InvalidBoardException(u"The FEN '{fen}' does not have 8 rows of 8 squares.".format(fen=fen))
+
+        if player not in (u'w', u'b'):
+            raise InvalidBoardException(u"The player to move must be 'w' or 'b', not '{0}'.".format(player))
+        board._current_player = Color.WHITE if player == u'w' else Color.BLACK
+
+        if castling != u'-' and (castling.strip(u'KQkq') or len(set(castling)) != len(castling)):
+            raise InvalidBoardException(u"The castling rights must be distinct letters of 'KQkq' or '-', not '{0}'."
+                                        .format(castling))
+        rights = 0
+        for letter, right in _FEN_CASTLING:
+            if letter in castling:
+                rights |= right
+
+        target = None
+        if en_passant != u'-':
+            try:
+                target = square_index(en_passant)
+            except InvalidSquareException:
+                raise InvalidBoardException(u"The en passant square '{0}' is not valid.".format(en_passant))
+
+        try:
+            board.stalemate_count = int(halfmove)
+            board.fullmove_number = int(fullmove)
+        except ValueError:
+            raise InvalidBoardException(u"The move counts '{0} {1}' are not numbers.".format(halfmove, fullmove))
+        if board.stalemate_count < 0 or board.fullmove_number < 1:
+            raise InvalidBoardException(u"The halfmove clock cannot be negative and the fullmove number starts at 1, "
+                                        u"not '{0} {1}'.".format(halfmove, fullmove))
+
+        board._set_up(rights, target)
+        return board
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Returns the board from its packed binary encoding, see to_bytes.
+
+        data   -- The PACKED_SIZE bytes, as a str, bytearray or buffer
+        raises -- InvalidBoardException if the data is not a valid chess position
+        """
+        if len(data) != PACKED_SIZE:
+            raise InvalidBoardException(u"A packed board is {0} bytes, not {1}.".format(PACKED_SIZE, len(data)))
+        data = bytearray(data)
+
+        board = cls.__new__(cls)
+        board._clear()
+        en_passant = None
+        nibbles = [nibble for byte in data[:32] for nibble in _PACKED_PAIRS[byte]]
+        for index, nibble in enumerate(nibbles):
+            if nibble == 0:
+                continue
+            elif nibble <= 12:
+                board._put(index, PIECES[nibble - 1])
+            elif nibble == _PACKED_EN_PASSANT and 24 <= index < 40:
+                # A white pawn on the fourth row or a black pawn on the fifth
+                side = WHITE if index < 32 else BLACK
+                board._put(index, PIECES[PAWN + 6 * side])
+                en_passant = index - 8 if side == WHITE else index + 8
+            else:
+                raise InvalidBoardException(u"The packed square {0} is not valid.".format(SQUARE_NAMES[index]))
+
+        state, board.stalemate_count, board.fullmove_number = _PACKED_STATE.unpack(bytes(data[32:]))
+        if state >> 5:
+            raise InvalidBoardException(u"The packed state {0} is not valid.".format(state))
+        board._current_player = Color.BLACK if state & 1 else Color.WHITE
+        board._set_up(state >> 1, en_passant)
+        return board
+
+    def to_bytes(self):
+        """
+        Returns the position packed into PACKED_SIZE (37) bytes, which can be stored or sent much more cheaply than the
+        board string or FEN.
+
+        The first 32 bytes hold two squares each, A1 in the low 4 bits of the first byte, B1 in the high 4 bits and so
+        on up to H8. Next is a byte of state, the lowest bit is set if black is to move and the next four are the
+        castling rights. The last four bytes are the halfmove clock and fullmove number, as big-endian 16 bit numbers.
+        """
+        nibbles = [_PACKED_NIBBLES[piece] for piece in self._mailbox]
+        if self._en_passant is not None:
+            # Mark the pawn that moved past the en passant square
+            nibbles[self._en_passant + 8 if self._en_passant < 32 else self._en_passant - 8] = _PACKED_EN_PASSANT
+        squares = bytearray(low | high << 4 for low, high in zip(nibbles[0::2], nibbles[1::2]))
+        state = (self._current_player is Color.BLACK) | self._castling << 1
+        return bytes(squares) + _PACKED_STATE.pack(state, min(self.stalemate_count, 0xFFFF),
+                                                   min(self.fullmove_number, 0xFFFF))
+
+    def _set_up(self, castling, en_passant):
+        """
+        Finishes setting up a board whose pieces and player to move have been set, checking there is one king of each
+        color, that the player not to move is not in check and that one of their pawns can have just passed over the
+        en passant square. Castling
+        rights whose king or rook is not on its starting square are dropped, as is an en passant square that cannot be
+        captured.
+
+        castling   -- The castling rights, e.g WHITE_KING_SIDE | BLACK_QUEEN_SIDE
+        en_passant -- The index of the square passed over by a pawn that just moved two squares, or None
+        raises     -- InvalidBoardException if the position is not valid
+        """
+        for side, color in ((WHITE, Color.WHITE), (BLACK, Color.BLACK)):
+            kings = self._bitboards[KING + 6 * side]
+            if kings == 0 or kings & (kings - 1):
+                raise InvalidBoardException(u"There must be one {color} king.".format(color=color))
+            self._king_location[color] = SQUARE_NAMES[lsb(kings)]
+        # The player to move could capture the king of a player who left it in check
+        waiting = 1 - SIDES[self._current_player]
+        if self._is_attacked(lsb(self._bitboards[KING + 6 * waiting]), 1 - waiting, self._all_occupied()):
+            raise InvalidBoardException(u"The {color} king is in check, but it is not their move."
+                                        .format(color=self._current_player.inverse()))
+        pawns = (self._bitboards[PAWN] | self._bitboards[PAWN + 6]) & (RANK_1 | RANK_8)
+        if pawns:
+            self.promote_pawn_location = SQUARE_NAMES[lsb(pawns)]
+
+        for index, homes in _CASTLING_HOMES.items():
+            piece = self._mailbox[index]
+            if piece is None or piece.code not in homes:
+                castling &= _CASTLING_KEPT[index]
+        self._castling = castling
+
+        if en_passant is not None:
+            # The pawn that moved two squares belongs to the player who is not moving next, it passed over the
+            # en passant square from the square behind it to the square in front
+            if self._current_player is Color.WHITE:
+                rank, pawn, start, end = RANK_6, PAWN + 6, en_passant + 8, en_passant - 8
+            else:
+                rank, pawn, start, end = RANK_3, PAWN, en_passant - 8, en_passant + 8
+            if not (BITS[en_passant] & rank and self._mailbox[en_passant] is None and
+                    self._mailbox[start] is None and self._bitboards[pawn] & BITS[end]):
+                raise InvalidBoardException(u"No pawn can have just passed over the en passant square {0}."
+                                            .format(SQUARE_NAMES[en_passant]))
+            self._en_passant = self._en_passant_target(en_passant)
+
+        self._hash = self._zobrist()
+
+    def to_fen(self):
+        """
+        Returns the position in Forsyth-Edwards Notation (FEN), see from_fen.
+        """
+        rows = []
+        for row in xrange(56, -1, -8):
+            letters = u''
+            empty = 0
+            for piece in self._mailbox[row:row + 8]:
+                if piece is None:
+                    empty += 1
+                else:
+                    if empty:
+                        letters += unicode(empty)
+                        empty = 0
+                    letters += _FEN_LETTERS[piece.code]
+            if empty:
+                letters += unicode(empty)
+            rows.append(letters)
+
+        player = u'w' if self._current_player is Color.WHITE else u'b'
+        castling = u''.join(letter for letter, right in _FEN_CASTLING if self._castling & right) or u'-'
+        en_passant = SQUARE_NAMES[self._en_passant].lower() if self._en_passant is not None else u'-'
+        return u'{0} {1} {2} {3} {4} {5}'.format(u'/'.join(rows), player, castling, en_passant, self.stalemate_count,
+                                                 self.fullmove_number)
+
     def _to_python(self, board_string):
         """
         Converts a board string into a board instance.
@@ -1153,8 +1861,14 @@ class Board(object):
                         ♖♘♗♕♔♗♘♖-♙♙♙♙♙♙♙♙-________-________-________-________-♟♟♟♟♟♟♟♟-♜♞♝♛♚♝♞♜
         """
 
-        self._board = {}
         self._king_location = {}
+        self._mailbox = [None] * 64
+        self._bitboards = [0] * 12
+        self._occupied = [0, 0]
+        self._material = [0, 0]
+        self._piece_square = 0
+        self._phase = 0
+        moved = set()  # The squares of the pieces marked as having moved
 
         row_strings = board_string.split(u'-')
         y = 0
@@ -1167,14 +1881,15 @@ class Board(object):
                     has_moved = True  # This is meta data, it isn't a piece, so don't increment x
                 else:
                     x += 1
-                    if symbol == Board._EMPTY_SQUARE:
-                        square = Square(x=x, y=y)
-                        self._all_squares[square.name] = square
-                    else:
-                        piece = PieceFactory.createFromSymbol(symbol, has_moved)
-                        square = Square(x=x, y=y)
-                        square.piece = piece
-                        self._all_squares[square.name] = square
+                    index = coords_index(x, y)
+                    if index is None:
+                        raise InvalidSquareException(
+                            u"The square ({x}, {y}), does not exist on a chess board.".format(x=x, y=y))
+                    if symbol != Board._EMPTY_SQUARE:
+                        piece = PieceFactory.createFromSymbol(symbol)
+                        self._put(index, piece)
+                        if has_moved:
+                            moved.add(index)
                         if isinstance(piece, King):
                             if piece.color in self._king_location:
                                 # Cannot handle multiple kings of the the same color, just saying
@@ -1182,29 +1897,37 @@ class Board(object):
                                 raise InvalidBoardException(u"Multiple kings of the color {color} present."
                                                             .format(color=piece.color))
                             else:
-                                self._king_location[piece.color] = square.name
+                                self._king_location[piece.color] = SQUARE_NAMES[index]
                         if isinstance(piece, Pawn):
                             # Is pawn in the final row?
                             if y == 1 or y == 8:
-                                self.promote_pawn_location = square.name
+                                self.promote_pawn_location = SQUARE_NAMES[index]
 
                     has_moved = False
 
-        assert isinstance(self.square(self._king_location[Color.BLACK]).piece, BlackKing)
-        assert isinstance(self.square(self._king_location[Color.WHITE]).piece, WhiteKing)
+        assert isinstance(self.get_piece(self._king_location[Color.BLACK]), BlackKing)
+        assert isinstance(self.get_piece(self._king_location[Color.WHITE]), WhiteKing)
+
+        # A king and rook that have not moved from where they started can castle
+        self._castling = 15
+        for index, homes in _CASTLING_HOMES.items():
+            piece = self._mailbox[index]
+            if piece is None or piece.code not in homes or index in moved:
+                self._castling &= _CASTLING_KEPT[index]
+
+        self._hash = self._zobrist()
 
     def display(self):
         """
         Prints out a unicode representation of the chess board. Used mainly in command line testing.
         """
-        WHITE_SQUARE = u"\u25a8"
-        BLACK_SQUARE = u"\u25a2"
+        WHITE_SQUARE = u"▨"
+        BLACK_SQUARE = u"▢"
         line = u""
         for y in reversed(range(1, 9)):
             line += u"{0} ".format(y)  # Row number
             for x in range(1, 9, 1):
-                # square_name = Square.nameFromCoords(x, y)
-                current_piece = self.square(x=x, y=y).piece
+                current_piece = self._mailbox[coords_index(x, y)]
 
                 if current_piece is not None:
                     # Display the piece on the square it occupies.
@@ -1227,45 +1950,40 @@ class Board(object):
         that can be serailized to JSON via the python JSON library.
         """
         pieces = {}
+        moves_by_square = self._moves_by_square(self.current_player)
 
-        for square_name in self._all_squares:
-            square = self.square(square_name)
-            if square.piece is not None:
-
-                display_piece = {}
-
-                display_piece['position'] = square_name
-                display_piece['piece'] = square.piece.name
-                display_piece['moves'] = []
-
-                if self._piece_owned_by_current_player(square_name):
-
-                    # try:
-                    moves, attacks = self._get_moves_and_attacks(square_name)
-                    # except IllegalMoveException:
-                    #     # This gets raised, if a pawn must be promoted ...?
-
-                    for m in moves:
-                        display_piece['moves'].append({
-                            "to": m,
-                            "capture": False
-                        })
-                    for a in attacks:
-                        display_piece['moves'].append({
-                            "to": a,
-                            "capture": True
-                        })
-
-                    # Mark the current player's pieces as active unless they need to promote a pawn
-                    if self.promote_pawn_location is None:
-                        display_piece['active'] = True
-                    # elif self.promote_pawn_location == square:
-                    #     # It will always be the current players turn
-                    #     display_piece['active'] = True
-                    else:
-                        display_piece['active'] = False
+        for index in iter_bits(self._all_occupied()):
+            square_name = SQUARE_NAMES[index]
+            piece = self._mailbox[index]
+
+            display_piece = {}
+
+            display_piece['position'] = square_name
+            display_piece['piece'] = piece.name
+            display_piece['moves'] = []
+
+            if piece.color == self.current_player:
+
+                moves, attacks = moves_by_square[square_name]
+
+                for m in moves:
+                    display_piece['moves'].append({
+                        "to": m,
+                        "capture": False
+                    })
+                for a in attacks:
+                    display_piece['moves'].append({
+                        "to": a,
+                        "capture": True
+                    })
+
+                # Mark the current player's pieces as active unless they need to promote a pawn
+                if self.promote_pawn_location is None:
+                    display_piece['active'] = True
                 else:
                     display_piece['active'] = False
+            else:
+                display_piece['active'] = False
 
-                pieces[square.name] = display_piece
+            pieces[square_name] = display_piece
         return pieces
@@ -0,0 +1,10 @@
+# -*- coding: UTF-8 -*-
+u"""
+Computer chess players: the search for the best move, the evaluation of positions it uses and the agents that play
+with them.
+"""
+from chess.engine.evaluation import evaluate
+from chess.engine.exchange import static_exchange
+from chess.engine.transposition import TranspositionTable
+from chess.engine.search import Searcher, SearchResult, MATE
+from chess.engine.agents import Agent, RandomAgent, SearchAgent, AGENTS, get_agent, UnknownAgentException
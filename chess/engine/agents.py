@@ -0,0 +1,114 @@
+# -*- coding: UTF-8 -*-
+u"""
+The computer players (agents) a person can play against. They are listed by the AiAgents view and make moves through
+the AgentMove view.
+"""
+import abc
+import random
+import threading
+
+from chess.bitboard import SIDES, SQUARE_NAMES
+from chess.engine.search import Searcher
+from chess.engine.transposition import TranspositionTable, DEFAULT_SIZE
+from chess.move import move_from, move_to, promotion_kind
+from chess.pieces import PIECES
+
+
+class UnknownAgentException(Exception):
+    """
+    Raised if there is no agent with the name given
+    """
+    pass
+
+
+class Agent(object):
+    u"""
+    A computer player. Subclasses choose the moves, the agent makes them the same way a person does.
+    """
+    __metaclass__ = abc.ABCMeta
+
+    name = None
+    description = None
+
+    @abc.abstractmethod
+    def choose_move(self, board):
+        u"""Returns the compact move the agent chooses for the player to move, or None if they cannot move.
+
+        board -- The board to choose a move on, it must not be changed
+        """
+
+    def play(self, board):
+        u"""Chooses a move for the player to move and makes it, promoting a pawn moved to the end row to the piece
+        chosen.
+
+        board   -- The board to make the move on
+        Returns -- The compact move made, or None if the player cannot move
+        Raises  -- The exceptions of Board.move_piece, e.g GameOverException
+        """
+        move = self.choose_move(board)
+        if move is not None:
+            side = SIDES[board.current_player]
+            board.move_piece(SQUARE_NAMES[move_from(move)], SQUARE_NAMES[move_to(move)])
+            kind = promotion_kind(move)
+            if kind is not None:
+                board.promote_pawn(PIECES[kind + 6 * side].name)
+        return move
+
+
+class RandomAgent(Agent):
+    u"""
+    Plays any legal move.
+    """
+    name = u'RandomAgent'
+    description = u'Plays a random legal move'
+
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+
+    def choose_move(self, board):
+        moves = list(board.legal_moves(board.current_player))
+        return self._random.choice(moves) if moves else None
+
+
+class SearchAgent(Agent):
+    u"""
+    Plays the best move found by the alpha-beta search within its budgets, see chess.engine.search.
+
+    The agent keeps one transposition table for all its moves, so the results of searching one move help with the
+    next and the table's replacement of older entries comes into play. The table is created when the agent first
+    moves.
+    """
+    name = u'SearchAgent'
+    description = u'Searches for the best move for up to a second'
+
+    def __init__(self, max_depth=64, max_nodes=None, max_seconds=1.0, table_size=DEFAULT_SIZE):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.table_size = table_size
+        self.table = None
+        # Agents are shared by every game, the table is only used by one search at a time
+        self._lock = threading.Lock()
+
+    def choose_move(self, board):
+        with self._lock:
+            if self.table is None:
+                self.table = TranspositionTable(self.table_size)
+            searcher = Searcher(self.max_depth, self.max_nodes, self.max_seconds, self.table)
+            return searcher.search(board).move
+
+
+AGENTS = (RandomAgent(), SearchAgent())
+_AGENTS_BY_NAME = dict((agent.name, agent) for agent in AGENTS)
+
+
+def get_agent(name):
+    u"""Returns the agent with the name specified.
+
+    name   -- The name of the agent, e.g 'RandomAgent'
+    Raises -- UnknownAgentException if there is no agent of that name
+    """
+    try:
+        return _AGENTS_BY_NAME[name]
+    except KeyError:
+        raise UnknownAgentException(u"There is no agent named {name}.".format(name=name))
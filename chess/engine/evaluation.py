@@ -0,0 +1,33 @@
+# -*- coding: UTF-8 -*-
+u"""
+Evaluation of chess positions for the search, see chess.engine.search.
+
+Scores are in centipawns (hundredths of a pawn) and are from the point of view of the player to move, so the search
+can simply negate them as it alternates between the players.
+
+A position is scored by its material and where the pieces stand, using the piece-square tables of chess.piece_square.
+Each piece has a middlegame and an endgame score, which are blended by the phase of the game: the fewer knights,
+bishops, rooks and queens are left, the more the endgame scores count. The board keeps the material, the sums of the
+piece-square scores and the phase up to date as moves are made and taken back, so evaluating a position never looks
+at its squares. This matters as every leaf of the search is evaluated.
+"""
+from chess.bitboard import WHITE, BLACK
+from chess.color import Color
+from chess.piece_square import MAX_PHASE, middlegame, endgame
+
+PAWN_VALUE = 100  # Piece.value is in pawns, scores are in centipawns
+
+
+def evaluate(board):
+    u"""Returns the score of the position for the player to move, in centipawns.
+
+    board -- The board to evaluate
+    """
+    sign = 1 if board._current_player is Color.WHITE else -1
+    material = (board._material[WHITE] - board._material[BLACK]) * PAWN_VALUE
+    score = board._piece_square
+    # A promoted pawn can take the phase past the start of the game
+    phase = min(board._phase, MAX_PHASE)
+    # The blend is worked out for the player to move, so rounding does not favour either player
+    blend = sign * (middlegame(score) * phase + endgame(score) * (MAX_PHASE - phase)) // MAX_PHASE
+    return sign * material + blend
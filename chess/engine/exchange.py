@@ -0,0 +1,69 @@
+# -*- coding: UTF-8 -*-
+u"""
+Static exchange evaluation (SEE), working out what a capture wins or loses without searching it.
+
+The pieces of both players that attack the square captured on take turns to capture there, each player using their
+least valuable attacker first. Either player can stop capturing when carrying on would lose them material. Sliding
+pieces hidden behind an attacker join in once the attacker has captured, as the attackers are found again each time
+with the pieces that have captured removed. Pins are not taken into account.
+"""
+from chess.bitboard import BITS, PAWN, KING, lsb
+from chess.engine.evaluation import PAWN_VALUE
+from chess.move import CAPTURE, PROMOTION, EN_PASSANT, promotion_kind
+from chess.pieces import PIECES
+
+# The value of each kind of piece, in centipawns, indexed by kind
+_VALUES = tuple(PIECES[kind].value * PAWN_VALUE for kind in range(6))
+
+
+def static_exchange(board, move):
+    u"""Returns the material won (or lost, if negative) by the player making a capture once all the captures on the
+    square that are worth making have been made, in centipawns. Moves that do not capture score 0, plus the gain of
+    promoting a pawn.
+
+    board -- The board the move is for
+    move  -- The compact move
+    """
+    from_index = move & 63
+    to_index = move >> 6 & 63
+    flags = move >> 12
+    mailbox = board._mailbox
+    bitboards = board._bitboards
+
+    attacker = mailbox[from_index]
+    side = attacker.code // 6
+    occupied = (board._occupied[0] | board._occupied[1]) ^ BITS[from_index]
+    if flags == EN_PASSANT:
+        gain = _VALUES[PAWN]
+        occupied ^= BITS[to_index - 8 if to_index > from_index else to_index + 8]
+    elif flags & CAPTURE:
+        gain = _VALUES[mailbox[to_index].kind]
+    else:
+        gain = 0
+    on_square = _VALUES[attacker.kind]
+    if flags & PROMOTION:
+        on_square = _VALUES[promotion_kind(move)]
+        gain += on_square - _VALUES[PAWN]
+
+    # gains[i] is what the player making the i-th capture has won if the captures stop there
+    gains = [gain]
+    while True:
+        side = 1 - side
+        attackers = board._attackers_to(to_index, side, occupied) & occupied
+        if not attackers:
+            break
+        # The least valuable attacker captures next
+        for kind in range(6):
+            pieces = attackers & bitboards[kind + 6 * side]
+            if pieces:
+                break
+        if kind == KING and board._attackers_to(to_index, 1 - side, occupied ^ BITS[lsb(pieces)]) & occupied:
+            break  # The king cannot capture a defended piece
+        gains.append(on_square - gains[-1])
+        on_square = _VALUES[kind]
+        occupied ^= BITS[lsb(pieces)]
+
+    # Work back from the last capture, each player only captures if it does not lose them material
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i - 1] = -max(-gains[i - 1], gains[i])
+    return gains[0]
@@ -0,0 +1,91 @@
+# -*- coding: UTF-8 -*-
+u"""
+Move ordering for the search, see chess.engine.search.
+
+Alpha-beta search stops searching a position's moves as soon as one is good enough (a cutoff), so the sooner the
+best move is tried the fewer positions are searched. The moves are tried in this order:
+
+ 1. The best move stored in the transposition table for the position
+ 2. Captures, the most valuable victim first and then the least valuable attacker (MVV-LVA)
+ 3. The killer moves, quiet moves that caused a cutoff in another position at the same ply
+ 4. The remaining quiet moves, those that caused the most cutoffs anywhere (the history heuristic) first
+"""
+from chess.move import CAPTURE, PROMOTION, promotion_kind
+
+_TABLE_MOVE = 1 << 30
+_CAPTURE = 1 << 24
+_KILLER = 1 << 22  # The first killer, the second is one less
+_HISTORY_LIMIT = _KILLER - 2  # History scores are kept below the killers
+_PROMOTION_VALUES = (3, 3, 5, 9)  # The value of the piece a pawn is promoted to, indexed by promotion_kind
+# The value of each attacker, indexed by Piece.code. Piece.value is 0 for a king, but a king is the last piece that
+# should capture as it may only take undefended pieces.
+_ATTACKER_VALUES = (1, 3, 3, 5, 9, 10) * 2
+
+
+class MoveOrderer(object):
+    u"""
+    Orders the moves of the positions in one search, learning the killer moves and history as the search goes.
+    """
+
+    def __init__(self):
+        self._killers = []  # Two killer moves for each ply
+        self._history = [0] * (12 * 64)  # Indexed by Piece.code * 64 + the index of the square moved to
+
+    def order(self, board, moves, ply, table_move=None):
+        u"""Returns the moves sorted with those most likely to be best first.
+
+        board      -- The board the moves are for
+        moves      -- The compact moves to order
+        ply        -- The number of moves made since the root of the search
+        table_move -- The best move stored in the transposition table, if any
+        """
+        mailbox = board._mailbox
+        history = self._history
+        killers = self._killers[ply] if ply < len(self._killers) else (0, 0)
+
+        def score(move):
+            if move == table_move:
+                return _TABLE_MOVE
+            flags = move >> 12
+            if flags & (CAPTURE | PROMOTION):
+                attacker = mailbox[move & 63]
+                victim = mailbox[move >> 6 & 63]
+                if victim is None:
+                    victim_value = 1 if flags & CAPTURE else 0  # A pawn captured en passant, or no capture
+                else:
+                    victim_value = victim.value
+                value = _CAPTURE + victim_value * 16 - _ATTACKER_VALUES[attacker.code]
+                if flags & PROMOTION:
+                    value += _PROMOTION_VALUES[promotion_kind(move) - 1] * 16
+                return value
+            if move == killers[0]:
+                return _KILLER
+            if move == killers[1]:
+                return _KILLER - 1
+            return history[mailbox[move & 63].code * 64 + (move >> 6 & 63)]
+
+        return sorted(moves, key=score, reverse=True)
+
+    def cutoff(self, board, move, ply, depth):
+        u"""Records that a move caused a cutoff, before it is made. Only quiet moves are recorded, captures are
+        already tried early.
+
+        board -- The board the move is for
+        move  -- The compact move
+        ply   -- The number of moves made since the root of the search
+        depth -- The depth the move was searched to, cutoffs near the root count for more
+        """
+        if move >> 12 & (CAPTURE | PROMOTION):
+            return
+        killers = self._killers
+        while len(killers) <= ply:
+            killers.append([0, 0])
+        if killers[ply][0] != move:
+            killers[ply][1] = killers[ply][0]
+            killers[ply][0] = move
+
+        index = board._mailbox[move & 63].code * 64 + (move >> 6 & 63)
+        self._history[index] += depth * depth
+        if self._history[index] > _HISTORY_LIMIT:
+            # Halve them all, keeping their order, so they stay below the killers
+            self._history = [value // 2 for value in self._history]
@@ -0,0 +1,297 @@
+# -*- coding: UTF-8 -*-
+u"""
+An iterative deepening alpha-beta search for the best move on a Board.
+
+The search is negamax: the score of a position is from the point of view of the player to move, and the score of a
+move is the negated score of the position it leads to. It uses principal variation search (PVS), the first move of
+each position is searched with the full (alpha, beta) window and the rest with a null window that only shows whether
+they are better, searching again with the full window if one is.
+
+Iterative deepening searches to depth 1, then 2 and so on until the node or time budget runs out. There is always a
+move to play when the budget runs out, and each depth searches the best move of the last depth first, which makes
+the extra depths cheap. The results of searching each position are kept in a transposition table, so positions
+reached again, by a transposition of the moves or by the next depth, can reuse them. The moves of each position are
+ordered to try the best first, see chess.engine.ordering.
+
+Once the depth runs out, a quiescence search carries on making captures until the position is quiet, so a position
+is not scored part way through an exchange of pieces. Captures that lose material, by static exchange evaluation
+(see chess.engine.exchange), are not searched.
+"""
+import time
+
+from chess.engine.evaluation import evaluate
+from chess.engine.exchange import static_exchange
+from chess.engine.ordering import MoveOrderer
+from chess.engine.transposition import TranspositionTable, EXACT, LOWER, UPPER
+from chess.move import CAPTURE, PROMOTION
+
+MATE = 100000  # The score of checkmating the opponent, less the number of plies to the mate
+INFINITY = MATE + 1
+DRAW = 0
+_MATE_FOUND = MATE - 1000  # Scores beyond this are forced mates, there is no need to search deeper
+_CHECK_EVERY = 1023  # The clock is checked whenever the number of nodes & _CHECK_EVERY is 0
+
+
+class _SearchAborted(Exception):
+    u"""Raised inside the search once the node or time budget runs out."""
+    pass
+
+
+def _to_table(score, ply):
+    u"""Returns the score of a position to store in the transposition table. Mate scores count the plies from the
+    root of the search, they are stored counting from the position instead as it may be reached at another ply."""
+    if score > _MATE_FOUND:
+        return score + ply
+    if score < -_MATE_FOUND:
+        return score - ply
+    return score
+
+
+def _from_table(score, ply):
+    u"""Returns the score of a position read from the transposition table, the reverse of _to_table."""
+    if score > _MATE_FOUND:
+        return score - ply
+    if score < -_MATE_FOUND:
+        return score + ply
+    return score
+
+
+def _quiet(move):
+    u"""Returns True if the compact move does not capture a piece, used to search the captures first when the moves
+    are not ordered."""
+    return not move >> 12 & CAPTURE
+
+
+class SearchResult(object):
+    u"""
+    The outcome of a search.
+
+    move    -- The best compact move found, or None if the player to move cannot move
+    score   -- The score of the move, in centipawns for the player to move. Forced mates are scored near MATE.
+    depth   -- The depth (in plies) of the deepest search completed
+    nodes   -- The number of positions searched
+    seconds -- The time taken
+    """
+    __slots__ = ('move', 'score', 'depth', 'nodes', 'seconds')
+
+    def __init__(self, move, score, depth, nodes, seconds):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.seconds = seconds
+
+    def __repr__(self):
+        return u"SearchResult(move={0}, score={1}, depth={2}, nodes={3}, seconds={4:.3f})".format(
+            self.move, self.score, self.depth, self.nodes, self.seconds)
+
+
+class Searcher(object):
+    u"""
+    Searches a board for the best move of the player to move.
+
+    The search stops at whichever of the budgets runs out first. A search stopped part way through a depth returns
+    the best move of the last depth completed, or the first legal move if not even depth 1 was completed.
+    """
+
+    def __init__(self, max_depth=64, max_nodes=None, max_seconds=None, table=None, ordering=True):
+        u"""
+        max_depth   -- The deepest search, in plies
+        max_nodes   -- The most positions to search, or None for no limit
+        max_seconds -- The most time to search for, or None for no limit
+        table       -- The TranspositionTable to use, or None for a new table of the default size. It is kept between
+                       searches, so searching positions from the same game can reuse the results.
+        ordering    -- If False only captures are tried first, rather than ordering the moves with MoveOrderer. This
+                       is for measuring how much the ordering helps.
+        """
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.table = table if table is not None else TranspositionTable()
+        self.ordering = ordering
+        self.nodes = 0
+        self._board = None
+        self._deadline = None
+        self._seen = None
+        self._orderer = None
+
+    def search(self, board):
+        u"""Returns a SearchResult with the best move found for the player to move.
+
+        board -- The board to search, a copy is searched so it is not changed
+        """
+        start = time.time()
+        self.nodes = 0
+        self._deadline = start + self.max_seconds if self.max_seconds is not None else None
+        self._board = board = board.copy()
+        # Repeating a position is scored as a draw, whether it was reached in the game or earlier in the search. The
+        # root is kept for the whole search, it may already be in the history.
+        self._seen = set(board.position_history)
+        self._seen.add(board.hash)
+        self.table.new_search()
+        self._orderer = MoveOrderer()
+
+        moves = list(board.legal_moves(board.current_player))
+        if not moves:
+            score = -MATE if board.is_check(board.current_player) else DRAW
+            return SearchResult(None, score, 0, 0, time.time() - start)
+        if self.ordering:
+            entry = self.table.probe(board.hash)
+            moves = self._orderer.order(board, moves, 0, entry[0] if entry is not None else None)
+        else:
+            moves.sort(key=_quiet)
+
+        best_move, best_score, completed = moves[0], None, 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                move, score = self._search_root(moves, depth)
+            except _SearchAborted:
+                break
+            best_move, best_score, completed = move, score, depth
+            # Search the best move first at the next depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) > _MATE_FOUND or len(moves) == 1:
+                break
+            if self._deadline is not None and time.time() >= self._deadline:
+                break
+
+        self._board = None
+        self._seen = None
+        self._orderer = None
+        return SearchResult(best_move, best_score, completed, self.nodes, time.time() - start)
+
+    def _search_root(self, moves, depth):
+        u"""Returns the best of the moves at the root of the search and its score."""
+        board = self._board
+        alpha, beta = -INFINITY, INFINITY
+        best_move = None
+        for move in moves:
+            board.make_move(move)
+            if best_move is None:
+                score = -self._search(depth - 1, -beta, -alpha, 1)
+            else:
+                score = -self._search(depth - 1, -alpha - 1, -alpha, 1)
+                if score > alpha:
+                    score = -self._search(depth - 1, -beta, -alpha, 1)
+            board.unmake_move()
+            if best_move is None or score > alpha:
+                best_move, alpha = move, score
+        return best_move, alpha
+
+    def _search(self, depth, alpha, beta, ply):
+        u"""
+        Returns the score of the board's position for the player to move, searching depth plies deeper. Scores at or
+        below alpha, or at or above beta, are bounds rather than exact as the search stops once they are certain.
+
+        ply -- The number of moves made since the root of the search, to score nearer mates higher
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _SearchAborted()
+        if not self.nodes & _CHECK_EVERY and self._deadline is not None and time.time() >= self._deadline:
+            raise _SearchAborted()
+
+        board = self._board
+        position = board.hash
+        if position in self._seen or board.stalemate_count >= 100 or board.is_insufficient_material():
+            return DRAW
+        if depth <= 0:
+            return self._quiesce(alpha, beta, ply)
+
+        table = self.table
+        entry = table.probe(position)
+        if entry is not None and entry[1] >= depth:
+            bound, score = entry[2], _from_table(entry[3], ply)
+            if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                return score
+
+        color = board.current_player
+        moves = list(board.legal_moves(color))
+        if not moves:
+            return -(MATE - ply) if board.is_check(color) else DRAW
+        ordering = self.ordering
+        if ordering:
+            moves = self._orderer.order(board, moves, ply, entry[0] if entry is not None else None)
+        else:
+            moves.sort(key=_quiet)
+
+        # The board and the positions seen are left part way through the search if it is aborted, they are only used
+        # by the one search so are simply dropped
+        best = -INFINITY
+        best_move = None
+        original_alpha = alpha
+        self._seen.add(position)
+        for move in moves:
+            board.make_move(move)
+            if best == -INFINITY:
+                score = -self._search(depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self._search(depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self._search(depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score > best:
+                best, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if ordering:
+                            self._orderer.cutoff(board, move, ply, depth)
+                        break
+        self._seen.discard(position)
+
+        if best <= original_alpha:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        table.store(position, depth, bound, _to_table(best, ply), best_move)
+        return best
+
+    def _quiesce(self, alpha, beta, ply):
+        u"""
+        Returns the score of the board's position for the player to move once the captures worth making have been
+        made. The player can choose not to capture, so the score is at least the evaluation of the position, unless
+        they are in check when every move is searched.
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _SearchAborted()
+        if not self.nodes & _CHECK_EVERY and self._deadline is not None and time.time() >= self._deadline:
+            raise _SearchAborted()
+
+        board = self._board
+        if board.is_insufficient_material():
+            return DRAW
+        color = board.current_player
+        in_check = board.is_check(color)
+        if in_check:
+            moves = list(board.legal_moves(color))
+            if not moves:
+                return -(MATE - ply)
+            best = -INFINITY
+        else:
+            best = evaluate(board)
+            if best >= beta:
+                return best
+            moves = [move for move in board.legal_moves(color) if move >> 12 & (CAPTURE | PROMOTION)]
+        if best > alpha:
+            alpha = best
+
+        if self.ordering:
+            moves = self._orderer.order(board, moves, ply)
+        for move in moves:
+            if not in_check and static_exchange(board, move) < 0:
+                continue  # Loses material, standing pat is better
+            board.make_move(move)
+            score = -self._quiesce(-beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
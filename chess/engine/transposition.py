@@ -0,0 +1,155 @@
+# -*- coding: UTF-8 -*-
+u"""
+A transposition table for the search, see chess.engine.search.
+
+The same position is often reached by different orders of the same moves (transpositions), and each depth of an
+iterative deepening search visits the positions of the last. The table remembers the result of searching each
+position, keyed by the board's Zobrist hash, so they can be reused rather than searched again.
+
+The table is one preallocated array of 32 bit words, so its memory use is fixed when it is created however long it is
+used. Each entry is three words:
+
+    check -- The top 32 bits of the hash, the bottom bits choose the bucket so together they identify the position
+    info  -- The best move (bits 0-15), the depth searched (bits 16-23), the bound (bits 24-25) and the age of the
+             search that stored it (bits 26-31). An empty entry has an info of 0 as the bound is never 0.
+    score -- The score plus _SCORE_OFFSET, so it is never negative
+
+A position can be stored in any entry of its bucket. When the bucket is full the entry replaced is one left by an
+earlier search if there is one, otherwise the one searched to the least depth.
+"""
+from array import array
+
+# Bounds, how the score relates to the true score of the position
+EXACT = 1
+LOWER = 2  # The true score is at least the score, the search stopped early as the score reached beta
+UPPER = 3  # The true score is at most the score, no move reached alpha
+
+DEFAULT_SIZE = 4 * 1024 * 1024  # Bytes
+BUCKET_SIZE = 4  # Entries per bucket
+
+_WORDS = 3  # Words per entry
+_ENTRY_SIZE = _WORDS * array('I').itemsize
+_SCORE_OFFSET = 1 << 20
+_AGES = 64
+_MAX_DEPTH = 255
+
+
+class TranspositionTable(object):
+    u"""
+    A fixed size, bucketed table of search results keyed by position hash.
+
+    probes, hits, stores and collisions count how the table has been used since it was created or cleared. A collision
+    is a store that overwrites the entry of a different position.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, bucket_size=BUCKET_SIZE):
+        u"""
+        size        -- The memory to use for the entries, in bytes
+        bucket_size -- The number of entries a position can be stored in
+        """
+        self.bucket_size = bucket_size
+        self.buckets = max(size // (_ENTRY_SIZE * bucket_size), 1)
+        self._table = array('I', [0]) * (self.buckets * bucket_size * _WORDS)
+        self.age = 0
+        self.used = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.collisions = 0
+
+    @property
+    def capacity(self):
+        u"""
+        The number of entries the table can hold
+        """
+        return self.buckets * self.bucket_size
+
+    @property
+    def size(self):
+        u"""
+        The bytes used by the entries
+        """
+        return len(self._table) * self._table.itemsize
+
+    def clear(self):
+        u"""Empties the table and resets the counts."""
+        self._table = array('I', [0]) * len(self._table)
+        self.age = 0
+        self.used = self.probes = self.hits = self.stores = self.collisions = 0
+
+    def new_search(self):
+        u"""Starts a new search. Entries stored by earlier searches are replaced first."""
+        self.age = (self.age + 1) % _AGES
+
+    def probe(self, key):
+        u"""Returns the entry stored for a position as a tuple (move, depth, bound, score), or None if there is none.
+
+        key -- The Zobrist hash of the position
+        """
+        self.probes += 1
+        table = self._table
+        check = key >> 32
+        start = key % self.buckets * self.bucket_size * _WORDS
+        for slot in xrange(start, start + self.bucket_size * _WORDS, _WORDS):
+            info = table[slot + 1]
+            if info and table[slot] == check:
+                self.hits += 1
+                return info & 0xFFFF, info >> 16 & 0xFF, info >> 24 & 3, table[slot + 2] - _SCORE_OFFSET
+        return None
+
+    def store(self, key, depth, bound, score, move=None):
+        u"""Stores the result of searching a position, unless a deeper search of it by the same search is stored.
+
+        key   -- The Zobrist hash of the position
+        depth -- The depth the position was searched to
+        bound -- EXACT, LOWER or UPPER
+        score -- The score of the position
+        move  -- The best compact move found, or None
+        """
+        self.stores += 1
+        table = self._table
+        age = self.age
+        check = key >> 32
+        start = key % self.buckets * self.bucket_size * _WORDS
+
+        victim = None
+        victim_priority = None
+        for slot in xrange(start, start + self.bucket_size * _WORDS, _WORDS):
+            info = table[slot + 1]
+            if not info:
+                # Entries are filled in order and never removed, so the rest of the bucket is empty too
+                victim = slot
+                break
+            if table[slot] == check:
+                if bound != EXACT and info >> 26 == age and info >> 16 & 0xFF > depth:
+                    return  # Keep the deeper result
+                victim = slot
+                break
+            # Entries of the current search are kept in preference to older ones, then the deepest are kept
+            priority = (info >> 16 & 0xFF) + (_MAX_DEPTH + 1 if info >> 26 == age else 0)
+            if victim_priority is None or priority < victim_priority:
+                victim, victim_priority = slot, priority
+
+        replaced = table[victim + 1]
+        if not replaced:
+            self.used += 1
+        elif table[victim] != check:
+            self.collisions += 1
+        table[victim] = check
+        table[victim + 1] = (move or 0) | min(depth, _MAX_DEPTH) << 16 | bound << 24 | age << 26
+        table[victim + 2] = score + _SCORE_OFFSET
+
+    def stats(self):
+        u"""
+        Returns a dictionary of how the table has been used: the counts above, the hit rate (hits per probe), the
+        collision rate (collisions per store) and the fill (the fraction of the entries used).
+        """
+        return {
+            u'probes': self.probes,
+            u'hits': self.hits,
+            u'stores': self.stores,
+            u'collisions': self.collisions,
+            u'hit rate': float(self.hits) / self.probes if self.probes else 0.0,
+            u'collision rate': float(self.collisions) / self.stores if self.stores else 0.0,
+            u'fill': float(self.used) / self.capacity,
+        }
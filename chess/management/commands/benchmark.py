@@ -0,0 +1,27 @@
+# -*- coding: UTF-8 -*-
+from django.core.management.base import BaseCommand, CommandError
+
+from chess.benchmark import BENCHMARKS
+
+
+class Command(BaseCommand):
+    u"""
+    Runs the benchmarks of the chess board and prints the results, e.g
+
+        python manage.py benchmark
+        python manage.py benchmark memory
+    """
+    args = u'[benchmark ...]'
+    help = u'Measures the chess board. Benchmarks: ' + u', '.join(name for name, _ in BENCHMARKS)
+
+    def handle(self, *args, **options):
+        names = set(name for name, _ in BENCHMARKS)
+        for name in args:
+            if name not in names:
+                raise CommandError(u"Unknown benchmark '{0}'.".format(name))
+
+        for name, benchmark in BENCHMARKS:
+            if not args or name in args:
+                self.stdout.write(name)
+                for measurement, value, unit in benchmark():
+                    self.stdout.write(u"  {0:<32} {1:>12} {2}".format(measurement, value, unit))
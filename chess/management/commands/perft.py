@@ -0,0 +1,66 @@
+# -*- coding: UTF-8 -*-
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chess.board import Board
+from chess.perft import PERFT_SUITE, perft_divide, run_suite
+
+
+class Command(BaseCommand):
+    u"""
+    Checks the move generator against the standard perft positions and reports how fast it is, e.g
+
+        python manage.py perft --depth 3
+        python manage.py perft kiwipete --depth 2 --divide
+    """
+    args = u'[position ...]'
+    help = u'Counts the positions reachable from the standard perft positions, checking the counts are correct. ' \
+           u'Positions: ' + u', '.join(name for name, _, _, _ in PERFT_SUITE)
+
+    option_list = BaseCommand.option_list + (
+        make_option('--depth', type='int', default=3, help=u'The deepest perft to run, default 3'),
+        make_option('--divide', action='store_true', default=False,
+                    help=u'Show the number of positions after each move, at the deepest depth only'),
+    )
+
+    def handle(self, *args, **options):
+        depth = options['depth']
+        if depth < 1:
+            raise CommandError(u"The depth must be at least 1.")
+
+        names = set(name for name, _, _, _ in PERFT_SUITE)
+        for name in args:
+            if name not in names:
+                raise CommandError(u"Unknown position '{0}'.".format(name))
+
+        if options['divide']:
+            for name, board_string, color, _ in PERFT_SUITE:
+                if not args or name in args:
+                    self.divide(name, Board(board_string, color), depth)
+            return
+
+        failures = 0
+        total_nodes = 0
+        total_seconds = 0.0
+        self.stdout.write(u"{0:<12} {1:>5} {2:>12} {3:>12} {4:>9} {5:>10}".format(
+            u'position', u'depth', u'nodes', u'expected', u'seconds', u'nodes/s'))
+        for name, depth_, nodes, expected, seconds in run_suite(depth, args):
+            result = u'' if nodes == expected else u'  FAILED'
+            failures += nodes != expected
+            total_nodes += nodes
+            total_seconds += seconds
+            self.stdout.write(u"{0:<12} {1:>5} {2:>12} {3:>12} {4:>9.3f} {5:>10.0f}{6}".format(
+                name, depth_, nodes, expected, seconds, nodes / max(seconds, 1e-6), result))
+
+        self.stdout.write(u"Total {0} nodes in {1:.3f} seconds, {2:.0f} nodes/s".format(
+            total_nodes, total_seconds, total_nodes / max(total_seconds, 1e-6)))
+        if failures:
+            raise CommandError(u"{0} perft count(s) did not match.".format(failures))
+
+    def divide(self, name, board, depth):
+        self.stdout.write(u"{0} depth {1}".format(name, depth))
+        divide = perft_divide(board, depth)
+        for move in sorted(divide):
+            self.stdout.write(u"  {0} {1}".format(move, divide[move]))
+        self.stdout.write(u"  total {0}".format(sum(divide.values())))
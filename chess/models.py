@@ -4,39 +4,68 @@ from chess.winner import Winner
 from django.db import models
 from django.contrib.auth.models import User
 from random import random
+from collections import OrderedDict
+import struct
+import threading
 
 
 class BoardField(models.Field):
 
     __metaclass__ = models.SubfieldBase
 
-    description = u"This field stores the position of pices on a chess board. It does not store the previous move " + \
-                  u"which must be stored in a different field."
+    description = u"This field stores a chess board in Forsyth-Edwards Notation (FEN), or packed into 37 bytes. As " + \
+                  u"well as the pieces this includes the player to move, castling rights, en passant square and " + \
+                  u"move counts."
 
-    def __init__(self, *args, **kwargs):
+    # The storage formats
+    FEN = u'fen'
+    PACKED = u'packed'  # See Board.to_bytes
 
+    def __init__(self, *args, **kwargs):
+        u"""
+        storage -- How the board is stored, either BoardField.FEN (the default) or BoardField.PACKED
+        """
+        self.storage = kwargs.pop(u'storage', BoardField.FEN)
+        if self.storage not in (BoardField.FEN, BoardField.PACKED):
+            raise ValueError(u"Invalid storage '{0}', should be 'fen' or 'packed'.".format(self.storage))
         kwargs[u'max_length'] = 100  # This is sufficient for all the pieces, squares and annotations
         super(BoardField, self).__init__(*args, **kwargs)
 
     def deconstruct(self):
         name, path, args, kwargs = super(BoardField, self).deconstruct()
         del kwargs[u"max_length"]
+        if self.storage != BoardField.FEN:
+            kwargs[u'storage'] = self.storage
         return name, path, args, kwargs
 
     def to_python(self, value):
-        u"""Creates a new board from the board described by board_string."""
+        u"""Creates a new board from the FEN, packed bytes, or the board string of games saved before FEN was used."""
         if isinstance(value, Board):
             return value
         else:
             if value is not None:
                 if len(value) == 0:  # Web requrests can provide an empty string
                     value = None
+                elif self.storage == BoardField.PACKED and not isinstance(value, unicode):
+                    return Board.from_bytes(value)
+                elif u'/' in value:
+                    return Board.from_fen(value)
             return Board(value)
 
     def get_prep_value(self, board):
-        return str(board)
+        if self.storage == BoardField.PACKED:
+            return board.to_bytes()
+        return board.to_fen()
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super(BoardField, self).get_db_prep_value(value, connection, prepared)
+        if self.storage == BoardField.PACKED and value is not None:
+            return connection.Database.Binary(value)
+        return value
 
     def get_internal_type(self):
+        if self.storage == BoardField.PACKED:
+            return u'BinaryField'
         return u'CharField'
 
     def value_to_string(self, obj):
@@ -44,6 +73,38 @@ class BoardField(models.Field):
         return self.get_prep_value(value)
 
 
+class PositionHistoryField(models.Field):
+
+    __metaclass__ = models.SubfieldBase
+
+    description = u"This field stores the hashes of the earlier positions of a game, see Board.position_history. " + \
+                  u"Each hash is packed into 8 bytes."
+
+    _HASH = struct.Struct('>Q')
+
+    def to_python(self, value):
+        u"""Returns the tuple of hashes, unpacking them if they have been loaded from the database."""
+        if value is None:
+            return ()
+        elif isinstance(value, (tuple, list)):
+            return tuple(value)
+        else:
+            value = bytes(value)
+            size = PositionHistoryField._HASH.size
+            return tuple(PositionHistoryField._HASH.unpack_from(value, offset)[0]
+                         for offset in xrange(0, len(value), size))
+
+    def get_prep_value(self, hashes):
+        return b''.join(PositionHistoryField._HASH.pack(zobrist) for zobrist in hashes)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super(PositionHistoryField, self).get_db_prep_value(value, connection, prepared)
+        return connection.Database.Binary(value)
+
+    def get_internal_type(self):
+        return u'BinaryField'
+
+
 class ColorField(models.Field):
 
     __metaclass__ = models.SubfieldBase
@@ -185,6 +246,13 @@ class GameModelManager(models.Manager):
         return game_model
 
 
+# The board each game was last used with, kept so the moves it has cached can be reused by the next request for the
+# game, see GameModel.remember_board. Boards are otherwise rebuilt from the database on every request, without them.
+_REMEMBERED_GAMES = 256
+_remembered_boards = OrderedDict()  # From game id to a private copy of the board, the least recently used first
+_remembered_lock = threading.Lock()
+
+
 class GameModel(models.Model):
     u"""
     This class wraps the 'board' modal to allow django's persistence to manage the storage of games.
@@ -206,8 +274,10 @@ class GameModel(models.Model):
     _active_player = models.ForeignKey(ColorModel, default=Color.WHITE.value)
     _winner = models.ForeignKey(WinnerModel, default=Winner.UNDECIDED.value)
     _board = BoardField(default=Board())
+    _position_history = PositionHistoryField(default=tuple)
 
-    # Previous moves are linked via a foreign key from MoveModel
+    # Previous moves are linked via a foreign key from MoveModel. They are not needed to load the board, the FEN
+    # stored in _board includes the en passant square.
     @property
     def board(self):
         u"""
@@ -215,15 +285,15 @@ class GameModel(models.Model):
 
         returns -- A board
         """
+        # The FEN in _board records the player to move, and the winners are keyed by their value (see the fixtures), so
+        # neither needs another query
         board = self._board
-        board.current_player = self._active_player.color
-        board.winner = self._winner.winner
-
-        try:
-            board.previous_move = MoveModel.objects.filter(game_id=self.id).latest("id")
-        except MoveModel.DoesNotExist:
-            # New games don't have previos moves
-            pass
+        board.winner = Winner(self._winner_id)
+        board.position_history = self._position_history
+        with _remembered_lock:
+            remembered = _remembered_boards.get(self.id)
+        if remembered is not None:
+            board._adopt_move_cache(remembered)
         return board
 
         # return self.board
@@ -238,11 +308,14 @@ class GameModel(models.Model):
         """
         self._active_player = ColorModel.objects.get(color=board.current_player)
         self._board = board
+        self._position_history = board.position_history
         self._winner = WinnerModel.objects.get(winner=board.winner)
+        self.remember_board(board)
 
+        # The previous move is only set when a piece has been moved since the board was loaded, not by a promotion
         m = board.previous_move
         if m is not None:
-            move_model = MoveModel.objects.create(
+            MoveModel.objects.create(
                 game_id=self.id,
                 from_loc=m.from_loc,
                 to_loc=m.to_loc,
@@ -257,10 +330,27 @@ class GameModel(models.Model):
             )
 
         # TODO: Should be  in an atomic transaction
-        move_model.save()
         self.save()  # Including the save in here is ~iffy, BUT since we save the move, we should save the board as
                      # close as possible to keep things consistent
 
+    def remember_board(self, board):
+        u"""
+        Keeps the moves the board has cached, so the next request for this game only generates the moves of the pieces
+        changed since, rather than those of every piece. The views call this once they have finished with the board.
+
+        board -- The board of this game
+        """
+        if self.id is None:
+            return
+        # The board can still be changed by the request, so a copy with its cached moves is kept
+        remembered = board.copy()
+        remembered._adopt_move_cache(board)
+        with _remembered_lock:
+            _remembered_boards.pop(self.id, None)
+            _remembered_boards[self.id] = remembered
+            if len(_remembered_boards) > _REMEMBERED_GAMES:
+                _remembered_boards.popitem(last=False)
+
     def active_player(self, username):
         u"""
         Check is the username provided is that of the active player
@@ -1,7 +1,101 @@
+from chess.bitboard import SQUARE_NAMES, KNIGHT, BISHOP, ROOK, QUEEN, square_index
+
+# Compact moves are plain integers: bits 0-5 hold the index of the square moved from, bits 6-11 the square moved to
+# and bits 12-15 the flags below. They are cheap to create, compare, hash and store, which matters when generating
+# or searching thousands of moves. Move (below) is used for recording the moves taken in a game.
+QUIET = 0
+DOUBLE_PAWN_PUSH = 1
+KING_CASTLE = 2
+QUEEN_CASTLE = 3
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8  # The promoted piece is in the lowest two flag bits, see promotion_kind
+PROMOTION_CAPTURE = PROMOTION | CAPTURE
+
+_PROMOTION_KINDS = (KNIGHT, BISHOP, ROOK, QUEEN)
+_PROMOTION_LETTERS = u'NBRQ'
+
+
+def compact_move(from_index, to_index, flags=QUIET):
+    u"""Returns a compact move.
+
+    from_index -- The index of the square the piece moves from, see chess.bitboard
+    to_index   -- The index of the square the piece moves to
+    flags      -- One of the move flags, e.g CAPTURE
+    """
+    return from_index | to_index << 6 | flags << 12
+
+
+def promotion_move(from_index, to_index, kind, capture=False):
+    u"""Returns a compact move of a pawn that is promoted to a piece of the kind specified, e.g QUEEN."""
+    flags = PROMOTION | _PROMOTION_KINDS.index(kind)
+    if capture:
+        flags |= CAPTURE
+    return compact_move(from_index, to_index, flags)
+
+
+def move_from(move):
+    u"""Returns the index of the square a compact move starts from."""
+    return move & 63
+
+
+def move_to(move):
+    u"""Returns the index of the square a compact move ends on."""
+    return move >> 6 & 63
+
+
+def move_flags(move):
+    u"""Returns the flags of a compact move."""
+    return move >> 12
+
+
+def is_capture(move):
+    u"""Returns True if the compact move captures a piece, including en passant."""
+    return move >> 12 & CAPTURE != 0
+
+
+def is_promotion(move):
+    u"""Returns True if the compact move promotes a pawn."""
+    return move >> 12 & PROMOTION != 0
+
+
+def promotion_kind(move):
+    u"""Returns the kind of piece a pawn is promoted to, or None if the compact move is not a promotion."""
+    if move >> 12 & PROMOTION:
+        return _PROMOTION_KINDS[move >> 12 & 3]
+    return None
+
+
+def move_name(move):
+    u"""Returns the squares of a compact move, followed by the promoted piece if any, e.g 'E2E4' or 'B7A8Q'."""
+    name = SQUARE_NAMES[move & 63] + SQUARE_NAMES[move >> 6 & 63]
+    if move >> 12 & PROMOTION:
+        name += _PROMOTION_LETTERS[move >> 12 & 3]
+    return name
+
+
+def _flag_property(bit, doc):
+    u"""Returns a boolean property stored in one bit of a Move's flags."""
+    def get(self):
+        return self._flags & bit != 0
+
+    def set(self, value):
+        if value:
+            self._flags |= bit
+        else:
+            self._flags &= ~bit
+
+    return property(get, set, doc=doc)
+
+
 class Move(object):
     """
     Represents a move in a chess game.
+
+    Games keep every move taken, so moves are kept small: the squares are stored as their index and the true or false
+    attributes share one integer of flags.
     """
+    __slots__ = ('piece', '_from', '_to', '_flags', 'promotion', 'display_value')
 
     def __init__(self, piece, from_, to_, double_move=False, capture=False, king_side_castle=False,
                  queen_side_castle=False, check=False, checkmate=False, stalemate=False, promotion=None,
@@ -15,18 +109,39 @@ class Move(object):
         double_move -- True if a pawn has moved two squares in one turn
         """
         self.piece = piece
-        self.from_loc = from_
-        self.to_loc = to_
-        self.double_move = double_move
-        self.capture = capture
-        self.king_side_castle = king_side_castle
-        self.queen_side_castle = queen_side_castle
-        self.check = check
-        self.checkmate = checkmate
-        self.stalemate = stalemate
+        self._from = square_index(from_)
+        self._to = square_index(to_)
+        self._flags = 0 | (double_move and 1) | (capture and 2) | (king_side_castle and 4) | \
+            (queen_side_castle and 8) | (check and 16) | (checkmate and 32) | (stalemate and 64)
         self.promotion = promotion
         self.display_value = display_value
 
+    double_move = _flag_property(1, u"True if a pawn has moved two squares in one turn")
+    capture = _flag_property(2, u"True if a piece was captured")
+    king_side_castle = _flag_property(4, u"True if the king castled on the king's side")
+    queen_side_castle = _flag_property(8, u"True if the king castled on the queen's side")
+    check = _flag_property(16, u"True if the move put the other player in check")
+    checkmate = _flag_property(32, u"True if the move put the other player in checkmate")
+    stalemate = _flag_property(64, u"True if the move ended the game in a stalemate")
+
+    @property
+    def from_loc(self):
+        """The name of the square the piece moved from."""
+        return SQUARE_NAMES[self._from]
+
+    @from_loc.setter
+    def from_loc(self, from_):
+        self._from = square_index(from_)
+
+    @property
+    def to_loc(self):
+        """The name of the square the piece moved to."""
+        return SQUARE_NAMES[self._to]
+
+    @to_loc.setter
+    def to_loc(self, to_):
+        self._to = square_index(to_)
+
     # def display(self):
     #     """Returns the display string for the move in ??? notation."""
     #     # TODO: Add logic to display castling better
@@ -0,0 +1,89 @@
+# -*- coding: UTF-8 -*-
+u"""
+Performance test (perft) of the move generator.
+
+Perft counts every position reachable from a starting position in a given number of moves. The counts for the
+standard test positions are well known, so comparing against them checks the move generator is correct, including
+the rare moves like en passant, castling and promotion, while timing the count measures how fast it is.
+
+See https://chessprogramming.org/Perft_Results
+"""
+import time
+
+from chess.board import Board
+from chess.color import Color
+from chess.move import move_name
+
+# The standard perft positions as (name, board string, player to move, {depth: number of positions})
+PERFT_SUITE = (
+    (u'start', u"♖♘♗♕♔♗♘♖-♙♙♙♙♙♙♙♙-________-________-________-________-♟♟♟♟♟♟♟♟-♜♞♝♛♚♝♞♜", Color.WHITE,
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    (u'kiwipete', u"♖___♔__♖-♙♙♙♗♗♙♙♙-__♘__♕_♟-_♟__♙___-___♙♘___-♝♞__♟♞♟_-♟_♟♟♛♟♝_-♜___♚__♜", Color.WHITE,
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    (u'position_3', u"________-____♙_♙_-________-_m♖___♟_m♚-m♔♙_____m♜-___♟____-__♟_____-________", Color.WHITE,
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    (u'position_4', u"m♖__♕_m♖m♔_-♙♟_♙__♙♙-♛____♘__-♗♗♙_♙___-♞♙______-_♝___♞♝♘-♙♟♟♟_♟♟♟-♜___♚__♜", Color.WHITE,
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    (u'position_5', u"♖♘♗♕♔__♖-♙♙♙_♘♞♙♙-________-__♗_____-________-__♟_____-♟♟_♙♝♟♟♟-m♜♞♝♛_m♚_m♜", Color.WHITE,
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    (u'position_6', u"m♖____m♖m♔_-_♙♙_♕♙♙♙-♙_♘♙_♘__-__♗_♙_♝_-__♝_♟_♗_-♟_♞♟_♞__-_♟♟_♛♟♟♟-m♜____m♜m♚_",
+     Color.WHITE, {1: 46, 2: 2079, 3: 89890, 4: 3894594}),
+)
+
+
+def perft(board, depth):
+    u"""Returns the number of positions reachable from the board in exactly depth moves.
+
+    board -- The board to count from, it is left unchanged
+    depth -- The number of moves (plies) to make
+    """
+    if depth == 0:
+        return 1
+
+    moves = list(board.legal_moves(board.current_player))
+    if depth == 1:
+        # Each legal move leads to one position, there is no need to make them
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def perft_divide(board, depth):
+    u"""Returns a dictionary of the name of each legal move, e.g 'E2E4', to the number of positions reachable after
+    it, so that depth moves are made in total. Comparing these against another move generator narrows down which
+    move is generated wrongly.
+
+    board -- The board to count from, it is left unchanged
+    depth -- The number of moves (plies) to make, at least 1
+    """
+    divide = {}
+    for move in list(board.legal_moves(board.current_player)):
+        board.make_move(move)
+        divide[move_name(move)] = perft(board, depth - 1)
+        board.unmake_move()
+    return divide
+
+
+def run_suite(max_depth, names=None):
+    u"""Runs perft for each position in the suite, up to max_depth, yielding a result for each position and depth.
+
+    max_depth -- The deepest perft to run
+    names     -- The names of the positions to run, or None for every position
+
+    Yields    -- (name, depth, nodes, expected nodes, seconds taken)
+    """
+    for name, board_string, color, expected in PERFT_SUITE:
+        if names and name not in names:
+            continue
+        board = Board(board_string, color)
+        for depth in sorted(expected):
+            if depth > max_depth:
+                break
+            start = time.time()
+            nodes = perft(board, depth)
+            yield name, depth, nodes, expected[depth], time.time() - start
@@ -0,0 +1,147 @@
+# -*- coding: UTF-8 -*-
+u"""
+Piece-square tables, the bonus (or penalty) in centipawns for a piece standing on each square.
+
+Each piece has a table for the middlegame and one for the endgame, as a king should hide behind its pawns while the
+queens are on the board but come out to fight once they are gone. Like the Zobrist hash, a board keeps the sum of its
+pieces' scores up to date as pieces are placed and removed, so the evaluation never has to look at every square. See
+chess.engine.evaluation for how the two sums are blended by the phase of the game.
+
+The middlegame and endgame scores of a square are packed into one integer, pack(middlegame, endgame), so the board
+adds a single number per piece. Packed scores can be added and subtracted as they are, the sums are unpacked with
+middlegame() and endgame().
+
+The tables are those of Tomasz Michniewski's Simplified Evaluation Function, with endgame tables for the king and
+pawns. See https://www.chessprogramming.org/Simplified_Evaluation_Function
+"""
+from chess.bitboard import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+# Each table is laid out as a board is printed, with white's side at the bottom: the first row is rank 8 and the last
+# is rank 1. The tables are for white, black's are mirrored.
+_PAWN = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_PAWN_ENDGAME = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    80, 80, 80, 80, 80, 80, 80, 80,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    30, 30, 30, 30, 30, 30, 30, 30,
+    20, 20, 20, 20, 20, 20, 20, 20,
+    10, 10, 10, 10, 10, 10, 10, 10,
+    0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_KNIGHT = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+_BISHOP = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+_ROOK = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+)
+_QUEEN = (
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+)
+_KING = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+)
+_KING_ENDGAME = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+)
+
+# The (middlegame, endgame) tables of each kind of piece, indexed by kind
+_TABLES = {
+    PAWN: (_PAWN, _PAWN_ENDGAME),
+    KNIGHT: (_KNIGHT, _KNIGHT),
+    BISHOP: (_BISHOP, _BISHOP),
+    ROOK: (_ROOK, _ROOK),
+    QUEEN: (_QUEEN, _QUEEN),
+    KING: (_KING, _KING_ENDGAME),
+}
+
+# How much each kind of piece counts towards the middlegame, indexed by Piece.code. A board with all its knights,
+# bishops, rooks and queens is at MAX_PHASE, one with only kings and pawns is at 0.
+PHASES = (0, 1, 1, 2, 4, 0) * 2
+MAX_PHASE = 24
+
+_HALF = 1 << 15
+
+
+def pack(middlegame, endgame):
+    u"""Returns a middlegame and an endgame score packed into one integer.
+
+    middlegame -- The middlegame score, between -32768 and 32767
+    endgame    -- The endgame score
+    """
+    return (endgame << 16) + middlegame
+
+
+def middlegame(score):
+    u"""Returns the middlegame part of a packed score."""
+    return (score + _HALF & 0xFFFF) - _HALF
+
+
+def endgame(score):
+    u"""Returns the endgame part of a packed score."""
+    return (score - middlegame(score)) >> 16
+
+
+# PIECE_SQUARES[code][index] is the packed score of a piece with Piece.code on the square at index, from white's point
+# of view, so black's pieces score the negation of white's on the mirrored square
+PIECE_SQUARES = [None] * 12
+for _kind, (_middlegame, _endgame) in _TABLES.items():
+    # Index 0 (A1) is the first square of the last row of a table, xoring with 56 flips the rank
+    PIECE_SQUARES[_kind] = [pack(_middlegame[index ^ 56], _endgame[index ^ 56]) for index in range(64)]
+    PIECE_SQUARES[_kind + 6] = [-pack(_middlegame[index], _endgame[index]) for index in range(64)]
+
+del _kind, _middlegame, _endgame
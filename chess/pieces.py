@@ -1,4 +1,5 @@
 from chess.color import Color
+from chess.bitboard import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
 
 
 class InvlaidPieceException(Exception):
@@ -7,6 +8,13 @@ class InvlaidPieceException(Exception):
 
 
 class Piece(object):
+    u"""A chess piece.
+
+    Pieces are immutable and there is only ever one instance of each colored piece, e.g WhiteQueen() always returns
+    the same object. Everything that changes during a game, such as whether a king can still castle, is held by the
+    board instead.
+    """
+    __slots__ = ()
     symbol = u'?'
     simple_simbol = u'?'  # Used in JSON representation
     color = None
@@ -14,6 +22,29 @@ class Piece(object):
     # If none then it can move an unlimted amount in a direction
     limit = None
     value = None  # Tradional chess values - used to determince some statemate
+    kind = None  # One of the piece kinds in chess.bitboard
+    code = None  # The index of the board's bitboard holding pieces of this kind and color
+
+    def __new__(cls):
+        u"""Returns the only instance of the piece, creating it the first time."""
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = object.__new__(cls)
+            type.__setattr__(cls, '_instance', instance)
+        return instance
+
+    def __setattr__(self, name, value):
+        raise AttributeError(u"Cannot set {name}, chess pieces are immutable.".format(name=name))
+
+    def __reduce__(self):
+        # Pickling and copying return the same instance
+        return type(self), ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __str__(self):
         u"""Return a utf-8 encoded string representation of this chess piece."""
@@ -23,21 +54,15 @@ class Piece(object):
         u"""Return the unicode string representation of this chess piece."""
         return self.symbol
 
-    def move(self, location):
-        u"""Move a piece to the location specified. Does not check if this is a legal chess move. """
-        self.has_moved = True
-        self.location = location
-
     @classmethod
     def get_piece_class(cls, symbol):
         u"""Returns class the piece identified by its unicode symbol
            Raises a ValueError if the code is invalid.
         """
-        for cls in Piece.__subclasses__():
-            if cls.symbol == symbol:
-                return cls
-
-        raise ValueError()
+        try:
+            return type(_PIECES_BY_SYMBOL[symbol])
+        except KeyError:
+            raise ValueError()
 
 
 class King(object):
@@ -46,37 +71,36 @@ class King(object):
     This should not be created directly, instead a BlackKing or WhiteKing
     should be instanciated.
     """
+    __slots__ = ()
     attacks = frozenset([(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])  # x,y
     limit = 1  # The King may only move one place via his move vectors
     value = 0
-    has_moved = False
+    kind = KING
 
     def __new__(cls, *args, **kwargs):
         if cls is King:
             raise TypeError(u"King class may not be instantiated.")
-        return object.__new__(cls)
+        return super(King, cls).__new__(cls)
 
 
 class WhiteKing(King, Piece):
     u"""The White King chess piece."""
+    __slots__ = ()
     symbol = u'\u2654'
     simple_simbol = u'WK'
     name = u'WhiteKing'
     color = Color.WHITE
-
-    def __init__(self, has_moved=False):
-        self.has_moved = has_moved
+    code = KING
 
 
 class BlackKing(King, Piece):
     u"""The Black King chess piece."""
+    __slots__ = ()
     symbol = u'\u265a'
     simple_simbol = u'BK'
     name = u'BlackKing'
     color = Color.BLACK
-
-    def __init__(self, has_moved=False):
-        self.has_moved = has_moved
+    code = KING + 6
 
 
 class Queen(object):
@@ -85,29 +109,35 @@ class Queen(object):
     This should not be created directly, instead a BlackQueen or WhiteQueen
     should be instanciated.
     """
+    __slots__ = ()
     attacks = frozenset([(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])  # x,y
     value = 9
+    kind = QUEEN
 
     def __new__(cls, *args, **kwargs):
         if cls is Queen:
             raise TypeError(u"Queen class may not be instantiated.")
-        return object.__new__(cls, *args, **kwargs)
+        return super(Queen, cls).__new__(cls)
 
 
 class WhiteQueen(Queen, Piece):
     u"""The White Queen chess piece."""
+    __slots__ = ()
     symbol = u'\u2655'
     simple_simbol = u'WQ'
     name = u'WhiteQueen'
     color = Color.WHITE
+    code = QUEEN
 
 
 class BlackQueen(Queen, Piece):
     u"""The Black Queen chess piece."""
+    __slots__ = ()
     symbol = u'\u265b'
     simple_simbol = u'BQ'
     name = u'BlackQueen'
     color = Color.BLACK
+    code = QUEEN + 6
 
 
 class Rook(object):
@@ -116,36 +146,35 @@ class Rook(object):
     This should not be created directly, instead a BlackRook or WhiteRook
     should be instanciated.
     """
+    __slots__ = ()
     attacks = frozenset([(1, 0), (0, 1), (-1, 0), (0, -1)])
     value = 5
-    has_moved = False
+    kind = ROOK
 
     def __new__(cls, *args, **kwargs):
         if cls is Rook:
             raise TypeError(u"Rook class may not be instantiated.")
-        return object.__new__(cls)
+        return super(Rook, cls).__new__(cls)
 
 
 class WhiteRook(Rook, Piece):
     u"""The White Rook chess piece."""
+    __slots__ = ()
     symbol = u'\u2656'
     simple_simbol = u'WR'
     name = u'WhiteRook'
     color = Color.WHITE
-
-    def __init__(self, has_moved=False):
-        self.has_moved = has_moved
+    code = ROOK
 
 
 class BlackRook(Rook, Piece):
     u"""The Black Rook chess piece."""
+    __slots__ = ()
     symbol = u'\u265c'
     simple_simbol = u'BR'
     name = u'BlackRook'
     color = Color.BLACK
-
-    def __init__(self, has_moved=False):
-        self.has_moved = has_moved
+    code = ROOK + 6
 
 
 class Bishop(object):
@@ -154,29 +183,35 @@ class Bishop(object):
     This should not be created directly, instead a BlackBishop or WhiteBishop
     should be instanciated.
     """
+    __slots__ = ()
     attacks = frozenset([(1, 1), (-1, 1), (-1, -1), (1, -1)])  # x,y
     value = 3
+    kind = BISHOP
 
     def __new__(cls, *args, **kwargs):
         if cls is Bishop:
             raise TypeError("Bishop class may not be instantiated.")
-        return object.__new__(cls, *args, **kwargs)
+        return super(Bishop, cls).__new__(cls)
 
 
 class WhiteBishop(Bishop, Piece):
     u"""The White Bishop chess piece."""
+    __slots__ = ()
     symbol = u'\u2657'
     simple_simbol = u'WB'
     name = u'WhiteBishop'
     color = Color.WHITE
+    code = BISHOP
 
 
 class BlackBishop(Bishop, Piece):
     """The Black Bishop chess piece."""
+    __slots__ = ()
     symbol = u'\u265d'
     simple_simbol = u'BB'
     name = u'BlackBishop'
     color = Color.BLACK
+    code = BISHOP + 6
 
 
 class Knight(object):
@@ -185,31 +220,37 @@ class Knight(object):
     This should not be called directly, instead a BlackKnight or WhiteKnight
     should be instanciated.
     """
+    __slots__ = ()
     # All moves a knight may make
     attacks = frozenset([(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)])
     limit = 1  # Knights only move one place via their move vectors
     value = 3
+    kind = KNIGHT
 
     def __new__(cls, *args, **kwargs):
         if cls is Knight:
             raise TypeError(u"Knight class may not be instantiated.")
-        return object.__new__(cls, *args, **kwargs)
+        return super(Knight, cls).__new__(cls)
 
 
 class WhiteKnight(Knight, Piece):
     u"""The White Knight chess piece."""
+    __slots__ = ()
     symbol = u'\u2658'
     simple_simbol = u'WN'
     name = u'WhiteKnight'
     color = Color.WHITE
+    code = KNIGHT
 
 
 class BlackKnight(Knight, Piece):
     u"""The Black Knight chess piece."""
+    __slots__ = ()
     symbol = u'\u265e'
     simple_simbol = u'BN'
     name = u'BlackKnight'
     color = Color.BLACK
+    code = KNIGHT + 6
 
 
 class Pawn(object):
@@ -218,14 +259,16 @@ class Pawn(object):
     This should not be called directly, instead a  BlackPawn or WhitePawn
     should be instanciated.
     """
+    __slots__ = ()
     limit = 1  # Pawns can only attack/move 1 space (double move is treated special)
     value = 1
+    kind = PAWN
     forward = None  # Either 1 or -1 depending on subclass
 
     def __new__(cls, *args, **kwargs):
         if cls is Pawn:
             raise TypeError(u"Pawn class may not be instantiated.")
-        return object.__new__(cls, *args, **kwargs)
+        return super(Pawn, cls).__new__(cls)
 
     @property
     def attacks(self):
@@ -245,60 +288,63 @@ class Pawn(object):
 
 class WhitePawn(Pawn, Piece):
     u"""A White Pawn chess piece."""
+    __slots__ = ()
     symbol = u'\u2659'
     simple_simbol = u'WP'
     name = u'WhitePawn'
     color = Color.WHITE
+    code = PAWN
     forward = 1  # Based off White starting at rows 1,2
 
 
 class BlackPawn(Pawn, Piece):
     u"""A Black Pawn chess piece."""
+    __slots__ = ()
     symbol = u'\u265f'
     simple_simbol = u'BP'
     name = u'BlackPawn'
     color = Color.BLACK
+    code = PAWN + 6
     forward = -1  # Based off Black starting at rows 7,8
 
 
+# The only instance of each piece, indexed by Piece.code
+PIECES = (WhitePawn(), WhiteKnight(), WhiteBishop(), WhiteRook(), WhiteQueen(), WhiteKing(),
+          BlackPawn(), BlackKnight(), BlackBishop(), BlackRook(), BlackQueen(), BlackKing())
+
+_PIECES_BY_NAME = dict((piece.name, piece) for piece in PIECES)
+_PIECES_BY_SYMBOL = dict((piece.symbol, piece) for piece in PIECES)
+_PIECES_BY_SYMBOL.update((piece.simple_simbol, piece) for piece in PIECES)
+
+
 class PieceFactory(object):
     u"""The peice factory allows the generic creation of chess pieces based on their name."""
 
     @staticmethod
-    def create(name, has_moved=False):
-        u""" Creates a new piece of the type equal to name.
+    def create(name):
+        u""" Returns the piece with the name specified.
 
         name -- The name of the chess piece, one of: WhiteKing, WhiteQueen, WhiteRook, WhiteBishop, WhiteKnight,
                WhitePawn, BlackKing, BlackQueen, BlackRook, BlackBishop, BlackKnight, or BlackPawn
-        has_moved -- Boolean, marks whether the chess piece has previously moved or not.
 
-        returns -- A piece of the class which is the same as the name specified
+        returns -- The piece of the class which is the same as the name specified
         raises  -- InvlaidPieceException is the name is an invalid value.
         """
-        types = Piece.__subclasses__()
-        piece_names = [(type.__name__, type) for type in types]
-        d = dict(piece_names)
         try:
-            piece = d[name]
+            return _PIECES_BY_NAME[name]
         except KeyError:
             raise InvlaidPieceException("The chess piece {piece} does not exist.".format(piece=name))
 
-        if hasattr(piece, 'has_moved'):
-            return piece(has_moved)
-        else:
-            return piece()
-
     @staticmethod
-    def createFromSymbol(symbol, has_moved):
-        types = Piece.__subclasses__()
-        symbols = [(type.symbol, type) for type in types]
-        d = dict(symbols)
+    def createFromSymbol(symbol):
+        u""" Returns the piece with the symbol specified.
+
+        symbol -- Either the unicode symbol of the piece, e.g u'\u2654', or its simple symbol, e.g 'WK'
+
+        returns -- The piece with the symbol specified
+        raises  -- InvlaidPieceException is the symbol is an invalid value.
+        """
         try:
-            piece = d[symbol]
+            return _PIECES_BY_SYMBOL[symbol]
         except KeyError:
             raise InvlaidPieceException("The chess piece {symbol} does not exist.".format(symbol=symbol))
-
-        if hasattr(piece, 'has_moved'):
-            return piece(has_moved)
-        else:
-            return piece()
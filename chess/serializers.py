@@ -20,7 +20,10 @@ class GameModelSerializer(serializers.ModelSerializer):
         u"""
         Returns a specialy formatted version of the board
         """
-        return obj.board.display_json()
+        board = obj.board
+        display = board.display_json()
+        obj.remember_board(board)
+        return display
 
     def _is_promote_phase(self, obj):
         u"""
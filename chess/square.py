@@ -2,8 +2,16 @@ class InvalidSquareException(Exception):
     pass
 
 
+# The names of the squares indexed from A1 (0) to H8 (63), row by row. See chess.bitboard
+SQUARE_NAMES = tuple(chr(ord(u'A') + i % 8) + str(i // 8 + 1) for i in range(64))
+
+
 class Square(object):
-    u"""Represents the coordinates of any square on the chess board."""
+    u"""Represents the coordinates of any square on the chess board.
+
+    Only the index of the square and the piece on it are stored, the name and coordinates are looked up from the index.
+    """
+    __slots__ = ('index', 'piece')
 
     def __init__(self, square_name=None, x=None, y=None, piece=None):
         u"""Returns the square on a chess board.
@@ -24,11 +32,33 @@ class Square(object):
                 raise InvalidSquareException(u"Only square_name or x,y coords should be defined")
             x, y = Square._coordsFromName(square_name)
 
-        self.name = square_name.upper()
-        self.x = x
-        self.y = y
+        self.index = (y - 1) * 8 + x - 1
         self.piece = piece
 
+    @classmethod
+    def from_index(cls, index, piece=None):
+        u"""Returns the square with the index specified, skipping the checks on the name or coordinates.
+
+        index -- The index of the square, from 0 (A1) to 63 (H8)
+        piece -- A chess piece to place in this square
+        """
+        square = cls.__new__(cls)
+        square.index = index
+        square.piece = piece
+        return square
+
+    @property
+    def name(self):
+        return SQUARE_NAMES[self.index]
+
+    @property
+    def x(self):
+        return self.index % 8 + 1
+
+    @property
+    def y(self):
+        return self.index // 8 + 1
+
     @property
     def row(self):
         return self.y
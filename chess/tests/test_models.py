@@ -1,9 +1,13 @@
 # -*- coding: UTF-8 -*-
 from django.test import TestCase
 from django.contrib.auth.models import User
-from hamcrest import is_, assert_that, equal_to  # , all_of, contains_inanyorder, instance_of
+from django.db import connection
+from hamcrest import is_, assert_that, equal_to, has_item  # , all_of, contains_inanyorder, instance_of
 
-from chess.models import ColorModel, WinnerModel, GameModel, MoveModel
+from chess.board import Board, PACKED_SIZE
+from chess.bitboard import WHITE, square_index
+from chess.move import move_name
+from chess.models import BoardField, ColorModel, WinnerModel, GameModel, MoveModel
 from chess.color import Color
 from chess.winner import Winner
 
@@ -131,6 +135,84 @@ class TestGameModel_2(TestCase):
         assert_that(game.board.current_player, is_(Color.WHITE))
 
 
+class TestGameModelBoard(TestCase):
+    """
+    Tests the board is saved and loaded as FEN
+    """
+    fixtures = ['test_users.json', ]
+
+    def test_save_and_load_en_passant(self):
+        user_1 = User.objects.get(username='adam')
+        user_2 = User.objects.get(username='bob')
+        game = GameModel.objects.create(white_player=user_1, black_player=user_2)
+        board = game.board
+        for from_, to_ in [('E2', 'E4'), ('A7', 'A6'), ('E4', 'E5'), ('D7', 'D5')]:
+            board.move_piece(from_, to_)
+            game.board = board
+
+        fen = u"rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3"
+        with self.assertNumQueries(1):
+            loaded_game = GameModel.objects.get(id=game.id)
+            loaded_board = loaded_game.board
+            assert_that(loaded_board.to_fen(), equal_to(fen))
+            assert_that(loaded_board.current_player, is_(Color.WHITE))
+            assert_that(loaded_board.winner, is_(Winner.UNDECIDED))
+        moves = [move_name(move) for move in loaded_board.legal_moves(Color.WHITE)]
+        assert_that(moves, has_item(u'E5D6'))
+
+    def test_save_and_load_position_history(self):
+        user_1 = User.objects.get(username='adam')
+        user_2 = User.objects.get(username='bob')
+        game = GameModel.objects.create(white_player=user_1, black_player=user_2)
+        board = game.board
+        for from_, to_ in [('G1', 'F3'), ('G8', 'F6'), ('F3', 'G1'), ('F6', 'G8')] * 2:
+            board.move_piece(from_, to_)
+            game.board = board
+
+        loaded_game = GameModel.objects.get(id=game.id)
+        assert_that(loaded_game.board.position_history, equal_to(board.position_history))
+        assert_that(loaded_game.board.is_threefold_repetition(), is_(True))
+
+    def test_cached_moves_kept_between_loads(self):
+        u"""The moves cached by one request for a game are reused by the next, which loads the board again."""
+        user_1 = User.objects.get(username='adam')
+        user_2 = User.objects.get(username='bob')
+        game = GameModel.objects.create(white_player=user_1, black_player=user_2)
+        for from_, to_ in [('E2', 'E4'), ('E7', 'E5')]:
+            game = GameModel.objects.get(id=game.id)
+            board = game.board
+            board._moves_by_square(board.current_player)
+            game.remember_board(board)
+            board.move_piece(from_, to_)
+            game.board = board
+
+        board = GameModel.objects.get(id=game.id).board
+        # The knight on B1 was not affected by either move, the bishop on F1 can now move through E2
+        board._clean_move_cache()
+        entries = board._move_cache[WHITE][2]
+        assert_that(square_index('B1') in entries, is_(True))
+        assert_that(square_index('F1') in entries, is_(False))
+        expected = Board.from_fen(board.to_fen())._moves_by_square(Color.WHITE)
+        assert_that(board._moves_by_square(Color.WHITE), equal_to(expected))
+
+    def test_load_board_string(self):
+        u"""Games saved before FEN was used store the board string."""
+        field = GameModel._meta.get_field('_board')
+        board_str = u"♖♘♗♕♔♗♘♖-♙♙♙♙♙♙♙♙-________-________-________-________-♟♟♟♟♟♟♟♟-♜♞♝♛♚♝♞♜"
+        assert_that(field.to_python(board_str).to_fen(), equal_to(Board().to_fen()))
+        assert_that(field.get_prep_value(Board()), equal_to(Board().to_fen()))
+
+    def test_packed_storage(self):
+        field = BoardField(storage=BoardField.PACKED)
+        board = Board()
+        board.move_piece('E2', 'E4')
+        value = field.get_db_prep_value(board, connection)
+        assert_that(len(value), equal_to(PACKED_SIZE))
+        assert_that(field.to_python(value).to_fen(), equal_to(board.to_fen()))
+        assert_that(field.deconstruct()[3], equal_to({u'storage': BoardField.PACKED}))
+        assert_that(field.get_internal_type(), equal_to(u'BinaryField'))
+
+
 class TestMoveModel(TestCase):
     fixtures = ['test_users.json', ]
 
@@ -3,8 +3,12 @@ from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 from django.test import Client
 from django.test import TestCase
 from hamcrest import is_, assert_that, equal_to, contains_inanyorder  # , all_of, , instance_of
+import base64
 import json
 
+from chess.board import Board
+from chess.color import Color
+from chess.models import GameModel
 from chess.views import ChessResponses
 
 
@@ -158,6 +162,40 @@ class GetGameTest(TestCase):
         assert_that(response.status_code, is_(HTTP_400_BAD_REQUEST))
         assert_that(json.loads(response.content), equal_to(ChessResponses.USER_IS_NOT_PLAYER))
 
+    def test_get_packed_board(self):
+        """
+        Test loading the packed board of a game
+        """
+        username = 'adam'
+        game_id = '1'
+        url = '/chess/user/' + username + '/game/' + game_id + '/packed/'
+        c = Client()
+        response = c.get(url)
+        assert_that(response.status_code, is_(HTTP_200_OK))
+
+        content = json.loads(response.content)
+        assert_that(content["id"], equal_to(1))
+        assert_that(content["active_player"], equal_to("WHITE"))
+        assert_that(content["winner"], equal_to("UNDECIDED"))
+        assert_that(Board.from_bytes(base64.b64decode(content["board"])).to_fen(), equal_to(Board().to_fen()))
+
+    def test_get_attack_map(self):
+        """
+        Test loading the squares attacked by each player
+        """
+        url = '/chess/user/adam/game/1/attacks/'
+        c = Client()
+        response = c.get(url)
+        assert_that(response.status_code, is_(HTTP_200_OK))
+        content = json.loads(response.content)
+        assert_that(content["WHITE"]["F3"], equal_to(3))  # The pawns on E2 and G2 and the knight on G1
+        assert_that(content["BLACK"]["F6"], equal_to(3))
+        assert_that(content["WHITE"].get("E4"), equal_to(None))
+
+        response = c.get(url, {'attackers': ''})
+        content = json.loads(response.content)
+        assert_that(content["WHITE"]["F3"], equal_to(["E2", "G1", "G2"]))
+
 
 class TestMove_1(TestCase):
     """
@@ -848,3 +886,34 @@ class TestChallenge(TestCase):
         Dave and Charles challenge bob. Bob challenges Adam. Bob accepts Dave's challenge
         """
         pass
+
+
+class TestAgents(TestCase):
+    """
+    Tests playing against the computer players (agents)
+    """
+    fixtures = ['test_users.json', ]
+
+    def setUp(self):
+        response = Client().post('/chess/user/adam/game/')
+        assert_that(response.status_code, is_(HTTP_200_OK))
+
+    def test_list_agents(self):
+        response = Client().get('/chess/user/adam/agents/')
+        assert_that(response.status_code, is_(HTTP_200_OK))
+        assert_that(json.loads(response.content), equal_to(["RandomAgent", "SearchAgent"]))
+
+    def test_agent_move(self):
+        """
+        The agent makes white's move, then it is black's turn
+        """
+        c = Client()
+        response = c.post('/chess/user/adam/game/1/agent/RandomAgent')
+        assert_that(response.status_code, is_(HTTP_200_OK))
+        board = GameModel.objects.get(id=1).board
+        assert_that(board.current_player, is_(Color.BLACK))
+
+    def test_unknown_agent(self):
+        response = Client().post('/chess/user/adam/game/1/agent/DeepBlue')
+        assert_that(response.status_code, is_(HTTP_400_BAD_REQUEST))
+        assert_that(json.loads(response.content), equal_to(ChessResponses.AGENT_DOES_NOT_EXIST))
@@ -0,0 +1,55 @@
+# -*- coding: UTF-8 -*-
+import unittest
+from hamcrest import is_, assert_that, equal_to, contains_inanyorder
+from chess.bitboard import BITS, square_index, square_names, SQUARE_NAMES
+from chess.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, PAWN_PUSHES, RAY_SQUARES, LINES, BETWEEN, \
+    ray_attacks, rook_attacks, bishop_attacks
+
+
+def _occupied(*names):
+    return sum(BITS[square_index(name)] for name in names)
+
+
+class TestAttackTables(unittest.TestCase):
+
+    def test_knight_attacks(self):
+        assert_that(square_names(KNIGHT_ATTACKS[square_index('B1')]), contains_inanyorder('A3', 'C3', 'D2'))
+
+    def test_king_attacks(self):
+        assert_that(square_names(KING_ATTACKS[square_index('A8')]), contains_inanyorder('A7', 'B7', 'B8'))
+
+    def test_pawn_tables(self):
+        assert_that(square_names(PAWN_ATTACKS[0][square_index('H2')]), contains_inanyorder('G3'))
+        assert_that(square_names(PAWN_ATTACKS[1][square_index('E7')]), contains_inanyorder('D6', 'F6'))
+        assert_that(square_names(PAWN_PUSHES[1][square_index('E7')]), contains_inanyorder('E6'))
+        assert_that(PAWN_PUSHES[0][square_index('E8')], is_(0))
+
+    def test_ray_squares_are_ordered(self):
+        squares = [SQUARE_NAMES[i] for i in RAY_SQUARES[(-1, -1)][square_index('D4')]]
+        assert_that(squares, equal_to(['C3', 'B2', 'A1']))
+
+    def test_lines_and_between(self):
+        assert_that(LINES[square_index('A1')][square_index('H8')], equal_to((1, 1)))
+        assert_that(LINES[square_index('A1')][square_index('B3')], is_(None))
+        assert_that(square_names(BETWEEN[square_index('E1')][square_index('E5')]),
+                    contains_inanyorder('E2', 'E3', 'E4'))
+        assert_that(BETWEEN[square_index('E1')][square_index('F3')], is_(0))
+
+    def test_ray_attacks_stop_on_blocker(self):
+        occupied = _occupied('A6')
+        assert_that(square_names(ray_attacks(square_index('A1'), (0, 1), occupied)),
+                    contains_inanyorder('A2', 'A3', 'A4', 'A5', 'A6'))
+
+    def test_rook_attacks(self):
+        occupied = _occupied('D6', 'B4')
+        assert_that(square_names(rook_attacks(square_index('D4'), occupied)),
+                    contains_inanyorder('D5', 'D6', 'D3', 'D2', 'D1', 'C4', 'B4', 'E4', 'F4', 'G4', 'H4'))
+
+    def test_bishop_attacks(self):
+        occupied = _occupied('B2', 'E5')
+        assert_that(square_names(bishop_attacks(square_index('C3'), occupied)),
+                    contains_inanyorder('B2', 'D4', 'E5', 'B4', 'A5', 'D2', 'E1'))
+
+
+if __name__ == '__main__':
+        unittest.main()
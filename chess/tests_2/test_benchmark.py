@@ -0,0 +1,44 @@
+# -*- coding: UTF-8 -*-
+import unittest
+from hamcrest import assert_that, equal_to, less_than, greater_than
+from chess.benchmark import deep_size, memory, copying, encoding, validation, search, evaluation
+from chess.pieces import WhiteQueen
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_deep_size_counts_shared_objects_once(self):
+        one = deep_size([[WhiteQueen()]])
+        assert_that(deep_size([[WhiteQueen()], [WhiteQueen()]]), less_than(2 * one))
+
+    def test_memory(self):
+        results = dict((measurement, value) for measurement, value, _ in memory(count=12))
+        assert_that(results[u'bytes per move'], greater_than(0))
+        # A move is a few slots, without an instance dictionary
+        assert_that(results[u'bytes per move'], less_than(200))
+        assert_that(results[u'bytes per board'], less_than(4000))
+
+    def test_copying(self):
+        results = dict((measurement, value) for measurement, value, _ in copying(count=2))
+        assert_that(results[u'copy()'], greater_than(0))
+
+    def test_encoding(self):
+        results = dict((measurement, value) for measurement, value, _ in encoding(count=1))
+        assert_that(results[u'packed size'], equal_to(37))
+        assert_that(results[u'FEN size'], less_than(results[u'board string size']))
+
+    def test_validation(self):
+        results = dict((measurement, value) for measurement, value, _ in validation(count=1))
+        assert_that(results[u'is_legal checks'], greater_than(0))
+
+    def test_search(self):
+        results = dict((measurement, value) for measurement, value, _ in search(depth=2))
+        assert_that(results[u'nodes'], greater_than(0))
+
+    def test_evaluation(self):
+        results = dict((measurement, value) for measurement, value, _ in evaluation(count=1))
+        assert_that(results[u'evaluations'], greater_than(0))
+        assert_that(results[u'evaluations from scratch'], greater_than(0))
+
+
+if __name__ == '__main__':
+        unittest.main()
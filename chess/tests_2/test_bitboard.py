@@ -0,0 +1,59 @@
+# -*- coding: UTF-8 -*-
+import unittest
+from hamcrest import is_, assert_that, equal_to, contains_inanyorder
+from chess.bitboard import BITS, WHITE, BLACK, square_index, coords_index, direction, lsb, msb, popcount, \
+    iter_bits, square_names, shift, knight_attacks, king_attacks, pawn_attacks
+from chess.square import InvalidSquareException
+
+
+class TestBitboardFunctions(unittest.TestCase):
+
+    def test_square_index(self):
+        assert_that(square_index('A1'), is_(0))
+        assert_that(square_index('h1'), is_(7))
+        assert_that(square_index('A2'), is_(8))
+        assert_that(square_index('H8'), is_(63))
+
+    def test_square_index_off_board(self):
+        self.assertRaises(InvalidSquareException, square_index, 'I1')
+        self.assertRaises(InvalidSquareException, square_index, 'A9')
+
+    def test_coords_index(self):
+        assert_that(coords_index(1, 1), is_(0))
+        assert_that(coords_index(8, 8), is_(63))
+        assert_that(coords_index(9, 1), is_(None))
+        assert_that(coords_index(1, 0), is_(None))
+
+    def test_bit_scans(self):
+        bitboard = BITS[3] | BITS[17] | BITS[60]
+        assert_that(lsb(bitboard), is_(3))
+        assert_that(msb(bitboard), is_(60))
+        assert_that(popcount(bitboard), is_(3))
+        assert_that(list(iter_bits(bitboard)), equal_to([3, 17, 60]))
+
+    def test_shift_does_not_wrap(self):
+        assert_that(shift(BITS[square_index('H4')], 1, 0), is_(0))
+        assert_that(shift(BITS[square_index('A4')], -1, 0), is_(0))
+        assert_that(shift(BITS[square_index('D8')], 0, 1), is_(0))
+        assert_that(shift(BITS[square_index('D1')], 1, -1), is_(0))
+        assert_that(square_names(shift(BITS[square_index('G4')], 1, 1)), contains_inanyorder('H5'))
+
+    def test_direction(self):
+        assert_that(direction(square_index('E1'), square_index('E8')), equal_to((0, 1)))
+        assert_that(direction(square_index('E1'), square_index('A5')), equal_to((-1, 1)))
+        assert_that(direction(square_index('E1'), square_index('F3')), is_(None))
+        assert_that(direction(square_index('E1'), square_index('E1')), is_(None))
+
+    def test_knight_attacks(self):
+        assert_that(square_names(knight_attacks(BITS[square_index('A1')])), contains_inanyorder('B3', 'C2'))
+        assert_that(square_names(knight_attacks(BITS[square_index('H8')])), contains_inanyorder('F7', 'G6'))
+
+    def test_king_attacks(self):
+        assert_that(square_names(king_attacks(BITS[square_index('H1')])), contains_inanyorder('G1', 'G2', 'H2'))
+
+    def test_pawn_attacks(self):
+        assert_that(square_names(pawn_attacks(BITS[square_index('A2')], WHITE)), contains_inanyorder('B3'))
+        assert_that(square_names(pawn_attacks(BITS[square_index('D7')], BLACK)), contains_inanyorder('C6', 'E6'))
+
+if __name__ == '__main__':
+        unittest.main()
@@ -4,8 +4,14 @@
 # See https://code.google.com/p/hamcrest/ for more details on hamcrest matchers
 from chess.board import Board, Color, King, Queen, Bishop, Knight, Rook, Pawn, BlackPawn, WhiteKing, WhiteRook, \
     BlackKing, BlackQueen, BlackRook, BlackBishop, BlackKnight, IllegalMoveException, WhiteKnight, WhitePawn, \
-    IllegalPromotionException, PromotePieceException, Winner, Move
-from hamcrest import is_, assert_that, equal_to, all_of, contains_inanyorder, instance_of
+    IllegalPromotionException, PromotePieceException, Winner, Move, WHITE_QUEEN_SIDE, BLACK_QUEEN_SIDE, WhiteQueen, \
+    InvalidBoardException, PACKED_SIZE
+from hamcrest import is_, is_not, assert_that, equal_to, all_of, contains_inanyorder, instance_of, has_item, \
+    has_items, calling, raises, same_instance
+from chess.move import move_name, compact_move, promotion_move, move_from, move_to, DOUBLE_PAWN_PUSH, CAPTURE
+from chess.bitboard import square_index, KNIGHT, SQUARE_NAMES, WHITE, FULL
+from chess.perft import PERFT_SUITE
+import copy
 import unittest
 
 
@@ -979,6 +985,543 @@ class TestLegalMoves(unittest.TestCase):
         e3_knight_moves = chess_board.get_moves('E3')
         assert_that(e3_knight_moves, is_(set([])))
 
+    def test_legal_moves_opening(self):
+        u"""Each pawn can move one or two squares and each knight has two moves."""
+        chess_board = Board()
+        moves = [move_name(m) for m in chess_board.legal_moves(Color.WHITE)]
+        assert_that(len(moves), is_(20))
+        assert_that(moves, has_items('E2E3', 'E2E4', 'G1F3', 'G1H3'))
+
+    def test_legal_moves_include_castling_en_passant_and_promotion(self):
+        u"""
+           ________________
+        8 |_|_|_|_|♚|_|_|_|
+        7 |_|♙|_|_|_|_|_|_|
+        6 |_|_|_|_|_|_|_|_|
+        5 |_|_|_|♟|♙|_|_|_|
+        4 |_|_|_|_|_|_|_|_|
+        3 |_|_|_|_|_|_|_|_|
+        2 |_|_|_|_|_|_|_|_|
+        1 |_|_|_|_|♔|_|_|♖|
+           ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+           A B C D E F G H
+        """
+        chess_board = Board(u"____♔__♖-________-________-________-___♟♙___-________-_♙______-____♚___", Color.WHITE)
+        chess_board.previous_move = Move(BlackPawn(), 'D7', 'D5', True)
+        moves = [move_name(m) for m in chess_board.legal_moves(Color.WHITE)]
+        assert_that(moves, has_items('E1G1', 'E5D6', 'B7B8Q', 'B7B8R', 'B7B8B', 'B7B8N'))
+        assert_that(moves, is_not(has_item('B7B8')))
+
+    def test_legal_moves_in_check(self):
+        u"""The king cannot escape the queen, the only legal move blocks her on G3."""
+        chess_board = Board(u"♖♘♗♕♔♗♘♖-♙_♙♙♙_♙♙-_♙______-_____♙_♛-________-___♟____-♟♟♟_♟♟♟♟-♜♞♝_♚♝♞♜", Color.WHITE)
+        moves = [move_name(m) for m in chess_board.legal_moves(Color.WHITE)]
+        assert_that(moves, contains_inanyorder('G2G3'))
+
+
+class TestIsLegal(unittest.TestCase):
+    u"""These test cases check is_legal agrees with the moves generated by legal_moves."""
+
+    def assert_agrees_with_legal_moves(self, chess_board):
+        color = chess_board.current_player
+        legal = set((move_from(move), move_to(move)) for move in chess_board.legal_moves(color))
+        for from_ in chess_board.player_piece_squares(color):
+            for to_index, to_ in enumerate(SQUARE_NAMES):
+                expected = (square_index(from_), to_index) in legal
+                assert_that(chess_board.is_legal(from_, to_), is_(expected), u"{0} to {1}".format(from_, to_))
+
+    def test_perft_positions(self):
+        for _, board_string, color, _ in PERFT_SUITE:
+            chess_board = Board(board_string, color)
+            self.assert_agrees_with_legal_moves(chess_board)
+            for move in list(chess_board.legal_moves(color)):
+                chess_board.make_move(move)
+                self.assert_agrees_with_legal_moves(chess_board)
+                chess_board.unmake_move()
+
+    def test_opponents_piece(self):
+        chess_board = Board()
+        assert_that(chess_board.is_legal('E7', 'E5'), is_(False))
+        assert_that(chess_board.is_legal('E2', 'E4'), is_(True))
+
+    def test_invalid_square(self):
+        assert_that(Board().is_legal('E2', 'E9'), is_(False))
+
+    def test_en_passant(self):
+        chess_board = Board.from_fen(u'4k3/8/8/3Pp3/8/8/8/4K3 w - e6 0 1')
+        assert_that(chess_board.is_legal('D5', 'E6'), is_(True))
+        assert_that(chess_board.is_legal('D5', 'C6'), is_(False))
+
+
+class TestAttackMap(unittest.TestCase):
+    u"""These test cases check the attack map agrees with the attackers found square by square."""
+
+    def test_perft_positions(self):
+        for _, board_string, color, _ in PERFT_SUITE:
+            chess_board = Board(board_string, color)
+            for color in (Color.WHITE, Color.BLACK):
+                attack_map = chess_board.attack_map(color, attackers=True)
+                counts = chess_board.attack_map(color)
+                for square_name in SQUARE_NAMES:
+                    expected = chess_board._get_attackers(square_name, color)
+                    assert_that(attack_map.get(square_name, set()), equal_to(expected))
+                    assert_that(counts.get(square_name, 0), equal_to(len(expected)))
+
+    def test_starting_position(self):
+        counts = Board().attack_map(Color.WHITE)
+        assert_that(counts['D2'], equal_to(4))  # The bishop, queen, king and knight
+        assert_that(sum(counts.values()), equal_to(38))
+
+
+class TestMoveCache(unittest.TestCase):
+    u"""These test cases check the cached moves are the same as those of a board that has not cached any."""
+
+    def assert_same_moves(self, chess_board):
+        for color in (Color.WHITE, Color.BLACK):
+            expected = Board.from_fen(chess_board.to_fen())._moves_by_square(color)
+            assert_that(chess_board._moves_by_square(color), equal_to(expected))
+
+    def test_perft_positions(self):
+        for _, board_string, color, _ in PERFT_SUITE:
+            chess_board = Board(board_string, color)
+            for ply in range(6):
+                self.assert_same_moves(chess_board)
+                moves = sorted(chess_board.legal_moves(chess_board.current_player))
+                if not moves:
+                    break
+                chess_board.make_move(moves[(ply * 7) % len(moves)])
+            while chess_board._undo:
+                chess_board.unmake_move()
+                self.assert_same_moves(chess_board)
+
+    def test_unaffected_moves_are_kept(self):
+        chess_board = Board()
+        knight_moves = chess_board._cached_moves(WHITE, FULL)[square_index('B1')]
+        chess_board.move_piece('H2', 'H3')
+        chess_board.move_piece('H7', 'H6')
+        assert_that(chess_board._cached_moves(WHITE, FULL)[square_index('B1')], same_instance(knight_moves))
+        chess_board.move_piece('A2', 'A3')
+        chess_board.move_piece('A7', 'A6')
+        assert_that(chess_board.get_moves('B1'), equal_to(set(['C3'])))
+
+    def test_adopt_move_cache(self):
+        chess_board = Board()
+        chess_board._moves_by_square(Color.WHITE)
+        loaded_board = Board.from_fen(chess_board.to_fen())
+        loaded_board._adopt_move_cache(chess_board)
+        assert_that(loaded_board._move_cache[WHITE][2], equal_to(chess_board._move_cache[WHITE][2]))
+        assert_that(loaded_board._move_cache[WHITE][2], is_not(same_instance(chess_board._move_cache[WHITE][2])))
+
+        # The moves of a different position are not taken
+        other_board = Board.from_fen(u'4k3/8/8/8/8/8/8/4K3 w - - 0 1')
+        other_board._adopt_move_cache(chess_board)
+        assert_that(other_board._move_cache, equal_to([None, None]))
+
+
+class TestMakeUnmakeMove(unittest.TestCase):
+    u"""These test cases check moves made with make_move are exactly reversed by unmake_move."""
+
+    def _make_and_unmake_all(self, chess_board):
+        board_string = str(chess_board)
+        for move in list(chess_board.legal_moves(chess_board.current_player)):
+            chess_board.make_move(move)
+            chess_board.unmake_move()
+            assert_that(str(chess_board), equal_to(board_string), move_name(move))
+
+    def test_make_move(self):
+        chess_board = Board()
+        chess_board.make_move(compact_move(square_index('E2'), square_index('E4'), DOUBLE_PAWN_PUSH))
+        assert_that(chess_board.get_piece('E4'), is_(WhitePawn))
+        assert_that(chess_board.get_piece('E2'), is_(None))
+        assert_that(chess_board.current_player, is_(Color.BLACK))
+        assert_that(chess_board.get_moves('D7'), contains_inanyorder('D6', 'D5'))
+
+        chess_board.unmake_move()
+        assert_that(str(chess_board), equal_to(str(Board())))
+        assert_that(chess_board.current_player, is_(Color.WHITE))
+
+    def test_make_and_unmake_castling_en_passant_and_promotion(self):
+        u"""
+           ________________
+        8 |♜|_|_|_|♚|_|_|♜|
+        7 |_|♙|_|_|_|_|_|_|
+        6 |_|_|_|_|_|_|_|_|
+        5 |_|_|_|♟|♙|_|_|_|
+        4 |_|_|_|_|_|_|_|_|
+        3 |_|_|_|_|_|_|_|_|
+        2 |_|_|_|_|_|_|_|_|
+        1 |♖|_|_|_|♔|_|_|♖|
+           ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+           A B C D E F G H
+        """
+        chess_board = Board(u"♖___♔__♖-________-________-________-___♟♙___-________-_♙______-♜___♚__♜", Color.WHITE)
+        chess_board.previous_move = Move(BlackPawn(), 'D7', 'D5', True)
+        self._make_and_unmake_all(chess_board)
+        assert_that(chess_board._get_castle_moves('E1'), contains_inanyorder('C1', 'G1'))
+        assert_that(chess_board.get_moves('E5'), contains_inanyorder('D6', 'E6'))
+
+    def test_rook_move_removes_castling(self):
+        chess_board = Board(u"♖___♔__♖-________-________-________-________-________-________-♜___♚__♜", Color.WHITE)
+        chess_board.make_move(compact_move(square_index('H1'), square_index('H8'), CAPTURE))
+        assert_that(chess_board._castling, is_(WHITE_QUEEN_SIDE | BLACK_QUEEN_SIDE))
+
+        chess_board.unmake_move()
+        assert_that(chess_board._get_castle_moves('E1'), contains_inanyorder('C1', 'G1'))
+        assert_that(chess_board._get_castle_moves('E8'), contains_inanyorder('C8', 'G8'))
+
+    def test_make_promotion(self):
+        chess_board = Board(u"____♔___-________-________-________-________-________-_♙______-____♚___", Color.WHITE)
+        chess_board.make_move(promotion_move(square_index('B7'), square_index('B8'), KNIGHT))
+        assert_that(chess_board.get_piece('B8'), is_(WhiteKnight))
+        assert_that(chess_board.is_promote_phase(), is_(False))
+
+        chess_board.unmake_move()
+        assert_that(chess_board.get_piece('B7'), is_(WhitePawn))
+        assert_that(chess_board.get_piece('B8'), is_(None))
+
+    def test_repr_marks_lost_castling_rights(self):
+        chess_board = Board(u"♖___♔__♖-________-________-________-________-________-________-♜___♚__♜", Color.WHITE)
+        chess_board.move_piece('H1', 'G1')
+        chess_board.move_piece('E8', 'E7')
+        chess_board.move_piece('G1', 'H1')
+        chess_board.move_piece('E7', 'E8')
+        board_string = u"♖___♔__m♖-________-________-________-________-________-________-m♜___m♚__m♜"
+        assert_that(repr(chess_board).decode('utf-8'), is_(equal_to(board_string)))
+        assert_that(Board(board_string, Color.WHITE)._castling, is_(WHITE_QUEEN_SIDE))
+
+
+class TestZobristHash(unittest.TestCase):
+    u"""These test cases check Board.hash is kept up to date as moves are made."""
+
+    def test_same_position_same_hash(self):
+        u"""Moving the knights out and back again reaches the starting position."""
+        chess_board = Board()
+        for from_, to_ in [('G1', 'F3'), ('G8', 'F6'), ('F3', 'G1'), ('F6', 'G8')]:
+            chess_board.move_piece(from_, to_)
+        assert_that(chess_board.hash, equal_to(Board().hash))
+
+    def test_player_to_move_changes_hash(self):
+        board_string = u"♖♘♗♕♔♗♘♖-♙♙♙♙♙♙♙♙-________-________-________-________-♟♟♟♟♟♟♟♟-♜♞♝♛♚♝♞♜"
+        white_board = Board(board_string, Color.WHITE)
+        black_board = Board(board_string, Color.BLACK)
+        assert_that(white_board.hash, is_not(equal_to(black_board.hash)))
+
+        white_board.current_player = Color.BLACK
+        assert_that(white_board.hash, equal_to(black_board.hash))
+
+    def test_castling_rights_change_hash(self):
+        board_string = u"♖___♔__♖-________-________-________-________-________-________-♜___♚__♜"
+        chess_board = Board(board_string, Color.WHITE)
+        moved_board = Board(board_string.replace(u"♔", u"m♔"), Color.WHITE)
+        assert_that(chess_board.hash, is_not(equal_to(moved_board.hash)))
+
+    def test_en_passant_changes_hash(self):
+        u"""The hash only includes the en passant square when a pawn can capture en passant."""
+        board_string = u"♖♘♗♕♔♗♘♖-♙♙♙_♙__♙-________-___♙♟_♙_-__♟__♙__-________-♟♟_♟_♟♟♟-♜♞♝♛♚♝♞♜"
+        chess_board = Board(board_string, Color.BLACK)
+        hash_without_en_passant = chess_board.hash
+        chess_board.previous_move = Move(WhitePawn(), 'D2', 'D4', True)
+        assert_that(chess_board.hash, is_not(equal_to(hash_without_en_passant)))
+
+        chess_board.previous_move = Move(WhitePawn(), 'G2', 'G4', True)
+        assert_that(chess_board.hash, equal_to(hash_without_en_passant))
+
+    def test_hash_is_updated_incrementally(self):
+        u"""The hash after each move is the same as calculating it from scratch, including promoting a pawn."""
+        chess_board = Board(u"♖___♔__♖-♙_______-________-________-________-________-_♙_____♟-♜___♚___", Color.WHITE)
+        for from_, to_ in [('E1', 'G1'), ('H7', 'H6'), ('B7', 'A8')]:
+            chess_board.move_piece(from_, to_)
+            assert_that(chess_board.hash, equal_to(chess_board._zobrist()))
+        chess_board._promote_pawn(WhiteQueen())
+        assert_that(chess_board.hash, equal_to(chess_board._zobrist()))
+
+    def test_unmake_move_restores_hash(self):
+        chess_board = Board()
+        original = chess_board.hash
+        for move in list(chess_board.legal_moves(Color.WHITE)):
+            chess_board.make_move(move)
+            assert_that(chess_board.hash, equal_to(chess_board._zobrist()))
+            chess_board.unmake_move()
+            assert_that(chess_board.hash, equal_to(original))
+
+
+class TestCopy(unittest.TestCase):
+    u"""These test cases check Board.copy keeps the whole game state and the copies are independent."""
+
+    def _assert_same_state(self, chess_board, copied_board):
+        assert_that(repr(copied_board), equal_to(repr(chess_board)))
+        assert_that(copied_board.hash, equal_to(chess_board.hash))
+        assert_that(copied_board.current_player, is_(chess_board.current_player))
+        assert_that(copied_board.previous_move, is_(chess_board.previous_move))
+        assert_that(copied_board.stalemate_count, equal_to(chess_board.stalemate_count))
+        assert_that(copied_board.promote_pawn_location, equal_to(chess_board.promote_pawn_location))
+        assert_that(copied_board._castling, equal_to(chess_board._castling))
+        assert_that(copied_board._en_passant, equal_to(chess_board._en_passant))
+
+    def test_copy_keeps_game_state(self):
+        chess_board = Board(u"♖___♔__♖-♙_______-________-________-_♟______-________-_♙_____♟-♜___♚___", Color.WHITE)
+        for from_, to_ in [('A2', 'A4'), ('B5', 'A4')]:
+            chess_board.move_piece(from_, to_)
+        chess_board.move_piece('B7', 'A8')
+        for copy_on_write in (False, True):
+            self._assert_same_state(chess_board, chess_board.copy(copy_on_write))
+
+    def test_copies_are_independent(self):
+        for copy_on_write in (False, True):
+            chess_board = Board()
+            chess_board.move_piece('E2', 'E4')
+            copied_board = chess_board.copy(copy_on_write)
+            copied_board.move_piece('E7', 'E5')
+            assert_that(chess_board.get_piece('E7'), instance_of(BlackPawn))
+            assert_that(chess_board.current_player, is_(Color.BLACK))
+
+            chess_board.move_piece('D7', 'D5')
+            assert_that(copied_board.get_piece('D7'), instance_of(BlackPawn))
+            assert_that(copied_board.get_piece('D5'), is_(None))
+
+    def test_copy_on_write_shares_until_moved(self):
+        chess_board = Board()
+        copied_board = chess_board.copy(copy_on_write=True)
+        assert_that(copied_board._mailbox, is_(chess_board._mailbox))
+
+        copied_board.make_move(compact_move(square_index('G1'), square_index('F3')))
+        assert_that(copied_board._mailbox, is_not(chess_board._mailbox))
+        assert_that(chess_board.get_piece('G1'), instance_of(WhiteKnight))
+        assert_that(chess_board._undo, equal_to([]))
+
+        copied_board.unmake_move()
+        assert_that(copied_board, equal_to(chess_board))
+        assert_that(chess_board._undo, equal_to([]))
+
+    def test_unmake_move_on_copy(self):
+        u"""The moves made before copying can be taken back on both boards."""
+        for copy_on_write in (False, True):
+            chess_board = Board()
+            chess_board.make_move(compact_move(square_index('E2'), square_index('E4'), DOUBLE_PAWN_PUSH))
+            copied_board = chess_board.copy(copy_on_write)
+            copied_board.unmake_move()
+            assert_that(repr(copied_board), equal_to(repr(Board())))
+            assert_that(chess_board.get_piece('E4'), instance_of(WhitePawn))
+
+            chess_board.unmake_move()
+            assert_that(chess_board.hash, equal_to(Board().hash))
+
+    def test_copy_module(self):
+        chess_board = Board()
+        chess_board.move_piece('E2', 'E4')
+        self._assert_same_state(chess_board, copy.copy(chess_board))
+        self._assert_same_state(chess_board, copy.deepcopy(chess_board))
+
+
+class TestFen(unittest.TestCase):
+    u"""These test cases check boards are read and written in Forsyth-Edwards Notation."""
+
+    def test_starting_position(self):
+        fen = u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        assert_that(Board().to_fen(), equal_to(fen))
+        assert_that(repr(Board.from_fen(fen)), equal_to(repr(Board())))
+        assert_that(Board.from_fen(fen).hash, equal_to(Board().hash))
+
+    def test_perft_positions_round_trip(self):
+        for _, board_string, color, _ in PERFT_SUITE:
+            chess_board = Board(board_string, color)
+            fen_board = Board.from_fen(chess_board.to_fen())
+            assert_that(repr(fen_board), equal_to(repr(chess_board)))
+            assert_that(fen_board.hash, equal_to(chess_board.hash))
+            assert_that(fen_board.to_fen(), equal_to(chess_board.to_fen()))
+
+    def test_game_state(self):
+        chess_board = Board()
+        for from_, to_ in [('G1', 'F3'), ('A7', 'A6'), ('E2', 'E4'), ('A6', 'A5'), ('E4', 'E5'), ('D7', 'D5')]:
+            chess_board.move_piece(from_, to_)
+        fen = u"rnbqkbnr/1pp1pppp/8/p2pP3/8/5N2/PPPP1PPP/RNBQKB1R w KQkq d6 0 4"
+        assert_that(chess_board.to_fen(), equal_to(fen))
+
+        fen_board = Board.from_fen(fen)
+        assert_that(fen_board.current_player, is_(Color.WHITE))
+        assert_that(fen_board.hash, equal_to(chess_board.hash))
+        assert_that(fen_board.get_moves('E5'), has_item('D6'))
+
+    def test_move_counts(self):
+        chess_board = Board.from_fen(u"4k3/8/8/8/8/8/8/R3K3 b Q - 12 40")
+        chess_board.make_move(compact_move(square_index('E8'), square_index('D8')))
+        assert_that(chess_board.to_fen(), equal_to(u"3k4/8/8/8/8/8/8/R3K3 w Q - 13 41"))
+        chess_board.unmake_move()
+        assert_that(chess_board.to_fen(), equal_to(u"4k3/8/8/8/8/8/8/R3K3 b Q - 12 40"))
+
+    def test_en_passant_only_kept_when_it_can_be_captured(self):
+        chess_board = Board.from_fen(u"rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+        assert_that(chess_board.to_fen(), equal_to(u"rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"))
+
+    def test_castling_needs_king_and_rook(self):
+        chess_board = Board.from_fen(u"4k3/8/8/8/8/8/8/4K2R w KQkq - 0 1")
+        assert_that(chess_board.to_fen(), equal_to(u"4k3/8/8/8/8/8/8/4K2R w K - 0 1"))
+
+    def test_pawn_waiting_for_promotion(self):
+        chess_board = Board.from_fen(u"1P2k3/8/8/8/8/8/8/4K3 w - - 0 1")
+        assert_that(chess_board.is_promote_phase(), is_(True))
+        assert_that(chess_board.promote_pawn_location, equal_to('B8'))
+
+    def test_invalid_fen(self):
+        for fen in [u"", u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+                    u"rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                    u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQXBNR w KQkq - 0 1",
+                    u"rnbq1bnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                    u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+                    u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - zero 1",
+                    u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQxq - 0 1",
+                    u"4k3/8/8/3P4/8/8/8/4K3 w - e6 0 1",  # No black pawn passed over E6
+                    u"4k3/8/4n3/3Pp3/8/8/8/4K3 w - e6 0 1",  # E6 is occupied
+                    u"4k3/8/8/3Pp3/8/8/8/4K3 w - e3 0 1",
+                    u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KKQQ - 0 1",
+                    u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - -1 1",
+                    u"rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 0"]:
+            assert_that(calling(Board.from_fen).with_args(fen), raises(InvalidBoardException), fen)
+
+    def test_player_not_to_move_in_check(self):
+        assert_that(calling(Board.from_fen).with_args(u"4k3/4R3/8/8/8/8/8/4K3 w - - 0 1"), raises(InvalidBoardException))
+        # The player to move can be in check
+        assert_that(Board.from_fen(u"4k3/4R3/8/8/8/8/8/4K3 b - - 0 1").is_check(Color.BLACK), is_(True))
+
+    def test_one_king_each(self):
+        for fen in [u"8/8/8/8/8/8/8/4K3 w - - 0 1", u"4k3/8/8/8/8/8/8/8 w - - 0 1",
+                    u"4k3/8/8/8/8/8/8/3KK3 w - - 0 1", u"3kk3/8/8/8/8/8/8/4K3 w - - 0 1"]:
+            assert_that(calling(Board.from_fen).with_args(fen), raises(InvalidBoardException), fen)
+
+
+class TestPackedBoard(unittest.TestCase):
+    u"""These test cases check boards are packed into and unpacked from a fixed number of bytes."""
+
+    def test_round_trip(self):
+        for _, board_string, color, _ in PERFT_SUITE:
+            chess_board = Board(board_string, color)
+            data = chess_board.to_bytes()
+            assert_that(len(data), equal_to(PACKED_SIZE))
+            packed_board = Board.from_bytes(data)
+            assert_that(packed_board.to_fen(), equal_to(chess_board.to_fen()))
+            assert_that(packed_board.hash, equal_to(chess_board.hash))
+
+    def test_starting_position(self):
+        data = bytearray(Board().to_bytes())
+        # A1 (white rook, 3 + 1) is the low 4 bits and B1 (white knight, 1 + 1) the high 4 bits of the first byte
+        assert_that(data[0], equal_to(0x24))
+        assert_that(data[32], equal_to(0x1E))  # White to move, all four castling rights
+
+    def test_en_passant(self):
+        fen = u"rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3"
+        packed_board = Board.from_bytes(Board.from_fen(fen).to_bytes())
+        assert_that(packed_board.to_fen(), equal_to(fen))
+        assert_that(packed_board.get_moves('E5'), has_item('D6'))
+
+    def test_invalid_bytes(self):
+        data = Board().to_bytes()
+        for invalid in [data[:-1], b'\xdd' + data[1:], data[:32] + b'\xff' + data[33:]]:
+            assert_that(calling(Board.from_bytes).with_args(invalid), raises(InvalidBoardException))
+
+
+class TestPositionEquality(unittest.TestCase):
+    u"""These test cases check boards compare and hash by their position."""
+
+    def test_transposition_is_equal(self):
+        board_a = Board()
+        board_b = Board()
+        for from_, to_ in (('G1', 'F3'), ('G8', 'F6'), ('B1', 'C3')):
+            board_a.move_piece(from_, to_)
+        for from_, to_ in (('B1', 'C3'), ('G8', 'F6'), ('G1', 'F3')):
+            board_b.move_piece(from_, to_)
+        assert_that(board_a, equal_to(board_b))
+        assert_that(len(set([board_a, board_b])), equal_to(1))
+
+    def test_side_to_move_differs(self):
+        board_string = u"____♔___-________-________-________-________-________-________-____♚___"
+        assert_that(Board(board_string, Color.WHITE) != Board(board_string, Color.BLACK), is_(True))
+
+    def test_castling_rights_differ(self):
+        board_a = Board(u"♖___♔__♖-________-________-________-________-________-________-____♚___", Color.WHITE)
+        board_b = Board(u"♖___♔__m♖-________-________-________-________-________-________-____♚___", Color.WHITE)
+        assert_that(board_a == board_b, is_(False))
+
+    def test_en_passant_differs(self):
+        board_a = Board.from_fen(u'4k3/8/8/3Pp3/8/8/8/4K3 w - e6 0 1')
+        board_b = Board.from_fen(u'4k3/8/8/3Pp3/8/8/8/4K3 w - - 0 1')
+        assert_that(board_a == board_b, is_(False))
+        assert_that(board_a.copy(), equal_to(board_a))
+
+
+class TestMaterial(unittest.TestCase):
+    u"""These test cases check the material of each player is kept up to date."""
+
+    def test_starting_material(self):
+        chess_board = Board()
+        assert_that(chess_board.material(Color.WHITE), equal_to(39))
+        assert_that(chess_board.material(Color.BLACK), equal_to(39))
+
+    def test_capture_and_unmake(self):
+        chess_board = Board(u"____♔___-________-________-___♕____-________-________-___♟____-____♚___", Color.WHITE)
+        chess_board.make_move(compact_move(square_index('D4'), square_index('D7'), CAPTURE))
+        assert_that(chess_board.material(Color.BLACK), equal_to(0))
+        chess_board.unmake_move()
+        assert_that(chess_board.material(Color.BLACK), equal_to(1))
+
+    def test_promotion(self):
+        chess_board = Board(u"____♔___-________-________-________-________-________-_♙______-____♚___", Color.WHITE)
+        chess_board.move_piece('B7', 'B8')
+        chess_board.promote_pawn('WhiteQueen')
+        assert_that(chess_board.material(Color.WHITE), equal_to(9))
+        assert_that(chess_board.copy().material(Color.WHITE), equal_to(9))
+        assert_that(Board.from_fen(chess_board.to_fen()).material(Color.WHITE), equal_to(9))
+
+    def test_insufficient_material(self):
+        assert_that(Board().is_insufficient_material(), is_(False))
+        assert_that(Board.from_fen(u'4k3/8/8/8/8/8/8/2B1K3 w - - 0 1').is_insufficient_material(), is_(True))
+        assert_that(Board.from_fen(u'4k3/8/8/8/8/8/8/3RK3 w - - 0 1').is_insufficient_material(), is_(False))
+
+
+class TestRepetition(unittest.TestCase):
+    u"""These test cases check threefold repetition is found from the history of positions."""
+
+    KNIGHT_SHUFFLE = [('G1', 'F3'), ('G8', 'F6'), ('F3', 'G1'), ('F6', 'G8')]
+
+    def test_threefold_repetition(self):
+        chess_board = Board()
+        assert_that(chess_board.is_threefold_repetition(), is_(False))
+        for from_, to_ in self.KNIGHT_SHUFFLE:
+            chess_board.move_piece(from_, to_)
+        # The starting position has been reached twice
+        assert_that(chess_board.is_threefold_repetition(), is_(False))
+        for from_, to_ in self.KNIGHT_SHUFFLE:
+            chess_board.move_piece(from_, to_)
+        assert_that(chess_board.is_threefold_repetition(), is_(True))
+
+        chess_board.move_piece('E2', 'E4')
+        assert_that(chess_board.is_threefold_repetition(), is_(False))
+
+    def test_pawn_move_clears_history(self):
+        chess_board = Board()
+        for from_, to_ in self.KNIGHT_SHUFFLE:
+            chess_board.move_piece(from_, to_)
+        assert_that(len(chess_board.position_history), equal_to(4))
+        chess_board.move_piece('E2', 'E4')
+        assert_that(chess_board.position_history, equal_to(()))
+
+    def test_history_is_bounded(self):
+        chess_board = Board(u"____m♔__m♖-________-________-________-________-________-________-____m♚__m♜", Color.WHITE)
+        for _ in range(50):
+            for from_, to_ in [('E1', 'D1'), ('E8', 'D8'), ('D1', 'E1'), ('D8', 'E8')]:
+                chess_board.move_piece(from_, to_)
+        assert_that(len(chess_board.position_history), equal_to(150))
+        assert_that(chess_board.is_threefold_repetition(), is_(True))
+
+    def test_set_position_history(self):
+        chess_board = Board()
+        for from_, to_ in self.KNIGHT_SHUFFLE * 2:
+            chess_board.move_piece(from_, to_)
+
+        loaded_board = Board()
+        loaded_board.position_history = chess_board.position_history
+        assert_that(loaded_board.is_threefold_repetition(), is_(True))
+        assert_that(chess_board.copy().is_threefold_repetition(), is_(True))
+
 
 class TestPromotePawns(unittest.TestCase):
     u"""These tests check that a pawn can be promoted correctly."""
@@ -1287,6 +1830,33 @@ class TestCastlingFunctions(unittest.TestCase):
         assert_that(castle_board.get_piece('F8'), is_(black_rook))
 
 
+    def test_cannot_castle_through_check(self):
+        u"""The king may not castle out of check or through a square that is attacked.
+
+          ________________
+        8 |_|_|_|♜|♚|_|_|_|
+        7 |_|_|_|_|_|_|_|_|
+        6 |_|_|_|_|_|_|_|_|
+        5 |_|_|_|_|_|_|_|_|
+        4 |_|_|_|_|_|_|_|_|
+        3 |_|_|_|_|_|_|_|_|
+        2 |♙|♙|♙|_|♙|♙|♙|♙|
+        1 |♖|_|_|_|♔|_|_|♖|
+           ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+           A B C D E F G H
+        """
+        castle_board = Board(u"♖___♔__♖-♙♙♙_♙♙♙♙-________-________-________-________-________-___♜♚___", Color.WHITE)
+        assert_that(castle_board._get_castle_moves('E1'), contains_inanyorder('G1'))
+
+        castle_board = Board(u"♖___♔__♖-♙♙♙♙_♙♙♙-________-________-________-________-________-____♜♚__", Color.WHITE)
+        assert_that(castle_board._get_castle_moves('E1'), equal_to(set([])))
+
+    def test_castle_left_with_attacked_b_file(self):
+        u"""The rook passes over the B file when castling left, so it may be attacked."""
+        castle_board = Board(u"♖___♔__♖-♙_♙♙♙♙♙♙-________-________-________-________-________-_♜__♚___", Color.WHITE)
+        assert_that(castle_board._get_castle_moves('E1'), contains_inanyorder('C1', 'G1'))
+
+
 class TestDirectionSearch(unittest.TestCase):
     def test_get_squares_in_direction_1(self):
         """Test get_moves for a white rook in the middle of the board.
@@ -1509,6 +2079,16 @@ class TestPinnedBy(unittest.TestCase):
         pinned = pinned_board._pinned('C1')
         assert_that(pinned, is_(None))
 
+    def test_pins_found_once_per_position(self):
+        u"""The pins are kept while the position is unchanged and found again once a piece moves"""
+        pinned_board = Board(u"____♔___-____♘___-________-________-________-________-♜_______-_______♚", Color.BLACK)
+        assert_that(pinned_board._pinned('E2'), is_(None))
+        pinned_board.move_piece('A7', 'E7')
+        assert_that(pinned_board.get_moves('E2'), is_(set()))
+        pins = pinned_board._pins
+        assert_that(pinned_board._pinned('E2'), is_('E7'))
+        assert_that(pinned_board._pins, same_instance(pins))
+
     def test_pinned_by_bishop(self):
         u"""The pawn should be pinned by the bishop at h4
 
@@ -1751,6 +2331,21 @@ class TestGetAttackers(unittest.TestCase):
             'D1', 'E1', 'F1', 'G1'
         ))
 
+    def test_is_square_attacked(self):
+        chessboard = Board()
+        assert_that(chessboard.is_square_attacked('C3', Color.WHITE), is_(True))
+        assert_that(chessboard.is_square_attacked('C3', Color.BLACK), is_(False))
+        assert_that(chessboard.is_square_attacked('F6', Color.BLACK), is_(True))
+        assert_that(chessboard.is_square_attacked('E4', Color.WHITE), is_(False))
+
+    def test_is_square_attacked_blocked(self):
+        u"""The rook on A1 attacks along the first row until the queen on D1 blocks it."""
+        chessboard = Board(u"♖__♕♔___-________-________-________-________-________-________-____♚___", Color.WHITE)
+        assert_that(chessboard.is_square_attacked('C1', Color.WHITE), is_(True))
+        assert_that(chessboard.is_square_attacked('A8', Color.WHITE), is_(True))
+        assert_that(chessboard.is_square_attacked('H5', Color.WHITE), is_(True))
+        assert_that(chessboard.is_square_attacked('H6', Color.WHITE), is_(False))
+
 
 class TestWinConditions(unittest.TestCase):
     u"""
@@ -1920,6 +2515,73 @@ class TestWinConditions(unittest.TestCase):
         assert_that(board.is_checkmate(Color.BLACK), is_(False))
         assert_that(board.is_checkmate(Color.WHITE), is_(True))
 
+    def test_checkmate_by_knight(self):
+        u"""
+        Smothered mate, the knight cannot be blocked.
+          ________________
+        8 |_|_|_|_|_|_|♜|♚|
+        7 |_|_|_|_|_|♘|♟|♟|
+        6 |_|_|_|_|_|_|_|_|
+        5 |_|_|_|_|_|_|_|_|
+        4 |_|_|_|_|_|_|_|_|
+        3 |_|_|_|_|_|_|_|_|
+        2 |_|_|_|_|_|_|_|_|
+        1 |♔|_|_|_|_|_|_|_|
+           ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+           A B C D E F G H
+        """
+        check_board = Board(u"♔_______-________-________-________-________-________-_____♘♟♟-______♜♚", Color.BLACK)
+        assert_that(check_board.is_check(Color.BLACK), is_(True))
+        assert_that(check_board.is_checkmate(Color.BLACK), is_(True))
+
+    def test_double_check_only_king_moves(self):
+        u"""
+        The rook on E8 and bishop on B4 both attack the king, the knight could capture one but not both.
+          ________________
+        8 |_|_|_|_|♜|_|_|♚|
+        7 |_|_|_|_|_|_|_|_|
+        6 |_|_|_|_|_|_|_|_|
+        5 |_|_|_|_|_|_|_|_|
+        4 |_|♝|_|_|_|_|_|_|
+        3 |_|_|_|_|_|_|_|_|
+        2 |_|_|_|_|_|_|♘|_|
+        1 |_|_|_|_|♔|_|_|_|
+           ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+           A B C D E F G H
+        """
+        check_board = Board(u"____♔___-______♘_-________-_♝______-________-________-________-____♜__♚", Color.WHITE)
+        assert_that(check_board.get_moves('G2'), equal_to(set([])))
+        assert_that(check_board.get_moves('E1'), contains_inanyorder('D1', 'F1', 'F2'))
+
+    def test_has_legal_move(self):
+        chess_board = Board()
+        assert_that(chess_board.has_legal_move(Color.WHITE), is_(True))
+        assert_that(chess_board.has_legal_move(Color.BLACK), is_(True))
+
+        check_board = Board(u"♖♘♗♕♔♗♘♖-♙♙♙♙♙__♙-________-_____♙♙♛-________-___♟____-♟♟♟_♟♟♟♟-♜♞♝_♚♝♞♜", Color.WHITE)
+        assert_that(check_board.has_legal_move(Color.WHITE), is_(False))
+
+    def test_checkmate_by_promotion(self):
+        u"""
+        Promoting the pawn on B7 to a queen or rook on B8 checkmates the black king on H8.
+          ________________
+        8 |_|_|_|_|_|_|_|♚|
+        7 |_|♙|_|_|_|_|♟|♟|
+        6 |_|_|_|_|_|_|_|_|
+        5 |_|_|_|_|_|_|_|_|
+        4 |_|_|_|_|_|_|_|_|
+        3 |_|_|_|_|_|_|_|_|
+        2 |_|_|_|_|_|_|_|_|
+        1 |♔|_|_|_|_|_|_|_|
+           ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+           A B C D E F G H
+        """
+        check_board = Board(u"♔_______-________-________-________-________-________-_♙____♟♟-_______♚", Color.WHITE)
+        check_board.move_piece('B7', 'B8')
+        assert_that(check_board.winner, is_(Winner.UNDECIDED))
+        check_board._promote_pawn(WhiteQueen())
+        assert_that(check_board.winner, is_(Winner.WHITE))
+
     def test_statemate_1(self):
         u"""
         At the start of a game there is no stalemate as each player has moves and enough pieces for checkmate.
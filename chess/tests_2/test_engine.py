@@ -0,0 +1,271 @@
+# -*- coding: UTF-8 -*-
+import time
+import unittest
+from hamcrest import assert_that, equal_to, is_, greater_than, less_than, less_than_or_equal_to, calling, raises, \
+    instance_of, is_in, is_not, has_item, same_instance
+from chess.board import Board
+from chess.color import Color
+from chess.pieces import WhiteQueen
+from chess.move import move_name
+from chess.perft import PERFT_SUITE
+from chess.engine import Searcher, MATE, evaluate, Agent, RandomAgent, SearchAgent, get_agent, UnknownAgentException, \
+    TranspositionTable, static_exchange
+from chess.engine.transposition import EXACT, LOWER
+from chess.engine.ordering import MoveOrderer
+
+
+class TestEvaluate(unittest.TestCase):
+    def test_start_position_is_even(self):
+        assert_that(evaluate(Board()), equal_to(0))
+
+    def test_scored_for_player_to_move(self):
+        white = Board.from_fen(u'4k3/8/8/8/8/8/8/3QK3 w - - 0 1')
+        black = Board.from_fen(u'4k3/8/8/8/8/8/8/3QK3 b - - 0 1')
+        # The queen is worth 900, less 5 for standing on the edge of the board
+        assert_that(evaluate(white), equal_to(895))
+        assert_that(evaluate(black), equal_to(-895))
+
+    def test_mirrored_position_scores_the_same(self):
+        white = Board.from_fen(u'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+        black = Board.from_fen(u'r3k2r/pppbbppp/2n2q1P/1P2p3/3pn3/BN2PNP1/P1PPQPB1/R3K2R b KQkq - 0 1')
+        assert_that(evaluate(black), equal_to(evaluate(white)))
+
+    def test_pieces_placed_well_score_more(self):
+        assert_that(evaluate(Board.from_fen(u'4k3/8/8/8/3N4/8/8/4K3 w - - 0 1')),
+                    greater_than(evaluate(Board.from_fen(u'4k3/8/8/8/8/8/8/N3K3 w - - 0 1'))))
+
+    def test_endgame_king_comes_out(self):
+        # With the queens on the board the king is safer at home, once they are gone it belongs in the centre
+        pieces = u'rnbqkbnr/pppppppp/8/8/{row}/8/PPPPPPPP/RNBQ{home}BNR w - - 0 1'
+        pawns = u'4k3/pppppppp/8/8/{row}/8/PPPPPPPP/4{home}3 w - - 0 1'
+        for fen in (pieces, pawns):
+            home = evaluate(Board.from_fen(fen.format(row=u'8', home=u'K')))
+            centre = evaluate(Board.from_fen(fen.format(row=u'3K4', home=u'1')))
+            if fen is pieces:
+                assert_that(home, greater_than(centre))
+            else:
+                assert_that(centre, greater_than(home))
+
+    def test_updated_incrementally(self):
+        _, board_string, color, _ = PERFT_SUITE[3]
+        chess_board = Board(board_string, color)
+        for move in list(chess_board.legal_moves(color)):
+            chess_board.make_move(move)
+            assert_that((chess_board._piece_square, chess_board._phase), equal_to(chess_board._piece_squares()))
+            assert_that(evaluate(chess_board), equal_to(evaluate(Board.from_fen(chess_board.to_fen()))))
+            chess_board.unmake_move()
+        assert_that((chess_board._piece_square, chess_board._phase), equal_to(chess_board._piece_squares()))
+
+
+class TestSearcher(unittest.TestCase):
+    def test_mate_in_one(self):
+        result = Searcher(max_depth=3).search(Board.from_fen(u'6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1'))
+        assert_that(move_name(result.move), equal_to(u'A1A8'))
+        assert_that(result.score, equal_to(MATE - 1))
+
+    def test_captures_hanging_queen(self):
+        result = Searcher(max_depth=2).search(Board.from_fen(u'4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1'))
+        assert_that(move_name(result.move), equal_to(u'D2D5'))
+        assert_that(result.depth, equal_to(2))
+
+    def test_board_is_not_changed(self):
+        chess_board = Board()
+        Searcher(max_depth=3).search(chess_board)
+        assert_that(chess_board.to_fen(), equal_to(Board().to_fen()))
+
+    def test_root_stays_a_repetition(self):
+        chess_board = Board()
+        for from_, to_ in [('G1', 'F3'), ('G8', 'F6'), ('F3', 'G1'), ('F6', 'G8')]:
+            chess_board.move_piece(from_, to_)
+        assert_that(chess_board.position_history, has_item(chess_board.hash))
+        searcher = Searcher(max_depth=3)
+        search_root = searcher._search_root
+        seen = []
+
+        def spy(moves, depth):
+            result = search_root(moves, depth)
+            seen.append(chess_board.hash in searcher._seen)
+            return result
+        searcher._search_root = spy
+        searcher.search(chess_board)
+        assert_that(seen, equal_to([True, True, True]))
+
+    def test_no_legal_moves(self):
+        result = Searcher().search(Board.from_fen(u'7k/5Q2/6K1/8/8/8/8/8 b - - 0 1'))
+        assert_that(result.move, is_(None))
+        assert_that(result.score, equal_to(0))
+
+    def test_node_budget(self):
+        chess_board = Board()
+        result = Searcher(max_nodes=500).search(chess_board)
+        assert_that(result.nodes, less_than_or_equal_to(501))
+        assert_that(result.move, is_in(list(chess_board.legal_moves(Color.WHITE))))
+
+    def test_time_budget(self):
+        start = time.time()
+        result = Searcher(max_seconds=0.2).search(Board())
+        assert_that(time.time() - start, less_than(1.0))
+        assert_that(result.depth, greater_than(0))
+
+
+class TestAgents(unittest.TestCase):
+    def test_random_agent(self):
+        chess_board = Board()
+        move = RandomAgent(seed=1).play(chess_board)
+        assert_that(move, is_in(list(Board().legal_moves(Color.WHITE))))
+        assert_that(chess_board.current_player, is_(Color.BLACK))
+
+    def test_search_agent_promotes(self):
+        chess_board = Board.from_fen(u'8/P6k/8/8/8/8/8/K7 w - - 0 1')
+        SearchAgent(max_depth=1).play(chess_board)
+        assert_that(chess_board.get_piece('A8'), instance_of(WhiteQueen))
+        assert_that(chess_board.promote_pawn_location, is_(None))
+        assert_that(chess_board.current_player, is_(Color.BLACK))
+
+    def test_search_agent_keeps_table(self):
+        agent = SearchAgent(max_depth=2, table_size=64 * 1024)
+        chess_board = Board()
+        agent.play(chess_board)
+        table = agent.table
+        stores = table.stores
+        agent.play(chess_board)
+        assert_that(agent.table, same_instance(table))
+        assert_that(table.stores, greater_than(stores))
+
+    def test_agent_must_choose_moves(self):
+        assert_that(calling(Agent), raises(TypeError))
+
+    def test_get_agent(self):
+        assert_that(get_agent(u'SearchAgent'), instance_of(SearchAgent))
+        assert_that(calling(get_agent).with_args(u'DeepBlue'), raises(UnknownAgentException))
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_store_and_probe(self):
+        table = TranspositionTable(1024)
+        table.store(0x123456789ABCDEF0, 3, LOWER, -250, 1025)
+        assert_that(table.probe(0x123456789ABCDEF0), equal_to((1025, 3, LOWER, -250)))
+        assert_that(table.probe(0x0FEDCBA987654321), is_(None))
+        assert_that(table.stats()[u'hit rate'], equal_to(0.5))
+
+    def test_size_is_fixed(self):
+        table = TranspositionTable(1200, bucket_size=4)
+        size = table.size
+        assert_that(size, less_than_or_equal_to(1200))
+        for key in range(1, 10000):
+            table.store(key * 0x9E3779B97F4A7C15 & (1 << 64) - 1, key % 10 + 1, EXACT, key)
+        assert_that(table.size, equal_to(size))
+        assert_that(table.stats()[u'fill'], equal_to(1.0))
+        assert_that(table.collisions, greater_than(0))
+
+    def test_keeps_deeper_entries(self):
+        table = TranspositionTable(1, bucket_size=2)  # A single bucket
+        table.store(1 << 32, 5, EXACT, 10)
+        table.store(2 << 32, 1, EXACT, 20)
+        table.store(3 << 32, 3, EXACT, 30)  # Replaces the shallowest
+        assert_that(table.probe(2 << 32), is_(None))
+        assert_that(table.probe(1 << 32)[1], equal_to(5))
+        # A shallower bound of the same position, from the same search, does not replace the deeper one
+        table.store(1 << 32, 2, LOWER, 40)
+        assert_that(table.probe(1 << 32)[1], equal_to(5))
+
+    def test_replaces_earlier_searches_first(self):
+        table = TranspositionTable(1, bucket_size=2)
+        table.store(1 << 32, 9, EXACT, 10)
+        table.new_search()
+        table.store(2 << 32, 1, EXACT, 20)
+        table.store(3 << 32, 1, EXACT, 30)
+        assert_that(table.probe(1 << 32), is_(None))
+        assert_that(table.probe(2 << 32), is_not(None))
+
+    def test_searcher_uses_table(self):
+        searcher = Searcher(max_depth=3)
+        first = searcher.search(Board()).nodes
+        # The results of the first search are reused
+        assert_that(searcher.search(Board()).nodes, less_than(first))
+        assert_that(searcher.table.hits, greater_than(0))
+
+
+class TestMoveOrderer(unittest.TestCase):
+    def setUp(self):
+        # The white pawn on C4 and queen on D1 can both capture the black queen on D5, the queen can take a pawn on D7
+        self.board = Board.from_fen(u'4k3/3p4/8/3q4/2P5/8/8/3QK3 w - - 0 1')
+        self.moves = list(self.board.legal_moves(Color.WHITE))
+
+    def names(self, moves):
+        return [move_name(move) for move in moves]
+
+    def test_most_valuable_victim_least_valuable_attacker(self):
+        ordered = self.names(MoveOrderer().order(self.board, self.moves, 0))
+        assert_that(ordered[:2], equal_to([u'C4D5', u'D1D5']))
+
+    def test_king_is_the_most_valuable_attacker(self):
+        # The queen on D1 and king on E3 can both capture the pawn on D2
+        chess_board = Board.from_fen(u'4k3/8/8/8/8/4K3/3p4/3Q4 w - - 0 1')
+        ordered = self.names(MoveOrderer().order(chess_board, list(chess_board.legal_moves(Color.WHITE)), 0))
+        assert_that(ordered[:2], equal_to([u'D1D2', u'E3D2']))
+
+    def test_table_move_first(self):
+        table_move = next(move for move in self.moves if move_name(move) == u'E1F2')
+        ordered = MoveOrderer().order(self.board, self.moves, 0, table_move)
+        assert_that(ordered[0], equal_to(table_move))
+
+    def test_killers_and_history(self):
+        orderer = MoveOrderer()
+        killer = next(move for move in self.moves if move_name(move) == u'D1A4')
+        quiet = next(move for move in self.moves if move_name(move) == u'E1F1')
+        orderer.cutoff(self.board, quiet, 3, 4)
+        orderer.cutoff(self.board, killer, 2, 1)
+        ordered = self.names(orderer.order(self.board, self.moves, 2))
+        # After the two captures, the killer at this ply and then the quiet move with a history of cutoffs
+        assert_that(ordered[2:4], equal_to([u'D1A4', u'E1F1']))
+
+    def test_ordering_searches_fewer_nodes(self):
+        _, board_string, color, _ = PERFT_SUITE[3]  # Position 4 of the perft suite, where captures are possible
+        chess_board = Board(board_string, color)
+        unordered = Searcher(max_depth=4, ordering=False).search(chess_board)
+        ordered = Searcher(max_depth=4).search(chess_board)
+        assert_that(ordered.nodes, less_than(unordered.nodes))
+        assert_that(ordered.score, equal_to(unordered.score))
+
+
+class TestStaticExchange(unittest.TestCase):
+    def exchange(self, fen, name):
+        chess_board = Board.from_fen(fen)
+        move = next(move for move in chess_board.legal_moves(chess_board.current_player) if move_name(move) == name)
+        return static_exchange(chess_board, move)
+
+    def test_undefended(self):
+        assert_that(self.exchange(u'1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1', u'E1E5'), equal_to(100))
+
+    def test_sliding_pieces_behind_attackers_join_in(self):
+        fen = u'1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1'
+        assert_that(self.exchange(fen, u'D3E5'), equal_to(-200))
+
+    def test_recaptured(self):
+        assert_that(self.exchange(u'k7/8/2p5/3p4/8/8/8/3QK3 w - - 0 1', u'D1D5'), equal_to(-800))
+
+    def test_king_cannot_capture_defended_piece(self):
+        # The king could recapture on D2, but the bishop on A5 defends it
+        assert_that(self.exchange(u'4k3/8/8/b7/8/4K3/3P4/3q4 b - - 0 1', u'D1D2'), equal_to(100))
+
+    def test_en_passant(self):
+        assert_that(self.exchange(u'4k3/8/8/3Pp3/8/8/8/4K3 w - e6 0 1', u'D5E6'), equal_to(100))
+
+
+class TestQuiescence(unittest.TestCase):
+    def test_does_not_take_defended_pawn(self):
+        result = Searcher(max_depth=1).search(Board.from_fen(u'k7/8/2p5/3p4/8/8/8/3QK3 w - - 0 1'))
+        assert_that(move_name(result.move), is_not(equal_to(u'D1D5')))
+        assert_that(result.score, greater_than(600))  # Still a queen for two pawns
+
+    def test_sees_the_exchange_through(self):
+        # Taking the knight wins a piece for a pawn, even though the pawn on E6 recaptures
+        chess_board = Board.from_fen(u'4k3/8/4p3/3n4/2P5/8/8/4K3 w - - 0 1')
+        result = Searcher(max_depth=1).search(chess_board)
+        assert_that(move_name(result.move), equal_to(u'C4D5'))
+        assert_that(result.score, greater_than(evaluate(chess_board) + 100))
+
+
+if __name__ == '__main__':
+        unittest.main()
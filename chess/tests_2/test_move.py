@@ -0,0 +1,35 @@
+# -*- coding: UTF-8 -*-
+import unittest
+from hamcrest import is_, assert_that, calling, raises
+from chess.move import Move
+from chess.pieces import WhitePawn
+from chess.square import InvalidSquareException
+
+
+class TestMove(unittest.TestCase):
+    def testMoveAttributes(self):
+        move = Move(WhitePawn(), 'd2', 'D4', double_move=True, check=True)
+        assert_that(move.from_loc, is_('D2'))
+        assert_that(move.to_loc, is_('D4'))
+        assert_that(move.double_move, is_(True))
+        assert_that(move.check, is_(True))
+        assert_that(move.capture, is_(False))
+        assert_that(move.checkmate, is_(False))
+
+    def testSetFlags(self):
+        move = Move(WhitePawn(), 'E4', 'D5')
+        move.capture = True
+        move.checkmate = True
+        move.checkmate = False
+        assert_that(move.capture, is_(True))
+        assert_that(move.checkmate, is_(False))
+
+    def testInvalidSquare(self):
+        assert_that(calling(Move).with_args(WhitePawn(), 'E4', 'E9'), raises(InvalidSquareException))
+
+    def testMoveHasNoInstanceDictionary(self):
+        assert_that(hasattr(Move(WhitePawn(), 'E2', 'E3'), '__dict__'), is_(False))
+
+
+if __name__ == '__main__':
+        unittest.main()
@@ -0,0 +1,40 @@
+# -*- coding: UTF-8 -*-
+import unittest
+from hamcrest import assert_that, equal_to
+from chess.board import Board
+from chess.perft import PERFT_SUITE, perft, perft_divide, run_suite
+
+
+class TestPerft(unittest.TestCase):
+    u"""Checks the move generator against the known perft counts. Only shallow depths are run here, use
+    'python manage.py perft --depth 4' to check deeper."""
+
+    def test_start_position(self):
+        chess_board = Board()
+        assert_that(perft(chess_board, 3), equal_to(8902))
+        # The board is left unchanged
+        assert_that(str(chess_board), equal_to(str(Board())))
+
+    def test_perft_suite(self):
+        for name, depth, nodes, expected, _ in run_suite(2):
+            assert_that(nodes, equal_to(expected), u"{0} at depth {1}".format(name, depth))
+
+    def test_kiwipete_depth_3(self):
+        u"""Kiwipete has many castling, en passant and promotion moves a few moves in."""
+        _, board_string, color, expected = PERFT_SUITE[1]
+        assert_that(perft(Board(board_string, color), 3), equal_to(expected[3]))
+
+    def test_perft_divide(self):
+        divide = perft_divide(Board(), 2)
+        assert_that(len(divide), equal_to(20))
+        assert_that(divide['E2E4'], equal_to(20))
+        assert_that(sum(divide.values()), equal_to(400))
+
+    def test_position_3_divide(self):
+        _, board_string, color, expected = PERFT_SUITE[2]
+        divide = perft_divide(Board(board_string, color), 3)
+        assert_that(sum(divide.values()), equal_to(expected[3]))
+
+
+if __name__ == '__main__':
+        unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: UTF-8 -*-
+import copy
+import pickle
+import unittest
+from hamcrest import is_, assert_that, equal_to, calling, raises, same_instance
+from chess.pieces import PIECES, PieceFactory, InvlaidPieceException, Piece, King, WhiteKing, BlackKing, WhiteQueen, \
+    BlackPawn, WhiteRook
+
+
+class TestPieces(unittest.TestCase):
+    def testPiecesAreSingletons(self):
+        assert_that(WhiteQueen(), same_instance(WhiteQueen()))
+        assert_that(WhiteKing(), is_(same_instance(PIECES[WhiteKing.code])))
+        assert_that(WhiteKing(), is_(equal_to(WhiteKing())))
+        assert_that(BlackKing() is WhiteKing(), is_(False))
+
+    def testPiecesIndexedByCode(self):
+        for code, piece in enumerate(PIECES):
+            assert_that(piece.code, is_(code))
+
+    def testPiecesAreImmutable(self):
+        def set_color():
+            WhiteRook().color = None
+        assert_that(calling(set_color), raises(AttributeError))
+
+    def testCopyReturnsSamePiece(self):
+        piece = BlackPawn()
+        assert_that(copy.copy(piece), same_instance(piece))
+        assert_that(copy.deepcopy(piece), same_instance(piece))
+        assert_that(pickle.loads(pickle.dumps(piece)), same_instance(piece))
+
+    def testCannotCreateBaseClass(self):
+        assert_that(calling(King), raises(TypeError))
+
+
+class TestPieceFactory(unittest.TestCase):
+    def testCreate(self):
+        assert_that(PieceFactory.create('WhiteQueen'), same_instance(WhiteQueen()))
+
+    def testCreateInvalidName(self):
+        assert_that(calling(PieceFactory.create).with_args('PurpleQueen'), raises(InvlaidPieceException))
+
+    def testCreateFromSymbol(self):
+        assert_that(PieceFactory.createFromSymbol(u'♔'), same_instance(WhiteKing()))
+        assert_that(PieceFactory.createFromSymbol('BP'), same_instance(BlackPawn()))
+
+    def testCreateFromInvalidSymbol(self):
+        assert_that(calling(PieceFactory.createFromSymbol).with_args(u'?'), raises(InvlaidPieceException))
+
+    def testGetPieceClass(self):
+        assert_that(Piece.get_piece_class(u'♕'), same_instance(WhiteQueen))
+        assert_that(calling(Piece.get_piece_class).with_args(u'?'), raises(ValueError))
+
+
+if __name__ == '__main__':
+        unittest.main()
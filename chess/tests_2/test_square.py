@@ -32,6 +32,16 @@ class TestSquareFunctions(unittest.TestCase):
         s = Square(x=8, y=1)
         assert_that(s.name, is_('H1'))
 
+    def testFromIndex(self):
+        s = Square.from_index(9, u'dummy_piece')
+        assert_that(s.name, is_('B2'))
+        assert_that((s.x, s.y), is_((2, 2)))
+        assert_that(s.piece, is_(u'dummy_piece'))
+
+    def testSquareHasNoInstanceDictionary(self):
+        s = Square('C3')
+        assert_that(hasattr(s, '__dict__'), is_(False))
+
 
 if __name__ == '__main__':
         unittest.main()
@@ -19,12 +19,16 @@ urlpatterns = patterns(
 
     url(r'^user/(?P<username>[0-9a-zA-Z_]+)/game/$', views.GameCreateOrList.as_view()),
     url(r'^user/(?P<username>[0-9a-zA-Z_]+)/game/(?P<game_id>[0-9]+)$', views.GameDetail.as_view()),
+    url(r'^user/(?P<username>[0-9a-zA-Z_]+)/game/(?P<game_id>[0-9]+)/packed/$', views.PackedBoard.as_view()),
     url(r'^user/(?P<username>[0-9a-zA-Z]+)/game/(?P<game_id>[0-9]+)/move/$', views.MoveList.as_view()),
     url(r'^user/(?P<username>[0-9a-zA-Z_]+)/game/(?P<game_id>[0-9]+)/move/(?P<from_loc>[a-hA-H][1-8])$',
         views.MoveDetail.as_view()),
+    url(r'^user/(?P<username>[0-9a-zA-Z_]+)/game/(?P<game_id>[0-9]+)/attacks/$', views.AttackMap.as_view()),
     url(r'^user/(?P<username>[0-9a-zA-Z]+)/game/(?P<game_id>[0-9]+)/move/(?P<from_loc>[a-hA-H][1-8])'
         r'/(?P<to_loc>[a-hA-H][1-8])$', views.MovePiece.as_view()),
     url(r'^user/(?P<username>[0-9a-zA-Z]+)/game/(?P<game_id>[0-9]+)/previous/$', views.PreviousMoves.as_view()),
+    url(r'^user/(?P<username>[0-9a-zA-Z_]+)/game/(?P<game_id>[0-9]+)/agent/(?P<agent>[0-9a-zA-Z]+)$',
+        views.AgentMove.as_view()),
     url(r'^user/(?P<username>[0-9a-zA-Z]+)/game/(?P<game_id>[0-9]+)/promote/$', views.PromotablePieces.as_view()),
     url(r'^user/(?P<username>[0-9a-zA-Z]+)/game/(?P<game_id>[0-9]+)/promote/(?P<piece>[0-9a-zA-Z]+)$',
         views.PromotePiece.as_view()),
@@ -19,8 +19,11 @@ from chess.models import GameModel, MoveModel, ChallengeModel
 from chess.serializers import GameModelSerializer
 from chess.board import IllegalMoveException, WrongPlayerException, InvlaidPieceException, \
     EmptySquareException, PromotePieceException, IllegalPromotionException
+from chess.engine import AGENTS, get_agent, UnknownAgentException
 
 from chess.color import Color
+from chess.winner import Winner
+import base64
 import json
 
 
@@ -37,6 +40,8 @@ class ChessResponses(object):
     PAWN_MUST_BE_PROMOTED = {"error": "Cannot move piece, opponent must promote their pawn first"}
     NO_PAWN_TO_PROMOTE = {"error": "Cannot promote pawwn, there is no pawn able to be promoted"}
     USER_CANNOT_CHALLENGE_THEMSELF = {"errpr": "A player cannot challenge themself"}
+    AGENT_DOES_NOT_EXIST = {"error": "Agent does not exist"}
+    GAME_IS_OVER = {"error": "The game is over"}
     NO_CHALLENGE_EXISTS = {"error": "Cannot accept challenge with player, it does not exist"}
     CHALLENGE_ALREADY_EXISTS = {"error": "Challenge already exists, accept their challenge instead"}
 
@@ -191,6 +196,33 @@ class GameDetail(APIView):
             return Response(serializer.data)
 
 
+class PackedBoard(APIView):
+    """
+    The board of a game packed into 37 bytes, a compact alternative to the board in the game details.
+    """
+    permission_classes = (AllowAny,)
+
+    def get(self, request, username, game_id, format=None):
+        """
+        Retrieve the board packed by Board.to_bytes and base64 encoded, with the game's active player and winner.
+
+        username -- The username of the player
+        game_id  -- The game to load
+        Raises -- An HTTP 400 error if the user does not exist or the game does not exist
+        """
+        game = load_game_or_error(username, game_id)
+        if isinstance(game, Response):
+            return game
+        else:
+            board = game.board
+            return Response({
+                "id": game.id,
+                "board": base64.b64encode(board.to_bytes()),
+                "active_player": board.current_player.name,
+                "winner": board.winner.name,
+            })
+
+
 # TODO: This should be changed just to load_game, and django should be configured to be able to raise exceptions into
 # a response. Currently we cannot break the contol flow easily from a child function call.
 def load_game_or_error(username, game_id=None):
@@ -298,11 +330,10 @@ class MoveList(APIView):
 
             if game.active_player(username):
                 board = game.board
-                for square in board.player_piece_squares(board.current_player):
-                    moves, attacks = board._get_moves_and_attacks(square)
-
+                for square, (moves, attacks) in board._moves_by_square(board.current_player).items():
                     moves_and_attacks = combine_moves_and_attacks(square, moves, attacks)
                     response.append(moves_and_attacks)
+                game.remember_board(board)
 
             return Response(response)
 
@@ -332,6 +363,7 @@ class MoveDetail(APIView):
             board = game.board
             if board._piece_owned_by_current_player(from_loc):
                 moves, attacks = board._get_moves_and_attacks(from_loc)
+                game.remember_board(board)
             else:
                 moves = set([])
                 attacks = set([])
@@ -341,6 +373,38 @@ class MoveDetail(APIView):
             #     return Response(ChessResponses.USER_IS_NOT_CURRENT_PLAYER, status=HTTP_400_BAD_REQUEST)
 
 
+class AttackMap(APIView):
+    """
+    This view handles the squares attacked by each player, e.g for drawing which squares are under threat.
+    """
+    permission_classes = (AllowAny,)
+
+    def get(self, request, username, game_id, format=None):
+        """
+        Retrieves the number of pieces of each player attacking each square. Squares that are not attacked are left out.
+
+        username -- The username of the player
+        game_id  -- The game to find the attacked squares in
+
+        If the 'attackers' query parameter is given, the squares of the attacking pieces are listed instead of counted.
+
+        Raises -- An HTTP 400 error if the user does not exist or the game does not exist
+        """
+        game = load_game_or_error(username, game_id)
+        if isinstance(game, Response):
+            return game
+        else:
+            board = game.board
+            attackers = 'attackers' in request.GET
+            response = {"id": game.id}
+            for color in (Color.WHITE, Color.BLACK):
+                attack_map = board.attack_map(color, attackers)
+                if attackers:
+                    attack_map = dict((square, sorted(squares)) for square, squares in attack_map.items())
+                response[color.name] = attack_map
+            return Response(response)
+
+
 class MovePiece(APIView):
     """
     Handles the moving of pieces
@@ -599,5 +663,45 @@ class AiAgents(APIView):
         """
         Return a list of agents that a player can play against
         """
-        resp = ['Not Implemented']
+        resp = [agent.name for agent in AGENTS]
         return Response(resp)
+
+
+class AgentMove(APIView):
+    """
+    Handles an agent making the move of the current player
+    """
+    permission_classes = (AllowAny,)
+
+    def post(self, request, username, game_id, agent, format=None):
+        u"""Let an agent choose and make the current player's move, see chess.engine.agents.
+
+        username -- The username of the player
+        game_id  -- The game to make the move in
+        agent    -- The name of the agent, one of those listed by AiAgents
+
+        If it is not the players turn, then the game will not be updated
+        """
+        game = load_game_or_error(username, game_id)
+        if isinstance(game, Response):
+            return game
+        elif not game.active_player(username):
+            return Response(ChessResponses.USER_IS_NOT_CURRENT_PLAYER, status=HTTP_400_BAD_REQUEST)
+
+        try:
+            agent = get_agent(agent)
+        except UnknownAgentException:
+            return Response(ChessResponses.AGENT_DOES_NOT_EXIST, HTTP_400_BAD_REQUEST)
+
+        # Checked before the agent spends time choosing a move it cannot make
+        board = game.board
+        if board.is_promote_phase():
+            return Response(ChessResponses.PAWN_MUST_BE_PROMOTED, HTTP_400_BAD_REQUEST)
+        if board.winner is not Winner.UNDECIDED:
+            return Response(ChessResponses.GAME_IS_OVER, HTTP_400_BAD_REQUEST)
+
+        if agent.play(board) is not None:
+            game.board = board
+
+        serializer = GameModelSerializer(game)
+        return Response(serializer.data)
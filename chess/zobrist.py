@@ -0,0 +1,25 @@
+# -*- coding: UTF-8 -*-
+u"""
+Random keys for Zobrist hashing of chess positions.
+
+The hash of a position is the exclusive or (^) of the key of every piece on its square, plus the keys of the side to
+move, the castling rights and the file a pawn can be captured en passant on. Because x ^ key ^ key == x, a board can
+keep its hash up to date as pieces move by xoring in and out just the keys that change.
+
+See http://en.wikipedia.org/wiki/Zobrist_hashing
+"""
+import random
+
+# A fixed seed, so a position has the same hash in every process, e.g when it is stored in a database
+_random = random.Random(0x2A5F3C1D)
+
+# PIECE_KEYS[code][index] is the key of a piece with Piece.code on the square at index
+PIECE_KEYS = [[_random.getrandbits(64) for _ in range(64)] for _ in range(12)]
+BLACK_TO_MOVE = _random.getrandbits(64)
+# One key per combination of castling rights, the rights are a 4 bit mask
+CASTLING_KEYS = [_random.getrandbits(64) for _ in range(16)]
+CASTLING_KEYS[0] = 0  # No castling rights, e.g in most endgames, needs no key
+# Indexed by the file of the en passant square, 0 for the A file
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)]
+
+del _random